@@ -0,0 +1,172 @@
+import asyncio
+import heapq
+import itertools
+import json
+import time
+from collections import deque
+
+import discord
+
+# =============================================
+# PLANIFICADOR DE ANIMACIONES Y EDICIONES PERIÓDICAS
+# =============================================
+# Presupuesto global de ediciones (todas las animaciones juntas)
+EDIT_RATE = 5
+EDIT_PER = 5.0
+
+
+class Animation:
+    """Mensaje que se vuelve a renderizar cada ``interval`` segundos"""
+    __slots__ = ("id", "name", "message", "render", "interval", "next_due",
+                 "last_payload", "edits", "skipped", "cancelled")
+
+    def __init__(self, animation_id: int, name: str, message: discord.Message, render, interval: float):
+        self.id = animation_id
+        self.name = name
+        self.message = message
+        self.render = render
+        self.interval = interval
+        self.next_due = time.monotonic() + interval
+        self.last_payload: str | None = None
+        self.edits = 0
+        self.skipped = 0
+        self.cancelled = False
+
+    @property
+    def jump_url(self) -> str:
+        return self.message.jump_url
+
+
+def payload_key(payload: dict) -> str:
+    """Representación estable de los argumentos de ``message.edit``"""
+    def convert(value):
+        if isinstance(value, discord.Embed):
+            return value.to_dict()
+        if isinstance(value, (list, tuple)):
+            return [convert(item) for item in value]
+        return value
+    return json.dumps({key: convert(value) for key, value in payload.items()}, sort_keys=True, default=str)
+
+
+class MessageAnimator:
+    """Una única tarea que posee todos los mensajes animados o refrescados.
+
+    Las animaciones se guardan en un heap ordenado por próxima ejecución. En
+    cada vuelta se editan como máximo ``rate`` mensajes por ``per`` segundos
+    entre todas las animaciones; si el contenido renderizado no cambió, no se
+    llama a la API, y los mensajes borrados o inaccesibles se descartan.
+    """
+
+    def __init__(self, rate: int = EDIT_RATE, per: float = EDIT_PER):
+        self.rate = rate
+        self.per = per
+        self._animations: dict[int, Animation] = {}
+        self._heap: list[tuple[float, int]] = []
+        self._ids = itertools.count(1)
+        self._edits: deque[float] = deque(maxlen=rate)
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    # -----------------------------------------
+    # API pública
+    # -----------------------------------------
+    def register(self, message: discord.Message, render, interval: float = 10.0, name: str | None = None) -> int:
+        """Registrar un mensaje; ``render()`` devuelve los kwargs de ``message.edit``"""
+        animation = Animation(next(self._ids), name or f"mensaje {message.id}", message, render, interval)
+        self._animations[animation.id] = animation
+        heapq.heappush(self._heap, (animation.next_due, animation.id))
+        self._wakeup.set()
+        return animation.id
+
+    def cancel(self, animation_id: int) -> bool:
+        """Detener una animación; devuelve False si no existía"""
+        animation = self._animations.pop(animation_id, None)
+        if animation is None:
+            return False
+        animation.cancelled = True
+        return True
+
+    def cancel_message(self, message_id: int) -> int:
+        """Detener todas las animaciones de un mensaje"""
+        ids = [a.id for a in self._animations.values() if a.message.id == message_id]
+        for animation_id in ids:
+            self.cancel(animation_id)
+        return len(ids)
+
+    def active(self) -> list[Animation]:
+        """Animaciones activas ordenadas por id"""
+        return sorted(self._animations.values(), key=lambda a: a.id)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # -----------------------------------------
+    # Bucle
+    # -----------------------------------------
+    def _budget_delay(self) -> float:
+        if len(self._edits) < self.rate:
+            return 0.0
+        return max(0.0, self._edits[0] + self.per - time.monotonic())
+
+    async def _sleep(self, delay: float):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self):
+        while True:
+            # Descartar entradas de animaciones canceladas
+            while self._heap and self._heap[0][1] not in self._animations:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                await self._sleep(3600)
+                continue
+
+            due, animation_id = self._heap[0]
+            now = time.monotonic()
+            if due > now:
+                await self._sleep(due - now)
+                continue
+
+            budget_delay = self._budget_delay()
+            if budget_delay > 0:
+                await asyncio.sleep(budget_delay)
+                continue
+
+            heapq.heappop(self._heap)
+            animation = self._animations[animation_id]
+            await self._step(animation)
+            if not animation.cancelled:
+                animation.next_due = max(animation.next_due + animation.interval, time.monotonic())
+                heapq.heappush(self._heap, (animation.next_due, animation.id))
+
+    async def _step(self, animation: Animation):
+        try:
+            payload = animation.render()
+            key = payload_key(payload)
+            if key == animation.last_payload:
+                animation.skipped += 1
+                return
+            self._edits.append(time.monotonic())
+            await animation.message.edit(**payload)
+            animation.last_payload = key
+            animation.edits += 1
+        except (discord.NotFound, discord.Forbidden):
+            # Mensaje borrado o sin acceso: dejar de animarlo
+            self.cancel(animation.id)
+        except discord.HTTPException as e:
+            print(f"Error al editar {animation.name}: {e}")
+        except Exception as e:
+            print(f"Error al renderizar {animation.name}: {e}")
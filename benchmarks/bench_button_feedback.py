@@ -0,0 +1,186 @@
+"""Benchmark: llamadas REST por clic de ``GradientButton`` en cada modo de respuesta visual.
+
+Ejecuta el ``GradientButton.callback`` real de ``main.py`` con los
+manejadores reales de reclamar ticket, abrir servidor, iniciar votación y
+añadir usuario, sobre una interacción falsa que cuenta cada llamada a la
+API (respuestas, followups, ediciones y envíos). Los formularios solo se
+abren (su envío es otra interacción). También simula a 3 miembros del staff reclamando el
+mismo ticket a la vez y muestra cómo queda el botón en el mensaje.
+
+Uso:
+    python benchmarks/bench_button_feedback.py
+"""
+import asyncio
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+from discord import ui  # noqa: E402
+
+import main  # noqa: E402
+
+STAFF_ROLE = main.Roles.STAFF[0]
+
+
+class Calls(Counter):
+    def hit(self, name: str):
+        self[name] += 1
+
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.roles = [FakeRole(STAFF_ROLE)]
+        self.mention = f"<@{user_id}>"
+        self.display_name = f"staff{user_id}"
+        self.display_avatar = type("Avatar", (), {"url": "https://cdn.example/avatar.png"})()
+
+    def __str__(self):
+        return self.display_name
+
+
+class FakeChannel:
+    def __init__(self, calls: Calls):
+        self.id = 4242
+        self.name = "doubts-0001-jugador"
+        self.calls = calls
+
+    async def send(self, *args, **kwargs):
+        self.calls.hit("channel.send")
+
+    async def purge(self, *args, **kwargs):
+        self.calls.hit("channel.purge")
+
+
+class FakeMessage:
+    def __init__(self, calls: Calls, view: ui.View):
+        self.calls = calls
+        self.embeds = [discord.Embed(title="Ticket")]
+        self.claim_label = self._claim_label(view)
+
+    @staticmethod
+    def _claim_label(view):
+        for child in view.children:
+            if getattr(child, "custom_id", None) == "ticket_claim":
+                return child.label
+        return None
+
+    async def edit(self, **kwargs):
+        self.calls.hit("message.edit")
+        await asyncio.sleep(0.01)  # latencia de red: deja que otros clics se intercalen
+        if kwargs.get("view") is not None:
+            self.claim_label = self._claim_label(kwargs["view"])
+
+
+class FakeResponse:
+    def __init__(self, calls: Calls):
+        self.calls = calls
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def _respond(self, name):
+        self.calls.hit(f"response.{name}")
+        self._done = True
+
+    async def send_message(self, *args, **kwargs):
+        await self._respond("send_message")
+
+    async def send_modal(self, modal):
+        await self._respond("send_modal")
+
+    async def defer(self, *args, **kwargs):
+        await self._respond("defer")
+
+    async def edit_message(self, *args, **kwargs):
+        await self._respond("edit_message")
+
+
+class FakeFollowup:
+    def __init__(self, calls: Calls):
+        self.calls = calls
+
+    async def send(self, *args, **kwargs):
+        self.calls.hit("followup.send")
+
+
+class FakeInteraction:
+    def __init__(self, calls: Calls, message: FakeMessage, channel: FakeChannel, user: FakeUser):
+        self.user = user
+        self.message = message
+        self.channel = channel
+        self.guild = type("Guild", (), {"icon": None})()
+        self.response = FakeResponse(calls)
+        self.followup = FakeFollowup(calls)
+        self.extras = {}
+
+
+def install_fakes(calls: Calls, channel: FakeChannel):
+    claimed = {}
+
+    async def claim(channel_id, staff_id):
+        await asyncio.sleep(0.005)  # escritura en SQLite
+        return claimed.setdefault(channel_id, staff_id) == staff_id
+
+    async def set_server_status(status):
+        pass
+
+    async def log(channel_id, embed):
+        pass  # el log agrupado no es una llamada por clic
+
+    main.ticket_registry.claim = claim
+    main.set_server_status = set_server_status
+    main.log_sink.log = log
+    main.bot.get_channel = lambda channel_id: channel
+    return claimed
+
+
+async def click(mode: str, view: ui.View, custom_id: str, message: FakeMessage, channel, calls, user_id=1):
+    main.BUTTON_FEEDBACK = mode
+    button = next(child for child in view.children if child.custom_id == custom_id)
+    await button.callback(FakeInteraction(calls, message, channel, FakeUser(user_id)))
+
+
+async def run():
+    views = {
+        "ticket_claim": main.TicketActionsView,
+        "start_server": main.ControlPanelView,
+        "start_vote": main.ControlPanelView,
+        "ticket_add_user": main.TicketActionsView,
+    }
+
+    print(f"{'botón':<16}{'modo':<11}{'llamadas':>9}  detalle")
+    for custom_id, view_cls in views.items():
+        for mode in ("edicion", "respuesta"):
+            calls = Calls()
+            channel = FakeChannel(calls)
+            install_fakes(calls, channel)
+            view = view_cls()
+            await click(mode, view, custom_id, FakeMessage(calls, view), channel, calls)
+            detail = ", ".join(f"{name} x{count}" for name, count in sorted(calls.items()))
+            print(f"{custom_id:<16}{mode:<11}{sum(calls.values()):>9}  {detail}")
+
+    print("\n3 miembros del staff reclaman el mismo ticket a la vez (vista persistente compartida):")
+    for mode in ("edicion", "respuesta"):
+        calls = Calls()
+        channel = FakeChannel(calls)
+        install_fakes(calls, channel)
+        view = main.TicketActionsView()
+        message = FakeMessage(calls, view)
+        await asyncio.gather(*(click(mode, view, "ticket_claim", message, channel, calls, user_id=i)
+                               for i in range(1, 4)))
+        print(f"  {mode:<10} {sum(calls.values()):>3} llamadas, {calls['message.edit']} ediciones del mensaje, "
+              f"botón final: {message.claim_label!r}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
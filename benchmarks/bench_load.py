@@ -0,0 +1,462 @@
+"""Prueba de carga sin conexión: los manejadores reales de ``main.py`` contra un Discord local.
+
+El bot de ``main.py`` arranca de verdad (``login``, ``setup_hook``,
+``on_ready``, sincronización de comandos, supervisor de tareas) contra
+``fake_discord.FakeDiscord``: una API REST local con latencia y rate limits
+y un gateway simulado que entrega eventos al ``ConnectionState`` real de
+discord.py en un servidor sintético del tamaño indicado. Cada escenario
+reproduce una ráfaga de usuarios:
+
+- ``tickets``: N usuarios abren un ticket en la ventana indicada (menú de
+  categoría, formulario y envío tras un tiempo de escritura).
+- ``altas``: oleada de N miembros que entran al servidor.
+- ``reclamos``: varios miembros del staff reclaman a la vez los mismos
+  tickets (vista persistente compartida).
+- ``advertencias``: el staff emite N advertencias con ``/advertencia-a``;
+  una parte de los usuarios tiene los DM cerrados. Se informa además de
+  cuánto tarda en llegar el DM desde que se lanza el comando.
+
+Una operación es un evento inyectado; termina cuando acaban todas las
+tareas que creó (salvo los trabajadores de fondo de ``BACKGROUND_TASKS``).
+Se informa del rendimiento, la latencia p50/p99 por tipo de operación, la
+llegada de la primera respuesta de cada interacción a Discord (plazo de
+3 s) y las llamadas REST por ruta y funcionalidad, incluidos los 429.
+
+Cada escenario se ejecuta en un subproceso con su propia base de datos
+temporal.
+
+Uso:
+    python benchmarks/bench_load.py [tickets altas reclamos advertencias] [--members 5000] [--latency-ms 80]
+        [--users 200] [--joins 1000] [--warnings 200] [--closed-dms 0.2] [--window 10]
+        [--limit "POST /guilds/{id}/channels=10/10"]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextvars import ContextVar
+
+import discord
+from discord import app_commands
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Se leen al importar los módulos del bot: métricas en un puerto libre de localhost
+os.environ["PORT"] = "0"
+os.environ["METRICS_HOST"] = "127.0.0.1"
+
+from fake_discord import FIRST_MEMBER_ID, FakeDiscord, SyntheticGuild, parse_limit  # noqa: E402
+
+GUILD_ID = 1357151555891232980
+ACK_DEADLINE = 3.0
+
+# Trabajadores de larga duración que una operación puede crear pero que no forman parte de ella
+BACKGROUND_TASKS = {"ChannelRenameScheduler._drain", "LogSink._drain"}
+
+# Operación a la que pertenecen las tareas creadas en el contexto actual
+current_operation: ContextVar["Operation | None"] = ContextVar("load_operation", default=None)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))]
+
+
+class Operation:
+    """Evento inyectado y las tareas que generó"""
+    __slots__ = ("kind", "started", "finished", "pending", "interaction_id")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.finished: float | None = None
+        self.pending = 0
+        self.interaction_id: int | None = None
+
+    def task_done(self, task: asyncio.Task):
+        self.pending -= 1
+        if self.pending == 0:
+            self.finished = time.perf_counter()
+
+
+class OperationTracker:
+    """Atribuye cada tarea de asyncio a la operación que la originó (por contexto)"""
+
+    def __init__(self):
+        self.operations: list[Operation] = []
+
+    def install(self, loop: asyncio.AbstractEventLoop):
+        loop.set_task_factory(self._task_factory)
+
+    def _task_factory(self, loop, coro, context=None):
+        task = asyncio.Task(coro, loop=loop, context=context)
+        operation = current_operation.get() if context is None else context.get(current_operation)
+        if operation is not None and getattr(coro, "__qualname__", "") not in BACKGROUND_TASKS:
+            operation.pending += 1
+            task.add_done_callback(operation.task_done)
+        return task
+
+    def run(self, kind: str, inject, *args, **kwargs) -> Operation:
+        """Inyectar un evento como una operación medida"""
+        operation = Operation(kind)
+        token = current_operation.set(operation)
+        try:
+            result = inject(*args, **kwargs)
+        finally:
+            current_operation.reset(token)
+        if isinstance(result, int):
+            operation.interaction_id = result
+        if operation.pending == 0:
+            operation.finished = time.perf_counter()
+        self.operations.append(operation)
+        return operation
+
+    async def wait(self, timeout: float):
+        deadline = time.perf_counter() + timeout
+        while any(op.pending for op in self.operations) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+
+
+class LoadHarness:
+    """Bot de ``main.py`` conectado a un ``FakeDiscord``"""
+
+    def __init__(self, main, interaction_metrics, fake: FakeDiscord, tracker: OperationTracker):
+        self.main = main
+        self.interaction_metrics = interaction_metrics
+        self.fake = fake
+        self.tracker = tracker
+        self._baseline = {}
+        self.started = time.perf_counter()
+        self.recipients: list[tuple[Operation, int]] = []  # operación -> destinatario de su DM
+
+    async def acked(self, operation: Operation, timeout: float = 30.0) -> bool:
+        """Esperar a que Discord reciba la respuesta a la interacción (el usuario ve el resultado)"""
+        deadline = time.perf_counter() + timeout
+        while operation.interaction_id not in self.fake.acks:
+            if time.perf_counter() > deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    def ticket_panel(self) -> dict:
+        return self.fake.panel_message(self.main.Channels.TICKETS, self.main.TicketCreationView().to_components())
+
+    async def open_ticket(self, panel: dict, user_id: int, category: str, delay: float, think: float):
+        await asyncio.sleep(delay)
+        channel_id = self.main.Channels.TICKETS
+        select = self.tracker.run("menu_categoria", self.fake.component, user_id, channel_id,
+                                  "ticket_category_select", panel, component_type=3, values=[category])
+        if not await self.acked(select):
+            return
+        await asyncio.sleep(think)  # el usuario rellena el formulario
+        form = self.main.TICKET_FORMS[category]
+        values = {field.key: f"{field.label} de {user_id}" for field in form.fields}
+        self.tracker.run("formulario_ticket", self.fake.modal_submit, user_id, channel_id, form.custom_id, values)
+
+    def ticket_messages(self) -> list[dict]:
+        """Mensajes de ticket con el botón de reclamar (en el estado que ve el cliente)"""
+        found = []
+        for messages in self.fake.messages.values():
+            for message in messages.values():
+                if any(component.get("custom_id") == "ticket_claim"
+                       for row in message["components"] for component in row.get("components", [])):
+                    found.append(message)
+        return found
+
+    async def drain_outbox(self, timeout: float):
+        """Esperar a que el trabajador del outbox entregue o descarte todo lo pendiente"""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            pending, _ = await self.main.db.outbox_counts()
+            if not pending:
+                return
+            await asyncio.sleep(0.05)
+
+    async def check_error_metrics(self):
+        """Comprobar que un comando de barra que lanza una excepción cuenta como error del manejador"""
+        async def failing(interaction: discord.Interaction):
+            raise RuntimeError("fallo de prueba")
+
+        tree = self.main.bot.tree
+        tree.add_command(app_commands.Command(name="fallo-de-prueba", description="Prueba", callback=failing))
+        before = self._counters()["handler_errors"]
+        operation = self.tracker.run("fallo", self.fake.slash_command, self.fake.guild.staff_ids()[0],
+                                     self.main.Channels.TICKETS, "fallo-de-prueba", {})
+        await self.tracker.wait(timeout=10)
+        tree.remove_command("fallo-de-prueba")
+        counted = self._counters()["handler_errors"] - before
+        if operation.finished is None or counted != 1:
+            raise AssertionError(f"Un comando que falla debería sumar 1 error en las métricas, sumó {counted}")
+
+    def reset(self):
+        """Descontar lo hecho hasta ahora (arranque y preparación del escenario)"""
+        self.tracker.operations.clear()
+        self.fake.calls.clear()
+        self.fake.unknown.clear()
+        self.fake.acks.clear()
+        self._baseline = self._counters()
+        self.started = time.perf_counter()
+
+    def _counters(self) -> dict:
+        metrics = self.interaction_metrics
+        return {
+            "features": {feature: total for feature, _, total, _ in self.main.rest_accounting.feature_usage()},
+            "handler_errors": sum(value for _, value in metrics.errors.items()),
+            "timeouts": sum(value for _, value in metrics.timeouts.items()),
+        }
+
+    def report(self, elapsed: float) -> dict:
+        operations = self.tracker.operations
+        by_kind: dict[str, dict] = {}
+        for operation in operations:
+            row = by_kind.setdefault(operation.kind, {"latency": [], "ack": [], "unfinished": 0})
+            if operation.finished is None:
+                row["unfinished"] += 1
+            else:
+                row["latency"].append(operation.finished - operation.started)
+            acked_at = self.fake.acks.get(operation.interaction_id)
+            if acked_at is not None:
+                row["ack"].append(acked_at - operation.started)
+
+        kinds = {}
+        for kind, row in by_kind.items():
+            latency, ack = row["latency"], row["ack"]
+            kinds[kind] = {
+                "n": len(latency) + row["unfinished"], "unfinished": row["unfinished"],
+                "p50": percentile(latency, 50), "p99": percentile(latency, 99), "max": max(latency, default=0.0),
+                "ack_p50": percentile(ack, 50) if ack else None, "ack_p99": percentile(ack, 99) if ack else None,
+                "ack_late": sum(1 for value in ack if value > ACK_DEADLINE),
+            }
+
+        dm = None
+        if self.recipients:
+            lags = [self.fake.dms[user_id] - operation.started for operation, user_id in self.recipients
+                    if user_id in self.fake.dms]
+            dm = {"n": len(self.recipients), "delivered": len(lags),
+                  "closed": sum(1 for _, user_id in self.recipients if self.fake.dms_closed(user_id)),
+                  "p50": percentile(lags, 50), "p99": percentile(lags, 99)}
+
+        counters = self._counters()
+        features = {feature: total - self._baseline["features"].get(feature, 0)
+                    for feature, total in counters["features"].items()}
+        return {
+            "operations": len(operations),
+            "elapsed_s": elapsed,
+            "throughput": len(operations) / elapsed if elapsed else 0.0,
+            "kinds": kinds,
+            "dm": dm,
+            "rest": self.fake.rest_summary(),
+            "features": {feature: calls for feature, calls in sorted(features.items(), key=lambda i: -i[1]) if calls},
+            "handler_errors": counters["handler_errors"] - self._baseline["handler_errors"],
+            "timeouts": counters["timeouts"] - self._baseline["timeouts"],
+        }
+
+
+# =============================================
+# ESCENARIOS
+# =============================================
+async def scenario_tickets(harness: LoadHarness, args):
+    """``--users`` usuarios abren un ticket repartidos en ``--window`` segundos"""
+    panel = harness.ticket_panel()
+    categories = list(harness.main.TICKET_CATEGORIES)
+    first_user = FIRST_MEMBER_ID + args.staff
+    await asyncio.gather(*(
+        harness.open_ticket(panel, first_user + index, categories[index % len(categories)],
+                            delay=index * args.window / args.users, think=args.think)
+        for index in range(args.users)
+    ))
+
+
+async def scenario_joins(harness: LoadHarness, args):
+    """Oleada de ``--joins`` miembros nuevos en ``--window`` segundos"""
+    first_user = FIRST_MEMBER_ID + args.members
+    started = time.perf_counter()
+    for index in range(args.joins):
+        delay = started + index * args.window / args.joins - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        harness.tracker.run("alta_miembro", harness.fake.member_join, first_user + index)
+
+
+async def scenario_claims(harness: LoadHarness, args):
+    """``--claimers`` miembros del staff reclaman a la vez ``--tickets`` tickets"""
+    # Preparación (no se mide): abrir los tickets
+    panel = harness.ticket_panel()
+    categories = list(harness.main.TICKET_CATEGORIES)
+    first_user = FIRST_MEMBER_ID + args.staff
+    await asyncio.gather(*(
+        harness.open_ticket(panel, first_user + index, categories[index % len(categories)], delay=0, think=0)
+        for index in range(args.tickets)
+    ))
+    await harness.tracker.wait(timeout=600)
+    await asyncio.sleep(harness.fake.gateway_latency * 2)  # CHANNEL_CREATE de los últimos canales
+    harness.reset()
+
+    messages = harness.ticket_messages()
+    staff = harness.fake.guild.staff_ids()[:args.claimers]
+    clicks = [(message, staff_id) for message in messages for staff_id in staff]
+    started = time.perf_counter()
+    for index, (message, staff_id) in enumerate(clicks):
+        delay = started + index * args.window / len(clicks) - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        channel_id = int(message["channel_id"])
+        harness.tracker.run("reclamar_ticket", harness.fake.component, staff_id, channel_id, "ticket_claim",
+                            json.loads(json.dumps(message)))
+
+
+async def scenario_warnings(harness: LoadHarness, args):
+    """El staff emite ``--warnings`` advertencias a usuarios distintos en ``--window`` segundos"""
+    staff = harness.fake.guild.staff_ids()
+    first_user = FIRST_MEMBER_ID + args.staff
+    started = time.perf_counter()
+    for index in range(args.warnings):
+        delay = started + index * args.window / args.warnings - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        user_id = first_user + index
+        operation = harness.tracker.run("advertencia", harness.fake.slash_command, staff[index % len(staff)],
+                                        harness.main.Channels.TICKETS, "advertencia-a",
+                                        {"usuario": str(user_id), "razon": f"Prueba de carga {index}"})
+        harness.recipients.append((operation, user_id))
+    await harness.tracker.wait(timeout=args.timeout)
+    await harness.drain_outbox(timeout=args.timeout)
+
+
+SCENARIOS = {
+    "tickets": scenario_tickets,
+    "altas": scenario_joins,
+    "reclamos": scenario_claims,
+    "advertencias": scenario_warnings,
+}
+
+
+# =============================================
+# EJECUCIÓN
+# =============================================
+async def run_scenario(name: str, args, workdir: str) -> dict:
+    # El bot se importa aquí: estas variables se leen al importar main
+    os.environ["TRANSCRIPTS_DIR"] = os.path.join(workdir, "transcripts")
+    if args.mode:
+        os.environ["BOT_CACHE_MODE"] = args.mode
+    import main
+    from metrics import interaction_metrics
+
+    main.db.path = os.path.join(workdir, "carga.db")
+    channels = [value for key, value in vars(main.Channels).items() if not key.startswith("_")]
+    guild = SyntheticGuild(GUILD_ID, args.members, staff=args.staff, staff_roles=main.Roles.STAFF,
+                           text_channels=channels,
+                           categories=sorted({info["id"] for info in main.TICKET_CATEGORIES.values()}))
+    fake = FakeDiscord(guild, latency=args.latency_ms / 1000, gateway_latency=args.gateway_latency_ms / 1000,
+                       limits=dict(parse_limit(spec) for spec in args.limit), closed_dms=args.closed_dms)
+    tracker = OperationTracker()
+    tracker.install(asyncio.get_running_loop())
+    harness = LoadHarness(main, interaction_metrics, fake, tracker)
+
+    await fake.start()
+    bot = main.bot
+    try:
+        await bot.login("carga-sin-conexion")
+        bot._connection.guild_ready_timeout = 0.1
+        fake.attach(bot)
+        ready = asyncio.ensure_future(bot.wait_for("ready", timeout=300))
+        fake.connect()
+        await ready
+        guild_obj = bot.get_guild(GUILD_ID)
+        while not guild_obj.chunked:
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.5)  # tareas de on_ready
+        await harness.check_error_metrics()
+        harness.reset()
+
+        await SCENARIOS[name](harness, args)
+        await tracker.wait(timeout=args.timeout)
+        finished = max((op.finished for op in tracker.operations if op.finished), default=time.perf_counter())
+        result = harness.report(finished - harness.started)
+    finally:
+        await bot.close()
+        await fake.close()
+    result["scenario"] = name
+    return result
+
+
+def print_report(result: dict, top: int):
+    print(f"  operaciones: {result['operations']} en {result['elapsed_s']:.1f}s "
+          f"-> {result['throughput']:.1f} op/s; errores en manejadores: {result['handler_errors']}, "
+          f"fuera de plazo: {result['timeouts']}")
+    print(f"  {'operación (ms)':<20}{'n':>6}{'p50':>9}{'p99':>9}{'máx':>9}{'ack p50':>9}{'ack p99':>9}{'>3s':>5}")
+    for kind, row in result["kinds"].items():
+        ack50 = f"{row['ack_p50'] * 1000:.0f}" if row["ack_p50"] is not None else "-"
+        ack99 = f"{row['ack_p99'] * 1000:.0f}" if row["ack_p99"] is not None else "-"
+        unfinished = f"  ({row['unfinished']} sin terminar)" if row["unfinished"] else ""
+        print(f"  {kind:<20}{row['n']:>6}{row['p50'] * 1000:>9.1f}{row['p99'] * 1000:>9.1f}{row['max'] * 1000:>9.1f}"
+              f"{ack50:>9}{ack99:>9}{row['ack_late']:>5}{unfinished}")
+    dm = result.get("dm")
+    if dm:
+        print(f"  DM: {dm['delivered']}/{dm['n']} entregados ({dm['closed']} con los DM cerrados), "
+              f"llegada p50 {dm['p50'] * 1000:.0f} ms, p99 {dm['p99'] * 1000:.0f} ms desde el comando")
+    rest = result["rest"]
+    print(f"  REST: {rest['calls']} llamadas, {rest['rate_limited']} respuestas 429, {rest['errors']} errores")
+    for route, calls in list(rest["routes"].items())[:top]:
+        limited = rest["rate_limited_routes"].get(route)
+        print(f"    {calls:>6}  {route}" + (f"  ({limited} x 429)" if limited else ""))
+    if rest["unknown"]:
+        print(f"  ⚠️ rutas no simuladas: {rest['unknown']}")
+    features = ", ".join(f"{feature} {calls}" for feature, calls in result["features"].items())
+    print(f"  por funcionalidad (con reintentos): {features or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", metavar="escenario", help=f"uno o varios de: {', '.join(SCENARIOS)}")
+    parser.add_argument("--members", type=int, default=5_000, help="tamaño del servidor sintético")
+    parser.add_argument("--staff", type=int, default=10, help="miembros con rol de staff")
+    parser.add_argument("--mode", choices=("full", "lean"), help="BOT_CACHE_MODE (por defecto el del entorno)")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="latencia media de la API REST")
+    parser.add_argument("--gateway-latency-ms", type=float, default=40.0)
+    parser.add_argument("--limit", action="append", default=[], metavar="'MÉTODO RUTA=N/SEG'",
+                        help="sustituir el límite de una ruta, p. ej. 'POST /guilds/{id}/channels=10/10'")
+    parser.add_argument("--window", type=float, default=10.0, help="segundos en los que se reparte la ráfaga")
+    parser.add_argument("--users", type=int, default=200, help="usuarios que abren ticket (tickets)")
+    parser.add_argument("--think", type=float, default=1.0, help="segundos rellenando el formulario (tickets)")
+    parser.add_argument("--joins", type=int, default=1_000, help="miembros que entran (altas)")
+    parser.add_argument("--tickets", type=int, default=40, help="tickets a reclamar (reclamos)")
+    parser.add_argument("--claimers", type=int, default=3, help="staff que reclama cada ticket (reclamos)")
+    parser.add_argument("--warnings", type=int, default=200, help="advertencias emitidas (advertencias)")
+    parser.add_argument("--closed-dms", type=float, default=0.2,
+                        help="fracción de usuarios con los DM cerrados (advertencias)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="espera máxima a que terminen las operaciones")
+    parser.add_argument("--top", type=int, default=8, help="rutas REST a mostrar")
+    parser.add_argument("--child", choices=list(SCENARIOS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with tempfile.TemporaryDirectory() as workdir:
+            result = asyncio.run(run_scenario(args.child, args, workdir))
+        print(json.dumps(result))
+        return
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"escenarios desconocidos: {', '.join(unknown)}")
+    forwarded = [arg for arg in sys.argv[1:] if arg not in SCENARIOS]
+    for name in args.scenarios or SCENARIOS:
+        print(f"== {name} ({args.members} miembros, latencia REST {args.latency_ms:.0f} ms, "
+              f"ventana {args.window:.0f}s) ==")
+        process = subprocess.run([sys.executable, __file__, *forwarded, "--child", name],
+                                 capture_output=True, text=True)
+        if process.returncode != 0:
+            print(process.stdout[-2000:], process.stderr[-4000:], sep="\n")
+            continue
+        print_report(json.loads(process.stdout.strip().splitlines()[-1]), args.top)
+        print()
+
+
+if __name__ == "__main__":
+    main()
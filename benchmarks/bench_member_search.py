@@ -0,0 +1,122 @@
+"""Benchmark: autocompletado de usuarios con 10k, 100k y 500k miembros sintéticos.
+
+Compara el recorrido lineal anterior de ``usuario_autocompletar`` (dos
+``lower()`` por miembro en cada pulsación) con ``MemberSearchIndex``. Para
+cada tamaño se mide la construcción del índice, la memoria que ocupa y la
+latencia por consulta en frío (sin caché) de una mezcla de consultas de 1, 2,
+3 y más caracteres, incluidas algunas sin resultados.
+
+Uso:
+    python benchmarks/bench_member_search.py [--sizes 10000 100000 500000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from member_search import MemberSearchIndex  # noqa: E402
+
+SYLLABLES = ["san", "tia", "go", "rp", "ni", "co", "las", "jr", "smi", "le", "max", "pro",
+             "el", "dark", "x", "cl", "ro", "blox", "vi", "to", "ma", "ria", "ju", "an"]
+
+
+class FakeMember:
+    __slots__ = ("id", "name", "display_name", "bot")
+
+    def __init__(self, member_id, name, display_name, bot=False):
+        self.id = member_id
+        self.name = name
+        self.display_name = display_name
+        self.bot = bot
+
+
+def synthetic_members(count: int, seed: int = 1234) -> list[FakeMember]:
+    rng = random.Random(seed)
+    members = []
+    for i in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        name += str(rng.randint(0, 9999)) if rng.random() < 0.6 else rng.choice(string.ascii_lowercase)
+        display = name if rng.random() < 0.5 else name.capitalize() + " " + rng.choice(SYLLABLES).upper()
+        members.append(FakeMember(10**17 + i, name, display, bot=rng.random() < 0.01))
+    return members
+
+
+def legacy_search(members, current: str, limit: int = 25):
+    """Réplica del recorrido lineal anterior"""
+    choices = []
+    current = current.lower()
+    for member in members:
+        if not member.bot and (current in member.name.lower() or current in member.display_name.lower()):
+            choices.append(member.id)
+            if len(choices) >= limit:
+                break
+    return choices
+
+
+QUERIES = ["s", "ma", "san", "smile", "darkro", "jr42", "blox99", "zzzq", "qqqq", "x7"]
+
+
+def time_queries(search, queries, repeat: int = 3) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    return sum(samples) / len(samples) * 1000, samples[-1] * 1000
+
+
+def bench(size: int):
+    members = synthetic_members(size)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = MemberSearchIndex(cache_ttl=0)
+    index.rebuild(members)
+    build = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+
+    legacy_mean, legacy_max = time_queries(lambda q: legacy_search(members, q), QUERIES)
+    index_mean, index_max = time_queries(lambda q: index.search(q), QUERIES)
+
+    # Mantenimiento incremental (eventos del gateway)
+    joins = synthetic_members(1000, seed=size)
+    start = time.perf_counter()
+    for member in joins:
+        member.id += 10**16
+        index.add(member)
+    for member in joins:
+        index.remove(member.id)
+    churn = (time.perf_counter() - start) / (2 * len(joins)) * 1e6
+
+    # Caché de prefijos calientes
+    cached = MemberSearchIndex(cache_ttl=10)
+    cached.rebuild(members)
+    for query in QUERIES:
+        cached.search(query)
+    hot_mean, _ = time_queries(lambda q: cached.search(q), QUERIES)
+
+    print(f"{size:>8} | construcción {build * 1000:7.0f} ms, {memory:6.1f} MiB | "
+          f"lineal {legacy_mean:7.2f} ms (máx {legacy_max:7.2f}) | "
+          f"índice {index_mean:6.3f} ms (máx {index_max:6.3f}) | "
+          f"caché {hot_mean * 1000:5.1f} µs | alta/baja {churn:5.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    args = parser.parse_args()
+    print(f"Consultas: {', '.join(QUERIES)}\n")
+    for size in args.sizes:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark: memoria retenida con N formularios de ticket abiertos a la vez.
+
+Compara el enfoque anterior (una instancia de ``ui.Modal`` por apertura,
+guardada en el ``ViewStore`` de discord.py y una coroutine esperando
+``modal.wait()``) con los formularios sin estado de ``forms.py``, cuya
+plantilla se reutiliza y no queda registrada. Se reproduce exactamente lo que
+hace ``InteractionResponse.send_modal`` tras responder: guardar el modal en
+el ``ViewStore`` si no ha terminado.
+
+Uso:
+    python benchmarks/bench_open_forms.py [--forms 100 1000 5000]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+from discord import ui  # noqa: E402
+
+from forms import Form, FormField  # noqa: E402
+
+
+class MunicipalityModal(ui.Modal, title="🏛️ Trámite Municipal"):
+    """Réplica de los modales anteriores (un objeto y una espera por apertura)"""
+    roblox_username = ui.TextInput(label="Tu nombre en Roblox", placeholder="Ej: SantiagoRP_Player")
+    procedure = ui.TextInput(label="¿Qué trámite necesitas?", style=discord.TextStyle.long,
+                             placeholder="Licencia, registro de vehículo, propiedad...")
+    details = ui.TextInput(label="Detalles adicionales", style=discord.TextStyle.long, required=False)
+
+    async def on_submit(self, interaction):
+        self.interaction = interaction
+
+
+MUNICIPALITY_FORM = Form("ticket:municipality", "🏛️ Trámite Municipal", [
+    FormField("roblox_username", "Tu nombre en Roblox", "Ej: SantiagoRP_Player"),
+    FormField("procedure", "¿Qué trámite necesitas?", "Licencia, registro de vehículo, propiedad...", long=True),
+    FormField("details", "Detalles adicionales", long=True, required=False),
+])
+
+
+def send_modal(state, modal: ui.Modal):
+    """Lo que hace discord.py después de enviar la respuesta del modal"""
+    modal.to_dict()
+    if not modal.is_finished():
+        state.store_view(modal)
+
+
+async def legacy_open(state, interaction: dict):
+    modal = MunicipalityModal(timeout=600)
+    send_modal(state, modal)
+    if await modal.wait():
+        return None
+    return interaction, modal
+
+
+async def measure(approach: str, count: int) -> float:
+    client = discord.Client(intents=discord.Intents.none())
+    state = client._connection
+    MUNICIPALITY_FORM.modal()  # la plantilla se crea una sola vez
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    tasks = []
+    for index in range(count):
+        interaction = {"id": index, "user": index, "token": "x" * 200}
+        if approach == "anterior":
+            tasks.append(asyncio.create_task(legacy_open(state, interaction)))
+        else:
+            send_modal(state, MUNICIPALITY_FORM.modal())
+    await asyncio.sleep(0)  # dejar que las esperas se registren
+
+    gc.collect()
+    retained = (tracemalloc.get_traced_memory()[0] - baseline) / 1024
+    stored = len(state._view_store._modals)
+    tracemalloc.stop()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for modal in list(state._view_store._modals.values()):
+        modal.stop()
+    return retained, stored
+
+
+async def run(counts):
+    print(f"{'abiertos':>9} | {'anterior':>12} {'en ViewStore':>13} | {'sin estado':>12} {'en ViewStore':>13}")
+    for count in counts:
+        legacy_kib, legacy_stored = await measure("anterior", count)
+        stateless_kib, stateless_stored = await measure("sin estado", count)
+        print(f"{count:>9} | {legacy_kib:>8.0f} KiB {legacy_stored:>13} | {stateless_kib:>8.0f} KiB {stateless_stored:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--forms", type=int, nargs="+", default=[100, 1_000, 5_000])
+    args = parser.parse_args()
+    asyncio.run(run(args.forms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Benchmark: tiempo hasta on_ready y RSS en los modos de caché "full" y "lean".
+
+Alimenta el ``ConnectionState`` real de discord.py con eventos sintéticos del
+gateway (READY, GUILD_CREATE, GUILD_MEMBERS_CHUNK con o sin presencias y un
+flujo de MESSAGE_CREATE y PRESENCE_UPDATE) respetando lo que Discord enviaría según las
+intenciones de cada modo. Las peticiones de chunking se responden con un
+chunker local que simula la latencia de red entre bloques de 1000 miembros.
+
+Cada modo se ejecuta en un subproceso separado para que el RSS sea comparable.
+
+Uso:
+    python benchmarks/bench_startup_modes.py [--members 100000] [--messages 5000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+
+from gateway_config import current_rss_mib, gateway_options  # noqa: E402
+
+GUILD_ID = 1357151555891232980
+CHANNEL_ID = 1357151556926963751
+BOT_ID = 1360000000000000000
+CHUNK_SIZE = 1000
+
+
+def user_payload(user_id: int, bot: bool = False) -> dict:
+    return {"id": str(user_id), "username": f"jugador{user_id % 10**7}", "global_name": f"Jugador {user_id % 10**5}",
+            "discriminator": "0", "avatar": None, "bot": bot}
+
+
+def member_payload(user_id: int, bot: bool = False) -> dict:
+    return {"user": user_payload(user_id, bot), "roles": [], "joined_at": "2025-04-16T19:37:40.099000+00:00",
+            "nick": None, "deaf": False, "mute": False, "flags": 0}
+
+
+def presence_payload(user_id: int) -> dict:
+    return {"user": {"id": str(user_id)}, "status": "online", "client_status": {"desktop": "online"},
+            "activities": [{"name": "Roblox", "type": 0, "created_at": 0}]}
+
+
+def guild_payload(members: int, intents: discord.Intents) -> dict:
+    data = {
+        "id": str(GUILD_ID), "name": "Santiago RP", "member_count": members + 1, "large": True,
+        "owner_id": str(BOT_ID), "features": [], "emojis": [], "stickers": [], "voice_states": [],
+        "threads": [], "stage_instances": [], "guild_scheduled_events": [], "unavailable": False,
+        "roles": [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                   "hoist": False, "managed": False, "mentionable": False}],
+        "channels": [{"id": str(CHANNEL_ID + i), "type": 0, "name": f"canal-{i}", "position": i,
+                      "permission_overwrites": []} for i in range(50)],
+        "members": [member_payload(BOT_ID, bot=True)],
+    }
+    if intents.presences:
+        # Discord incluye las presencias conectadas en GUILD_CREATE
+        data["presences"] = [presence_payload(10**17 + i) for i in range(0, members, 5)]
+    return data
+
+
+def message_payload(message_id: int) -> dict:
+    author = 10**17 + message_id % 1000
+    return {"id": str(message_id), "channel_id": str(CHANNEL_ID), "guild_id": str(GUILD_ID),
+            "author": user_payload(author), "member": {k: v for k, v in member_payload(author).items() if k != "user"},
+            "content": "mensaje de prueba " * 5, "timestamp": "2025-04-16T19:37:40.099000+00:00",
+            "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [],
+            "mention_roles": [], "attachments": [], "embeds": [], "pinned": False, "type": 0}
+
+
+async def run_mode(mode: str, members: int, messages: int, chunk_latency: float) -> dict:
+    options = gateway_options(mode)
+    client = discord.Client(guild_ready_timeout=0.05, **options)
+    await client._async_setup_hook()
+    state = client._connection
+    intents = state._intents
+    ready = asyncio.Event()
+
+    @client.event
+    async def on_ready():
+        ready.set()
+
+    async def send_chunks(guild_id, presences, nonce):
+        count = -(-members // CHUNK_SIZE)
+        for index in range(count):
+            await asyncio.sleep(chunk_latency)
+            ids = range(10**17 + index * CHUNK_SIZE, 10**17 + min(members, (index + 1) * CHUNK_SIZE))
+            chunk = {"guild_id": str(guild_id), "members": [member_payload(i) for i in ids],
+                     "chunk_index": index, "chunk_count": count, "nonce": nonce}
+            if presences:
+                chunk["presences"] = [presence_payload(i) for i in ids if i % 5 == 0]
+            state.parse_guild_members_chunk(chunk)
+
+    async def fake_chunker(guild_id, query="", limit=0, presences=False, *, nonce=None):
+        asyncio.create_task(send_chunks(guild_id, presences, nonce))
+
+    state.chunker = fake_chunker
+    baseline = current_rss_mib()
+    start = time.perf_counter()
+
+    state.parse_ready({"v": 10, "user": user_payload(BOT_ID, bot=True), "session_id": "bench",
+                       "resume_gateway_url": "wss://localhost", "application": {"id": str(BOT_ID), "flags": 0},
+                       "guilds": [{"id": str(GUILD_ID), "unavailable": True}]})
+    state.parse_guild_create(guild_payload(members, intents))
+    await ready.wait()
+    ready_after = time.perf_counter() - start
+
+    # Chunking en segundo plano, como hace el bot en modo lean
+    guild = client.get_guild(GUILD_ID)
+    if not guild.chunked:
+        await guild.chunk(cache=True)
+    chunked_after = time.perf_counter() - start
+
+    # Tráfico de fondo que Discord solo envía si la intención está activa
+    events_start = time.perf_counter()
+    if intents.guild_messages:
+        for message_id in range(messages):
+            state.parse_message_create(message_payload(10**18 + message_id))
+    if intents.presences:
+        for member_id in range(10**17, 10**17 + min(members, messages * 4)):
+            state.parse_presence_update(dict(presence_payload(member_id), guild_id=str(GUILD_ID)))
+    events_s = time.perf_counter() - events_start
+
+    return {
+        "mode": mode,
+        "ready_s": ready_after,
+        "chunked_s": chunked_after,
+        "cached_members": len(guild.members),
+        "cached_messages": len(state._messages or []),
+        "events_s": events_s,
+        "rss_mib": current_rss_mib() - baseline,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--messages", type=int, default=5_000)
+    parser.add_argument("--chunk-latency-ms", type=float, default=20.0)
+    parser.add_argument("--child", choices=("full", "lean"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = asyncio.run(run_mode(args.child, args.members, args.messages, args.chunk_latency_ms / 1000))
+        print(json.dumps(result))
+        return
+
+    print(f"{args.members} miembros, {args.messages} mensajes, "
+          f"{args.chunk_latency_ms} ms entre chunks de {CHUNK_SIZE}\n")
+    print(f"{'modo':<6}{'on_ready':>10}{'chunking':>10}{'miembros':>10}{'mensajes':>10}"
+          f"{'eventos':>10}{'RSS':>11}")
+    for mode in ("full", "lean"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--members", str(args.members),
+             "--messages", str(args.messages), "--chunk-latency-ms", str(args.chunk_latency_ms)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(f"{r['mode']:<6}{r['ready_s']:>9.2f}s{r['chunked_s']:>9.2f}s{r['cached_members']:>10}"
+              f"{r['cached_messages']:>10}{r['events_s']:>9.2f}s{r['rss_mib']:>7.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark: memoria al archivar tickets de hasta 50k mensajes.
+
+Archiva canales sintéticos de distinto tamaño con
+``transcripts.archive_channel`` y mide el pico de memoria con
+``tracemalloc``. El historial se genera página a página (100 mensajes, como
+``channel.history``), así que el pico refleja solo lo que retiene el
+archivador. Para comparar, se mide también el enfoque ingenuo de cargar el
+historial completo en una lista antes de escribirlo.
+
+Uso:
+    python benchmarks/bench_transcript_archive.py [--sizes 1000 10000 50000]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transcripts  # noqa: E402
+
+START = datetime(2025, 4, 16, 19, 37, tzinfo=timezone.utc)
+
+
+class FakeAuthor:
+    __slots__ = ("id", "name")
+
+    def __init__(self, author_id: int):
+        self.id = author_id
+        self.name = f"jugador{author_id % 1000}"
+
+    def __str__(self):
+        return self.name
+
+
+class FakeMessage:
+    __slots__ = ("id", "author", "created_at", "content", "attachments", "embeds")
+
+    def __init__(self, index: int):
+        self.id = 10**18 + index
+        self.author = FakeAuthor(10**17 + index % 7)
+        self.created_at = START + timedelta(seconds=index * 13)
+        self.content = f"Mensaje {index}: necesito ayuda con mi vehículo en Santiago RP " * (1 + index % 3)
+        self.attachments = []
+        self.embeds = []
+
+
+class FakeChannel:
+    """Canal con ``history`` paginado como discord.py (100 mensajes por página)"""
+    def __init__(self, size: int):
+        self.id = 1363245252990865468
+        self.name = f"doubts-{size}-jugador"
+        self.size = size
+
+    async def history(self, limit=None, oldest_first=False):
+        for page_start in range(0, self.size, 100):
+            page = [FakeMessage(i) for i in range(page_start, min(self.size, page_start + 100))]
+            await asyncio.sleep(0)
+            for message in page:
+                yield message
+
+
+async def naive_archive(channel, path):
+    messages = [message async for message in channel.history(limit=None, oldest_first=True)]
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        for message in messages:
+            file.write(json.dumps(transcripts.message_record(message), ensure_ascii=False) + "\n")
+
+
+def measure(coro_factory) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(coro_factory())
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    args = parser.parse_args()
+
+    print(f"{'mensajes':>9} | {'streaming: pico':>16} {'tiempo':>8} {'archivo':>10} | {'ingenuo: pico':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            channel = FakeChannel(size)
+            path = os.path.join(tmp, f"{size}.jsonl.gz")
+            result = {}
+
+            async def streaming():
+                result["archive"] = await transcripts.archive_channel(channel, path)
+
+            peak, elapsed = measure(streaming)
+            _, file_size, count = result["archive"]
+            assert count == size
+
+            naive_peak, _ = measure(lambda: naive_archive(channel, os.path.join(tmp, f"naive-{size}.jsonl.gz")))
+            print(f"{size:>9} | {peak:>12.2f} MiB {elapsed:>7.2f}s {file_size / 1024:>6.0f} KiB | {naive_peak:>10.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
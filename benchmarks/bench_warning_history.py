@@ -0,0 +1,152 @@
+"""Benchmark: historial de advertencias sobre una tabla de 1 millón de filas.
+
+Compara la consulta anterior de ``/historial-advertencias`` (sin índice sobre
+``user_id``, ``fetchall`` de todas las advertencias del usuario) con el
+conteo y la paginación por clave de ``Database.warnings_page`` sobre el
+índice ``(user_id, timestamp)``. Mide un usuario típico y un reincidente con
+miles de advertencias, una página profunda por clave frente a ``OFFSET`` y
+el coste único de crear el índice en una base existente.
+
+Uso:
+    python benchmarks/bench_warning_history.py [--rows 1000000] [--users 20000] [--heavy 20000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SCHEMA, Database  # noqa: E402
+
+PAGE_SIZE = 5
+HEAVY_USER = 1
+TYPICAL_USER = 2
+LEGACY_QUERY = '''
+SELECT id, admin_name, reason, proof_url, timestamp
+FROM advertencias
+WHERE user_id = ?
+ORDER BY timestamp DESC
+'''
+OFFSET_QUERY = '''
+SELECT id, admin_name, reason, proof_url, timestamp
+FROM advertencias
+WHERE user_id = ?
+ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?
+'''
+
+
+def populate(path: str, rows: int, users: int, heavy: int):
+    """Tabla con ``rows`` advertencias: ``heavy`` del reincidente, 100 del usuario típico y el resto al azar"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.execute("DROP INDEX idx_advertencias_usuario_fecha")  # esquema anterior
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+
+    def generate():
+        for index in range(rows):
+            if index < heavy:
+                user_id = HEAVY_USER
+            elif index < heavy + 100:
+                user_id = TYPICAL_USER
+            else:
+                user_id = rng.randrange(3, users)
+            moment = start + timedelta(seconds=rng.randrange(365 * 86400))
+            yield (str(user_id), f"user{user_id}", "99", "admin", f"Motivo de la advertencia {index}",
+                   None, moment.strftime("%Y-%m-%d %H:%M:%S"))
+
+    with conn:
+        conn.executemany('''
+        INSERT INTO advertencias (user_id, user_name, admin_id, admin_name, reason, proof_url, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', generate())
+    conn.close()
+
+
+def timed(func, repeat: int = 5) -> tuple[float, object]:
+    """Mejor tiempo (ms) de ``repeat`` ejecuciones y el último resultado"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+async def measure_pages(path: str, user_id: int, depth: int = 1) -> dict:
+    """Primera página y página ``depth`` por clave con ``Database``"""
+    store = Database(path)
+    await store.connect()
+
+    async def first_page():
+        total = await store.count_warnings(user_id)
+        rows, _ = await store.warnings_page(user_id, PAGE_SIZE)
+        return total, rows
+
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        total, rows = await first_page()
+        best = min(best, time.perf_counter() - start)
+
+    # Avanzar hasta la página pedida (como un moderador pulsando "Siguiente")
+    for _ in range(depth - 1):
+        rows, _ = await store.warnings_page(user_id, PAGE_SIZE, before=(rows[-1][4], rows[-1][0]))
+    cursor = (rows[-1][4], rows[-1][0])
+    deep = float("inf")
+    for _ in range(5 if depth > 1 else 0):
+        start = time.perf_counter()
+        await store.warnings_page(user_id, PAGE_SIZE, before=cursor)
+        deep = min(deep, time.perf_counter() - start)
+
+    await store.close()
+    return {"total": total, "first_ms": best * 1000, "deep_ms": deep * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--heavy", type=int, default=20_000, help="advertencias del reincidente")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "advertencias.db")
+        start = time.perf_counter()
+        populate(path, args.rows, args.users, args.heavy)
+        print(f"{args.rows} advertencias de {args.users} usuarios generadas en {time.perf_counter() - start:.1f}s "
+              f"(reincidente: {args.heavy}, típico: 100)\n")
+
+        conn = sqlite3.connect(path)
+        legacy = {user_id: timed(lambda: conn.execute(LEGACY_QUERY, (str(user_id),)).fetchall(), repeat=3)
+                  for user_id in (TYPICAL_USER, HEAVY_USER)}
+        index_ms, _ = timed(lambda: conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_advertencias_usuario_fecha ON advertencias (user_id, timestamp)"), repeat=1)
+        depth = max(1, args.heavy // PAGE_SIZE // 2)
+        offset_ms, _ = timed(lambda: conn.execute(
+            OFFSET_QUERY, (str(HEAVY_USER), PAGE_SIZE, (depth - 1) * PAGE_SIZE)).fetchall())
+        conn.close()
+
+        print(f"Creación del índice en la base existente (una sola vez al actualizar): {index_ms:.0f} ms\n")
+        print(f"{'usuario':<14}{'antes (fetchall)':>18}{'filas leídas':>14}{'ahora (1ª pág.)':>17}"
+              f"{'filas leídas':>14}")
+        for label, user_id in (("típico", TYPICAL_USER), ("reincidente", HEAVY_USER)):
+            pages = asyncio.run(measure_pages(path, user_id, depth if user_id == HEAVY_USER else 1))
+            legacy_ms, legacy_rows = legacy[user_id]
+            print(f"{label:<14}{legacy_ms:>15.1f} ms{len(legacy_rows):>14}{pages['first_ms']:>14.2f} ms"
+                  f"{PAGE_SIZE:>14}")
+            if user_id == HEAVY_USER:
+                heavy_pages = pages
+
+        print(f"\nPágina {depth} del reincidente: por clave {heavy_pages['deep_ms']:.2f} ms, "
+              f"con OFFSET {offset_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
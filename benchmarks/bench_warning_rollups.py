@@ -0,0 +1,163 @@
+"""Benchmark: rankings de moderación sobre 1 millón de advertencias.
+
+Compara el ranking semanal y el de todo el historial, de usuarios y de
+staff, calculados recorriendo ``advertencias`` (lo único posible sin
+resúmenes) con la lectura de los resúmenes diarios y los totales que
+mantiene ``Database.add_warning``. Mide también el coste añadido por
+inserción (cinco sentencias en la misma transacción), la generación inicial
+en segundo plano (y la espera de las consultas que se intercalan) y la
+reconstrucción completa de los resúmenes.
+
+Uso:
+    python benchmarks/bench_warning_rollups.py [--rows 1000000] [--users 20000] [--days 365]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SCHEMA, Database  # noqa: E402
+
+WEEK = 7
+SCAN_USERS = '''
+SELECT user_id, MAX(user_name), COUNT(*) AS total FROM advertencias
+WHERE timestamp >= datetime('now', ?)
+GROUP BY user_id ORDER BY total DESC LIMIT 10
+'''
+SCAN_ADMINS = '''
+SELECT admin_id, MAX(admin_name), COUNT(*) AS total FROM advertencias
+WHERE timestamp >= datetime('now', ?)
+GROUP BY admin_id ORDER BY total DESC LIMIT 25
+'''
+# Todo el historial: mismo filtro con un intervalo que lo cubre entero
+ALL_TIME = "-100 years"
+
+
+def populate(path: str, rows: int, users: int, days: int):
+    """``rows`` advertencias repartidas en los últimos ``days`` días, sin resúmenes"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    rng = random.Random(7)
+    now = datetime.utcnow()
+
+    def generate():
+        for index in range(rows):
+            user_id = rng.randrange(users)
+            admin_id = rng.randrange(40)
+            moment = now - timedelta(seconds=rng.randrange(days * 86400))
+            yield (str(user_id), f"user{user_id}", str(admin_id), f"admin{admin_id}",
+                   f"Motivo de la advertencia {index}", None, moment.strftime("%Y-%m-%d %H:%M:%S"))
+
+    with conn:
+        conn.executemany('''
+        INSERT INTO advertencias (user_id, user_name, admin_id, admin_name, reason, proof_url, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', generate())
+    conn.close()
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Mejor tiempo (ms) de ``repeat`` ejecuciones"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def abest_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def measure(path: str) -> dict:
+    store = Database(path)
+    start = time.perf_counter()
+    await store.connect()
+    connected = (time.perf_counter() - start) * 1000
+    # Mientras tanto la base de datos sigue atendiendo consultas entre tramos
+    probes = []
+    while not store.rollups_ready:
+        probe = time.perf_counter()
+        await store.count_warnings(1)
+        probes.append((time.perf_counter() - probe) * 1000)
+    await store.wait_for_rollups()
+    backfill = (time.perf_counter() - start) * 1000
+
+    users = await abest_of(lambda: store.top_warned_users(WEEK))
+    admins = await abest_of(lambda: store.top_warning_admins(WEEK, limit=25))
+    users_all = await abest_of(lambda: store.top_warned_users(None))
+    admins_all = await abest_of(lambda: store.top_warning_admins(None, limit=25))
+
+    def insert_plain():
+        with store._conn:
+            store._conn.execute('''
+            INSERT INTO advertencias (user_id, user_name, admin_id, admin_name, reason, proof_url)
+            VALUES ('1', 'user1', '2', 'admin2', 'Motivo', NULL)
+            ''')
+
+    plain = await abest_of(lambda: store.run(insert_plain), repeat=200)
+    with_rollups = await abest_of(lambda: store.add_warning(1, "user1", 2, "admin2", "Motivo"), repeat=200)
+    rebuild = await abest_of(store.rebuild_warning_rollups, repeat=1)
+    rollup_rows = await store.run(lambda: store._conn.execute(
+        'SELECT (SELECT COUNT(*) FROM warning_daily_users) + (SELECT COUNT(*) FROM warning_daily_admins)'
+        ' + (SELECT COUNT(*) FROM warning_user_totals) + (SELECT COUNT(*) FROM warning_admin_totals)'
+    ).fetchone()[0])
+    await store.close()
+    return {"connected": connected, "backfill": backfill, "probe_max": max(probes, default=0.0),
+            "probes": len(probes), "users": users, "admins": admins, "users_all": users_all,
+            "admins_all": admins_all, "plain": plain,
+            "with_rollups": with_rollups, "rebuild": rebuild, "rollup_rows": rollup_rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "advertencias.db")
+        start = time.perf_counter()
+        populate(path, args.rows, args.users, args.days)
+        print(f"{args.rows} advertencias de {args.users} usuarios en {args.days} días "
+              f"generadas en {time.perf_counter() - start:.1f}s\n")
+
+        conn = sqlite3.connect(path)
+        since = f"-{WEEK} days"
+        scan_users = best_of(lambda: conn.execute(SCAN_USERS, (since,)).fetchall(), repeat=3)
+        scan_admins = best_of(lambda: conn.execute(SCAN_ADMINS, (since,)).fetchall(), repeat=3)
+        scan_users_all = best_of(lambda: conn.execute(SCAN_USERS, (ALL_TIME,)).fetchall(), repeat=3)
+        scan_admins_all = best_of(lambda: conn.execute(SCAN_ADMINS, (ALL_TIME,)).fetchall(), repeat=3)
+        conn.close()
+
+        result = asyncio.run(measure(path))
+        print(f"{'ranking':<32}{'recorriendo la tabla':>22}{'con resúmenes':>16}")
+        for label, scan, key in (("/top-infractores dias:7", scan_users, "users"),
+                                 ("/advertencias-staff dias:7", scan_admins, "admins"),
+                                 ("/top-infractores dias:0", scan_users_all, "users_all"),
+                                 ("/advertencias-staff dias:0", scan_admins_all, "admins_all")):
+            print(f"{label:<32}{scan:>19.1f} ms{result[key]:>13.2f} ms")
+        print(f"\nInserción: {result['plain']:.3f} ms sin resúmenes, "
+              f"{result['with_rollups']:.3f} ms con resúmenes (misma transacción)")
+        print(f"Conexión: {result['connected']:.0f} ms · generación inicial en segundo plano: "
+              f"{result['backfill']:.0f} ms ({result['probes']} consultas atendidas entre tramos, "
+              f"la más lenta {result['probe_max']:.0f} ms)")
+        print(f"Reconstrucción completa: {result['rebuild']:.0f} ms · filas de resumen: {result['rollup_rows']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark: exportación e importación de 1 millón de advertencias.
+
+Exporta ``advertencias`` a JSONL y CSV comprimidos con
+``warnings_archive.export_warnings`` (``fetchmany`` por lotes), importa cada
+archivo en una base vacía con ``warnings_archive.import_warnings``
+(``executemany`` por lotes en una transacción) y lo vuelve a importar para
+medir el descarte de duplicados. Cada fase se repite bajo ``tracemalloc``
+para mostrar que el pico de memoria de Python no depende del número de filas.
+
+Uso:
+    python benchmarks/bench_warnings_archive.py [--rows 1000000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import warnings_archive  # noqa: E402
+from database import SCHEMA, Database  # noqa: E402
+
+
+def populate(path: str, rows: int):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+
+    def generate():
+        for index in range(rows):
+            user_id = rng.randrange(20_000)
+            moment = start + timedelta(seconds=rng.randrange(365 * 86400))
+            proof = f"https://imgur.com/{index}.png" if index % 3 == 0 else None
+            yield (str(user_id), f"user{user_id}", str(index % 40), f"admin{index % 40}",
+                   f"Motivo de la advertencia {index}, con \"comillas\" y ñ", proof,
+                   moment.strftime("%Y-%m-%d %H:%M:%S"))
+
+    with conn:
+        conn.executemany('''
+        INSERT INTO advertencias (user_id, user_name, admin_id, admin_name, reason, proof_url, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', generate())
+    conn.close()
+
+
+def run_phase(func, traced: bool):
+    """Tiempo (s), pico de memoria de Python (MiB) y resultado de ``func``"""
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = 0.0
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def import_into(path: str, archive: str) -> tuple[int, int]:
+    async def _run():
+        store = Database(path)
+        await store.connect()
+        try:
+            return await warnings_archive.import_warnings(store, archive)
+        finally:
+            await store.close()
+    return asyncio.run(_run())
+
+
+def measure(source: Database, tmp: str, fmt: str, traced: bool) -> list[tuple]:
+    archive = os.path.join(tmp, f"advertencias-{traced}.{fmt}.gz")
+    target = os.path.join(tmp, f"importada-{fmt}-{traced}.db")
+    export = run_phase(lambda: warnings_archive.export_warnings(source, archive), traced)
+    first = run_phase(lambda: import_into(target, archive), traced)
+    again = run_phase(lambda: import_into(target, archive), traced)
+    size = os.path.getsize(archive)
+    return [("exportar", export, f"{export[2][2]} filas, {size / 1024 / 1024:.1f} MiB"),
+            ("importar", first, f"{first[2][1]} insertadas de {first[2][0]}"),
+            ("reimportar", again, f"{again[2][1]} insertadas de {again[2][0]}")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "advertencias.db")
+        start = time.perf_counter()
+        populate(path, args.rows)
+        print(f"{args.rows} advertencias generadas en {time.perf_counter() - start:.1f}s\n")
+        source = Database(path)
+
+        print(f"{'formato':<8}{'fase':<12}{'tiempo':>9}{'pico Python':>14}  resultado")
+        for fmt in warnings_archive.FORMATS:
+            timings = measure(source, tmp, fmt, traced=False)
+            peaks = measure(source, tmp, fmt, traced=True)
+            for (phase, (elapsed, _, _), detail), (_, (_, peak, _), _) in zip(timings, peaks):
+                print(f"{fmt:<8}{phase:<12}{elapsed:>8.1f}s{peak:>10.1f} MiB  {detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Benchmark: retraso del event loop con 100 advertencias concurrentes.
+
+Compara el camino anterior (``sqlite3.connect`` + ``commit`` dentro del loop,
+una conexión por comando) con ``database.Database`` (una conexión WAL en un
+hilo dedicado). Mientras se insertan las advertencias, una tarea "latido"
+duerme 1 ms en bucle y mide cuánto se retrasa cada despertar: ese retraso es
+lo que sufren los eventos del gateway y los clics en botones.
+
+Uso:
+    python benchmarks/bench_warnings_store.py [--inserts 100] [--disk-latency-ms 5]
+
+``--disk-latency-ms`` simula un disco lento añadiendo una espera por
+sentencia SQL ejecutada (en el hilo que la ejecuta).
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SCHEMA, Database  # noqa: E402
+
+
+class LoopLagProbe:
+    """Mide el retraso de despertar de una tarea que duerme ``interval`` segundos"""
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def report(self) -> dict:
+        samples = sorted(self.samples) or [0.0]
+        return {
+            "max_ms": samples[-1] * 1000,
+            "p99_ms": samples[int(len(samples) * 0.99) - 1 if len(samples) > 1 else 0] * 1000,
+            "mean_ms": statistics.fmean(samples) * 1000,
+        }
+
+
+def _slow_disk(conn: sqlite3.Connection, latency: float):
+    if latency:
+        conn.set_trace_callback(lambda _statement: time.sleep(latency))
+
+
+async def legacy_insert(path: str, latency: float, i: int):
+    """Réplica del código anterior: conexión nueva y commit en el event loop"""
+    conn = sqlite3.connect(path)
+    _slow_disk(conn, latency)
+    cursor = conn.cursor()
+    cursor.execute('''
+    INSERT INTO advertencias (user_id, user_name, admin_id, admin_name, reason, proof_url)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ''', (str(i), f"user{i}", "1", "admin", "benchmark", None))
+    conn.commit()
+    conn.close()
+
+
+async def run_legacy(path: str, inserts: int, latency: float) -> tuple[dict, float]:
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+
+    probe = LoopLagProbe()
+    probe.start()
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(legacy_insert(path, latency, i) for i in range(inserts)))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.01)
+    await probe.stop()
+    return probe.report(), elapsed
+
+
+async def run_store(path: str, inserts: int, latency: float) -> tuple[dict, float]:
+    store = Database(path)
+    await store.connect()
+    await store.run(lambda: _slow_disk(store._conn, latency))
+
+    probe = LoopLagProbe()
+    probe.start()
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        store.add_warning(i, f"user{i}", 1, "admin", "benchmark")
+        for i in range(inserts)
+    ))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.01)
+    await probe.stop()
+    await store.close()
+    return probe.report(), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inserts", type=int, default=100)
+    parser.add_argument("--disk-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    latency = args.disk_latency_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before, before_elapsed = asyncio.run(run_legacy(os.path.join(tmp, "legacy.db"), args.inserts, latency))
+        after, after_elapsed = asyncio.run(run_store(os.path.join(tmp, "store.db"), args.inserts, latency))
+
+    print(f"{args.inserts} advertencias concurrentes, latencia de disco simulada {args.disk_latency_ms} ms/sentencia\n")
+    print(f"{'':<28}{'max lag':>12}{'p99 lag':>12}{'lag medio':>12}{'total':>12}")
+    for label, report, elapsed in (
+        ("antes (sqlite3 en el loop)", before, before_elapsed),
+        ("después (Database WAL)", after, after_elapsed),
+    ):
+        print(f"{label:<28}{report['max_ms']:>10.1f}ms{report['p99_ms']:>10.1f}ms"
+              f"{report['mean_ms']:>10.2f}ms{elapsed * 1000:>10.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,572 @@
+"""Discord falso en local para las pruebas de carga (``bench_load.py``).
+
+- ``FakeDiscord`` sirve la API REST con aiohttp en 127.0.0.1 con latencia
+  configurable y límites por bucket y globales. Responde con las mismas
+  cabeceras ``X-RateLimit-*`` y los mismos 429 que Discord, así que el
+  control de rate limits de discord.py actúa igual que en producción.
+- ``FakeGateway`` ocupa el lugar del websocket del cliente (chunking de
+  miembros y presencia). ``FakeDiscord.dispatch`` inyecta eventos del
+  gateway en el ``ConnectionState`` real. Las acciones REST que en Discord
+  generan eventos (crear o renombrar canales, enviar mensajes) los emiten
+  también aquí.
+- ``SyntheticGuild`` describe un servidor sintético con N miembros, los
+  roles de staff y los canales que espera el bot.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import time
+from collections import Counter
+
+import discord
+from aiohttp import web
+from discord.http import Route
+
+from rest_accounting import route_template
+
+BOT_ID = 1360000000000000000
+FIRST_MEMBER_ID = 10**17
+CHUNK_SIZE = 1000
+TIMESTAMP = "2025-04-16T19:37:40.099000+00:00"
+
+# Perfil de límites aproximado por ruta: (peticiones, ventana en segundos).
+# Discord no publica todos los valores y puede cambiarlos; se ajustan con
+# ``limits`` / ``--limit``. El bucket se reparte por parámetro principal
+# (canal, servidor o webhook), como en Discord.
+DEFAULT_LIMITS = {
+    "POST /channels/{id}/messages": (5, 5.0),
+    "PATCH /channels/{id}/messages/{id}": (5, 5.0),
+    "PATCH /channels/{id}": (2, 600.0),
+    "POST /guilds/{id}/channels": (50, 10.0),
+    "PUT /channels/{id}/pins/{id}": (5, 5.0),
+    "PUT /channels/{id}/messages/{id}/reactions/{emoji}/@me": (1, 0.25),
+    "POST /webhooks/{id}/{token}": (5, 2.0),
+    "PATCH /webhooks/{id}/{token}/messages/@original": (5, 2.0),
+}
+DEFAULT_ROUTE_LIMIT = (50, 1.0)
+
+# Límite global por bot; las respuestas a interacciones y sus followups no cuentan
+GLOBAL_LIMIT = (50, 1.0)
+
+
+def parse_limit(spec: str) -> tuple[str, tuple[int, float]]:
+    """``"POST /guilds/{id}/channels=10/10"`` -> ``("POST /guilds/{id}/channels", (10, 10.0))``"""
+    route, _, value = spec.rpartition("=")
+    limit, _, per = value.partition("/")
+    return route, (int(limit), float(per))
+
+
+class RateLimit:
+    """Ventana fija de ``limit`` peticiones cada ``per`` segundos"""
+    __slots__ = ("limit", "per", "remaining", "reset_at", "bucket")
+
+    def __init__(self, limit: int, per: float, bucket: str):
+        self.limit = limit
+        self.per = per
+        self.remaining = limit
+        self.reset_at = 0.0
+        self.bucket = bucket
+
+    def hit(self, now: float) -> float:
+        """Consumir una petición; devuelve 0 o los segundos hasta poder reintentar"""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+        if self.remaining == 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return 0.0
+
+    def headers(self, now: float) -> dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset-After": f"{max(0.0, self.reset_at - now):.3f}",
+            "X-RateLimit-Reset": f"{time.time() + max(0.0, self.reset_at - now):.3f}",
+            "X-RateLimit-Bucket": self.bucket,
+        }
+
+
+def json_response(data, status: int, headers: dict) -> web.Response:
+    # discord.py solo decodifica el cuerpo si el tipo es exactamente "application/json" (sin charset)
+    headers["Content-Type"] = "application/json"
+    return web.Response(body=json.dumps(data).encode(), status=status, headers=headers)
+
+
+# =============================================
+# PAYLOADS DEL SERVIDOR SINTÉTICO
+# =============================================
+def user_payload(user_id: int, bot: bool = False) -> dict:
+    return {"id": str(user_id), "username": f"jugador{user_id % 10**7}", "global_name": f"Jugador {user_id % 10**5}",
+            "discriminator": "0", "avatar": None, "bot": bot}
+
+
+def member_payload(user_id: int, roles=(), bot: bool = False) -> dict:
+    return {"user": user_payload(user_id, bot), "roles": [str(role) for role in roles], "joined_at": TIMESTAMP,
+            "nick": None, "deaf": False, "mute": False, "flags": 0, "permissions": "0"}
+
+
+def role_payload(role_id: int, name: str, position: int) -> dict:
+    return {"id": str(role_id), "name": name, "permissions": "0", "position": position, "color": 0,
+            "hoist": False, "managed": False, "mentionable": False}
+
+
+class SyntheticGuild:
+    """Servidor sintético: ``members`` miembros (``staff`` de ellos con el primer rol de staff)"""
+
+    def __init__(self, guild_id: int, members: int, *, staff: int = 10, staff_roles=(), text_channels=(),
+                 categories=(), bot_every: int = 100):
+        self.id = guild_id
+        self.size = members
+        self.staff = staff
+        self.staff_roles = list(staff_roles)
+        self.text_channels = list(text_channels)
+        self.categories = list(categories)
+        self.bot_every = bot_every
+
+    def member_ids(self) -> range:
+        return range(FIRST_MEMBER_ID, FIRST_MEMBER_ID + self.size)
+
+    def staff_ids(self) -> list[int]:
+        return list(self.member_ids()[:self.staff])
+
+    def member(self, user_id: int) -> dict:
+        index = user_id - FIRST_MEMBER_ID
+        roles = self.staff_roles[:1] if 0 <= index < self.staff else ()
+        bot = self.bot_every and index >= self.staff and index % self.bot_every == self.bot_every - 1
+        return member_payload(user_id, roles, bot=bool(bot))
+
+    def channels(self) -> list[dict]:
+        channels = [{"id": str(channel_id), "type": 4, "name": f"categoria-{index}", "position": index,
+                     "permission_overwrites": []} for index, channel_id in enumerate(self.categories)]
+        channels += [{"id": str(channel_id), "type": 0, "name": f"canal-{index}", "position": index,
+                      "permission_overwrites": [], "parent_id": None}
+                     for index, channel_id in enumerate(self.text_channels)]
+        return channels
+
+    def payload(self) -> dict:
+        """``GUILD_CREATE`` sin miembros (llegan por chunking, como en un servidor grande)"""
+        roles = [role_payload(self.id, "@everyone", 0)]
+        roles += [role_payload(role_id, f"staff-{index}", index + 1) for index, role_id in enumerate(self.staff_roles)]
+        return {
+            "id": str(self.id), "name": "Santiago RP (sintético)", "member_count": self.size + 1, "large": True,
+            "owner_id": str(BOT_ID), "features": [], "emojis": [], "stickers": [], "voice_states": [],
+            "threads": [], "stage_instances": [], "guild_scheduled_events": [], "unavailable": False,
+            "icon": None, "roles": roles, "channels": self.channels(),
+            "members": [member_payload(BOT_ID, bot=True)],
+        }
+
+
+# =============================================
+# GATEWAY
+# =============================================
+class FakeGateway:
+    """Sustituto del websocket de discord.py (``client.ws``)"""
+
+    def __init__(self, fake: "FakeDiscord"):
+        self._fake = fake
+        self.open = True
+        self.presence_updates = 0
+        self.chunk_requests = 0
+
+    @property
+    def latency(self) -> float:
+        return self._fake.gateway_latency
+
+    def is_ratelimited(self) -> bool:
+        return False
+
+    async def change_presence(self, *, activity=None, status=None, since=0.0):
+        self.presence_updates += 1
+
+    async def request_chunks(self, guild_id, query=None, *, limit, user_ids=None, presences=False, nonce=None):
+        self.chunk_requests += 1
+        asyncio.get_running_loop().create_task(self._fake.send_chunks(int(guild_id), nonce))
+
+    async def close(self, code: int = 1000):
+        self.open = False
+
+
+# =============================================
+# API REST
+# =============================================
+class FakeDiscord:
+    """API REST y gateway de Discord simulados para un servidor sintético.
+
+    ``start`` levanta el servidor HTTP y redirige ``Route.BASE`` de
+    discord.py hacia él; ``attach`` conecta un cliente (su ``ws`` pasa a ser
+    un ``FakeGateway``) y ``connect`` le envía ``READY`` y ``GUILD_CREATE``.
+    Cada petición se registra por ruta y estado en ``calls``, y la llegada de
+    cada respuesta a una interacción en ``acks``.
+    """
+
+    def __init__(self, guild: SyntheticGuild, *, latency: float = 0.08, jitter: float = 0.5,
+                 gateway_latency: float = 0.04, limits: dict | None = None, closed_dms: float = 0.0, seed: int = 1):
+        self.guild = guild
+        self.closed_dms = closed_dms  # fracción de miembros que no aceptan DM del bot
+        self.latency = latency
+        self.jitter = jitter
+        self.gateway_latency = gateway_latency
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1_400_000_000_000_000_000)
+        self._buckets: dict[str, RateLimit] = {}
+        self._global = RateLimit(*GLOBAL_LIMIT, bucket="global")
+        self._runner: web.AppRunner | None = None
+        self._state = None
+        self.base_url = ""
+
+        self.channels: dict[int, dict] = {int(c["id"]): dict(c, guild_id=str(guild.id)) for c in guild.channels()}
+        self.messages: dict[int, dict[int, dict]] = {}
+        self.interactions: dict[str, int] = {}  # token -> canal
+        self.acks: dict[int, float] = {}  # id de interacción -> llegada de la respuesta
+        self.dm_channels: dict[int, int] = {}  # canal DM -> destinatario
+        self.dms: dict[int, float] = {}  # destinatario -> llegada de su primer DM
+        self.calls: Counter = Counter()  # (ruta, estado) -> peticiones
+        self.unknown: Counter = Counter()
+
+        self._routes = {
+            "GET /users/@me": self._get_me,
+            "GET /users/{id}": self._get_user,
+            "POST /users/@me/channels": self._create_dm,
+            "GET /oauth2/applications/@me": self._get_application,
+            "PUT /applications/{id}/commands": self._put_commands,
+            "POST /interactions/{id}/{token}/callback": self._interaction_callback,
+            "POST /webhooks/{id}/{token}": self._followup,
+            "GET /webhooks/{id}/{token}/messages/@original": self._followup,
+            "PATCH /webhooks/{id}/{token}/messages/@original": self._followup,
+            "PATCH /webhooks/{id}/{token}/messages/{id}": self._followup,
+            "DELETE /webhooks/{id}/{token}/messages/@original": self._no_content,
+            "POST /guilds/{id}/channels": self._create_channel,
+            "GET /guilds/{id}/members/{id}": self._get_member,
+            "GET /guilds/{id}/members/search": self._search_members,
+            "PATCH /guilds/{id}/members/{id}": self._get_member,
+            "DELETE /guilds/{id}/members/{id}": self._no_content,
+            "PUT /guilds/{id}/bans/{id}": self._no_content,
+            "GET /channels/{id}": self._get_channel,
+            "PATCH /channels/{id}": self._edit_channel,
+            "DELETE /channels/{id}": self._delete_channel,
+            "PUT /channels/{id}/permissions/{id}": self._no_content,
+            "GET /channels/{id}/messages": self._history,
+            "POST /channels/{id}/messages": self._send_message,
+            "PATCH /channels/{id}/messages/{id}": self._edit_message,
+            "DELETE /channels/{id}/messages/{id}": self._delete_message,
+            "POST /channels/{id}/messages/bulk-delete": self._bulk_delete,
+            "PUT /channels/{id}/pins/{id}": self._no_content,
+            "PUT /channels/{id}/messages/{id}/reactions/{emoji}/@me": self._no_content,
+        }
+
+    # -----------------------------------------
+    # Ciclo de vida
+    # -----------------------------------------
+    async def start(self):
+        app = web.Application(client_max_size=8 * 1024**2)
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/api/v10"
+        Route.BASE = self.base_url
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def attach(self, client: discord.Client):
+        """Sustituir el websocket del cliente por el gateway simulado"""
+        self._state = client._connection
+        client.ws = FakeGateway(self)
+
+    def connect(self):
+        """Enviar ``READY`` y ``GUILD_CREATE`` (discord.py pide el chunking si lo necesita)"""
+        self.dispatch("READY", {
+            "v": 10, "user": user_payload(BOT_ID, bot=True), "session_id": "carga",
+            "resume_gateway_url": "ws://127.0.0.1", "application": {"id": str(BOT_ID), "flags": 0},
+            "guilds": [{"id": str(self.guild.id), "unavailable": True}],
+        })
+        self.dispatch("GUILD_CREATE", self.guild.payload())
+
+    def dispatch(self, event: str, data: dict):
+        """Entregar un evento del gateway al ``ConnectionState`` del cliente"""
+        self._state.parsers[event](data)
+
+    def dispatch_later(self, event: str, data: dict):
+        asyncio.get_running_loop().call_later(self.gateway_latency, self.dispatch, event, data)
+
+    async def send_chunks(self, guild_id: int, nonce: str | None):
+        ids = self.guild.member_ids()
+        count = max(1, -(-len(ids) // CHUNK_SIZE))
+        for index in range(count):
+            await asyncio.sleep(self.gateway_latency)
+            members = [self.guild.member(user_id) for user_id in ids[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE]]
+            self.dispatch("GUILD_MEMBERS_CHUNK", {"guild_id": str(guild_id), "members": members,
+                                                  "chunk_index": index, "chunk_count": count, "nonce": nonce})
+
+    def snowflake(self) -> int:
+        return next(self._ids)
+
+    # -----------------------------------------
+    # Eventos que genera un usuario
+    # -----------------------------------------
+    def interaction(self, kind: int, user_id: int, channel_id: int, data: dict, message: dict | None = None) -> int:
+        """Inyectar ``INTERACTION_CREATE``; devuelve el id de la interacción"""
+        interaction_id = self.snowflake()
+        token = f"tok{interaction_id:0>45}"
+        self.interactions[token] = channel_id
+        payload = {
+            "id": str(interaction_id), "application_id": str(BOT_ID), "type": kind, "token": token, "version": 1,
+            "guild_id": str(self.guild.id), "channel_id": str(channel_id),
+            "channel": {"id": str(channel_id), "type": 0}, "member": self.guild.member(user_id),
+            "data": data, "locale": "es-ES", "guild_locale": "es-ES", "app_permissions": "0",
+        }
+        if message is not None:
+            payload["message"] = message
+        self.dispatch("INTERACTION_CREATE", payload)
+        return interaction_id
+
+    def component(self, user_id: int, channel_id: int, custom_id: str, message: dict,
+                  component_type: int = 2, values: list[str] | None = None) -> int:
+        data = {"custom_id": custom_id, "component_type": component_type}
+        if values is not None:
+            data["values"] = values
+        return self.interaction(3, user_id, channel_id, data, message)
+
+    def modal_submit(self, user_id: int, channel_id: int, custom_id: str, values: dict[str, str]) -> int:
+        rows = [{"type": 1, "components": [{"type": 4, "custom_id": key, "value": value}]}
+                for key, value in values.items()]
+        return self.interaction(5, user_id, channel_id, {"custom_id": custom_id, "components": rows})
+
+    def slash_command(self, user_id: int, channel_id: int, name: str, options: dict[str, str]) -> int:
+        """Comando de barra con opciones de texto"""
+        data = {"id": str(self.snowflake()), "name": name, "type": 1,
+                "options": [{"name": key, "type": 3, "value": value} for key, value in options.items()]}
+        return self.interaction(2, user_id, channel_id, data)
+
+    def member_join(self, user_id: int):
+        self.dispatch("GUILD_MEMBER_ADD", dict(member_payload(user_id), guild_id=str(self.guild.id)))
+
+    def panel_message(self, channel_id: int, components: list[dict] | None = None) -> dict:
+        """Mensaje del bot publicado antes de la prueba (p. ej. el panel de tickets)"""
+        return self._store_message(channel_id, {"content": "", "embeds": [], "components": components or []})
+
+    # -----------------------------------------
+    # Manejo de peticiones
+    # -----------------------------------------
+    def _delay(self) -> float:
+        return max(0.0, self.latency * (1 + self._random.uniform(-self.jitter, self.jitter)))
+
+    def _bucket(self, route: str, segments: list[str]) -> RateLimit:
+        major = ""
+        for index, segment in enumerate(segments[:-1]):
+            if segment in ("channels", "guilds", "interactions"):
+                major = segments[index + 1]
+                break
+            if segment == "webhooks":
+                # Los webhooks (y los followups de cada interacción) se reparten por id y token
+                major = "/".join(segments[index + 1:index + 3])
+                break
+        key = f"{route}:{major}"
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit, per = self.limits.get(route, DEFAULT_ROUTE_LIMIT)
+            bucket = self._buckets[key] = RateLimit(limit, per, hashlib.md5(route.encode()).hexdigest()[:16])
+        return bucket
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        segments = request.path.split("/api/", 1)[-1].split("/")[1:]
+        route = f"{request.method} {route_template(request.path)}"
+        body = None
+        if request.body_exists:
+            raw = await request.read()
+            if request.content_type == "application/json" and raw:
+                body = json.loads(raw)
+
+        now = time.monotonic()
+        bucket = self._bucket(route, segments)
+        interaction_route = route.startswith(("POST /interactions/", "POST /webhooks/{id}/{token}",
+                                              "PATCH /webhooks/{id}/{token}"))
+        retry_after = 0.0 if interaction_route else self._global.hit(now)
+        scope = "global" if retry_after else "user"
+        retry_after = retry_after or bucket.hit(now)
+        await asyncio.sleep(self._delay())
+
+        if retry_after:
+            self.calls[(route, 429)] += 1
+            headers = dict(bucket.headers(now), **{"Retry-After": f"{retry_after:.3f}", "X-RateLimit-Scope": scope,
+                                                   "Via": "1.1 google"})
+            if scope == "global":
+                headers["X-RateLimit-Global"] = "true"
+            return json_response({"message": "You are being rate limited.", "retry_after": retry_after,
+                                  "global": scope == "global"}, 429, headers)
+
+        handler = self._routes.get(route)
+        if handler is None:
+            self.unknown[route] += 1
+            status, data = 404, {"message": f"Ruta no simulada: {route}", "code": 0}
+        else:
+            status, data = handler(request, [int(s) for s in segments if s.isdigit()], segments, body or {})
+        self.calls[(route, status)] += 1
+        headers = bucket.headers(time.monotonic())
+        if data is None:
+            return web.Response(status=status, headers=headers)
+        return json_response(data, status, headers)
+
+    # -----------------------------------------
+    # Rutas
+    # -----------------------------------------
+    def _no_content(self, request, ids, segments, body):
+        return 204, None
+
+    def _get_me(self, request, ids, segments, body):
+        return 200, user_payload(BOT_ID, bot=True)
+
+    def _get_user(self, request, ids, segments, body):
+        return 200, user_payload(ids[0])
+
+    def _create_dm(self, request, ids, segments, body):
+        recipient = int(body["recipient_id"])
+        channel_id = next((cid for cid, uid in self.dm_channels.items() if uid == recipient), None)
+        if channel_id is None:
+            channel_id = self.snowflake()
+            self.dm_channels[channel_id] = recipient
+        return 200, {"id": str(channel_id), "type": 1, "recipients": [user_payload(recipient)],
+                     "last_message_id": None}
+
+    def dms_closed(self, user_id: int) -> bool:
+        return random.Random(user_id).random() < self.closed_dms
+
+    def _get_application(self, request, ids, segments, body):
+        return 200, {"id": str(BOT_ID), "name": "SantiagoGuard", "description": "", "icon": None,
+                     "bot_public": False, "bot_require_code_grant": False, "verify_key": "0" * 64,
+                     "owner": user_payload(FIRST_MEMBER_ID), "flags": 0}
+
+    def _put_commands(self, request, ids, segments, body):
+        return 200, []
+
+    def _interaction_callback(self, request, ids, segments, body):
+        self.acks.setdefault(ids[0], time.perf_counter())
+        return 204, None
+
+    def _followup(self, request, ids, segments, body):
+        channel_id = self.interactions.get(segments[2], 0)
+        return 200, self._message(channel_id, body, message_id=self.snowflake())
+
+    def _create_channel(self, request, ids, segments, body):
+        channel = {"id": str(self.snowflake()), "type": body.get("type", 0), "guild_id": str(ids[0]),
+                   "name": body.get("name", "canal"), "position": len(self.channels),
+                   "parent_id": body.get("parent_id"),
+                   "permission_overwrites": body.get("permission_overwrites", [])}
+        self.channels[int(channel["id"])] = channel
+        self.dispatch_later("CHANNEL_CREATE", channel)
+        return 201, channel
+
+    def _get_channel(self, request, ids, segments, body):
+        channel = self.channels.get(ids[0])
+        return (200, channel) if channel else (404, {"message": "Unknown Channel", "code": 10003})
+
+    def _edit_channel(self, request, ids, segments, body):
+        channel = self.channels.get(ids[0])
+        if channel is None:
+            return 404, {"message": "Unknown Channel", "code": 10003}
+        channel.update({key: value for key, value in body.items() if key in ("name", "topic", "parent_id")})
+        self.dispatch_later("CHANNEL_UPDATE", dict(channel))
+        return 200, channel
+
+    def _delete_channel(self, request, ids, segments, body):
+        channel = self.channels.pop(ids[0], None)
+        if channel is None:
+            return 404, {"message": "Unknown Channel", "code": 10003}
+        self.messages.pop(ids[0], None)
+        self.dispatch_later("CHANNEL_DELETE", channel)
+        return 200, channel
+
+    def _get_member(self, request, ids, segments, body):
+        if ids[1] in self.guild.member_ids():
+            return 200, self.guild.member(ids[1])
+        return 404, {"message": "Unknown Member", "code": 10007}
+
+    def _search_members(self, request, ids, segments, body):
+        query = request.query.get("query", "").lower()
+        limit = int(request.query.get("limit", 1))
+        found = []
+        for user_id in self.guild.member_ids():
+            if len(found) >= limit:
+                break
+            if user_payload(user_id)["username"].startswith(query):
+                found.append(self.guild.member(user_id))
+        return 200, found
+
+    def _message(self, channel_id: int, body: dict, message_id: int) -> dict:
+        return {
+            "id": str(message_id), "channel_id": str(channel_id), "guild_id": str(self.guild.id),
+            "author": user_payload(BOT_ID, bot=True), "content": body.get("content") or "",
+            "embeds": body.get("embeds") or [], "components": body.get("components") or [],
+            "timestamp": TIMESTAMP, "edited_timestamp": None, "tts": False, "mention_everyone": False,
+            "mentions": [], "mention_roles": [], "attachments": [], "pinned": False, "type": 0,
+            "flags": body.get("flags", 0),
+        }
+
+    def _store_message(self, channel_id: int, body: dict) -> dict:
+        message = self._message(channel_id, body, self.snowflake())
+        self.messages.setdefault(channel_id, {})[int(message["id"])] = message
+        return message
+
+    def _history(self, request, ids, segments, body):
+        limit = int(request.query.get("limit", 50))
+        messages = list(self.messages.get(ids[0], {}).values())[-limit:]
+        return 200, messages[::-1]
+
+    def _send_message(self, request, ids, segments, body):
+        recipient = self.dm_channels.get(ids[0])
+        if recipient is not None:
+            if self.dms_closed(recipient):
+                return 403, {"message": "Cannot send messages to this user", "code": 50007}
+            self.dms.setdefault(recipient, time.perf_counter())
+            return 200, self._store_message(ids[0], body)
+        if ids[0] not in self.channels:
+            return 404, {"message": "Unknown Channel", "code": 10003}
+        message = self._store_message(ids[0], body)
+        if self._state is not None and self._state._intents.guild_messages:
+            self.dispatch_later("MESSAGE_CREATE", message)
+        return 200, message
+
+    def _edit_message(self, request, ids, segments, body):
+        message = self.messages.get(ids[0], {}).get(ids[1])
+        if message is None:
+            return 404, {"message": "Unknown Message", "code": 10008}
+        message.update({key: value for key, value in body.items() if key in ("content", "embeds", "components")})
+        message["edited_timestamp"] = TIMESTAMP
+        return 200, message
+
+    def _delete_message(self, request, ids, segments, body):
+        self.messages.get(ids[0], {}).pop(ids[1], None)
+        return 204, None
+
+    def _bulk_delete(self, request, ids, segments, body):
+        for message_id in body.get("messages", []):
+            self.messages.get(ids[0], {}).pop(int(message_id), None)
+        return 204, None
+
+    # -----------------------------------------
+    # Informe
+    # -----------------------------------------
+    def rest_summary(self) -> dict:
+        """Peticiones por ruta (sin contar 429), 429 y rutas no simuladas"""
+        routes: Counter = Counter()
+        rate_limited: Counter = Counter()
+        errors = 0
+        for (route, status), count in self.calls.items():
+            if status == 429:
+                rate_limited[route] += count
+                continue
+            routes[route] += count
+            if status >= 400:
+                errors += count
+        return {"calls": sum(routes.values()), "rate_limited": sum(rate_limited.values()), "errors": errors,
+                "routes": dict(routes.most_common()), "rate_limited_routes": dict(rate_limited.most_common()),
+                "unknown": dict(self.unknown)}
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import time
+
+from discord import app_commands
+
+from state_store import BotState, bot_state
+
+# =============================================
+# SINCRONIZACIÓN DEL ÁRBOL DE COMANDOS
+# =============================================
+# Clave en bot_state con la huella del último árbol sincronizado
+FINGERPRINT_KEY = "command_tree_fingerprint"
+
+# FORCE_COMMAND_SYNC=1 sincroniza aunque la huella no haya cambiado
+FORCE_SYNC = os.getenv('FORCE_COMMAND_SYNC', '').lower() in ('1', 'true', 'yes')
+
+_SIMPLE_TYPES = (str, int, float, bool, type(None), tuple, list, frozenset)
+
+
+def _check_signature(check) -> dict:
+    """Descripción estable de un check (nombre y argumentos capturados, p. ej. roles)"""
+    captured = []
+    for cell in getattr(check, "__closure__", None) or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            continue
+        captured.append(repr(value) if isinstance(value, _SIMPLE_TYPES) else type(value).__name__)
+    return {"check": getattr(check, "__qualname__", type(check).__name__), "captured": captured}
+
+
+def _command_signature(command) -> dict:
+    data = command.to_dict()
+    data["checks"] = [_check_signature(check) for check in getattr(command, "checks", ())]
+    if isinstance(command, app_commands.Group):
+        data["subcommands"] = [_command_signature(child) for child in command.commands]
+    return data
+
+
+def tree_fingerprint(tree: app_commands.CommandTree, application_id: int | None = None) -> str:
+    """Huella SHA-256 de los comandos globales registrados.
+
+    Incluye lo que se envía a Discord (nombres, descripciones, opciones y
+    permisos) y los checks locales, ordenado para que no dependa del orden
+    de registro.
+    """
+    commands = sorted((_command_signature(command) for command in tree.get_commands()),
+                      key=lambda data: (data.get("type", 1), data["name"]))
+    payload = {"application_id": application_id, "commands": commands}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def sync_command_tree(tree: app_commands.CommandTree, application_id: int | None = None,
+                            state: BotState = bot_state, force: bool = FORCE_SYNC) -> tuple[bool, float]:
+    """Sincronizar el árbol solo si cambió desde la última sincronización.
+
+    Devuelve ``(sincronizado, segundos)``. La huella se guarda después de
+    una sincronización correcta, así que un fallo se reintenta en el
+    siguiente arranque.
+    """
+    start = time.perf_counter()
+    fingerprint = tree_fingerprint(tree, application_id)
+    if not force and state.get(FINGERPRINT_KEY) == fingerprint:
+        return False, time.perf_counter() - start
+
+    await tree.sync()
+    await state.set(FINGERPRINT_KEY, fingerprint)
+    return True, time.perf_counter() - start
@@ -0,0 +1,803 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# =============================================
+# PERSISTENCIA (SQLite)
+# =============================================
+DB_PATH = 'santiagoGuard.db'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS advertencias (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    admin_id TEXT NOT NULL,
+    admin_name TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    proof_url TEXT,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Historial por usuario: el filtro, el orden (timestamp, id) y el conteo se
+-- resuelven en el índice (el id es el rowid, incluido en toda entrada)
+CREATE INDEX IF NOT EXISTS idx_advertencias_usuario_fecha ON advertencias (user_id, timestamp);
+
+-- Resúmenes diarios de advertencias por usuario y por staff. Se actualizan en
+-- la misma transacción que cada inserción; los rankings de N días leen solo
+-- las filas (día, usuario) de esos días en vez de recorrer todo el historial
+CREATE TABLE IF NOT EXISTS warning_daily_users (
+    day TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    warnings INTEGER NOT NULL,
+    PRIMARY KEY (day, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS warning_daily_admins (
+    day TEXT NOT NULL,
+    admin_id TEXT NOT NULL,
+    admin_name TEXT NOT NULL,
+    warnings INTEGER NOT NULL,
+    PRIMARY KEY (day, admin_id)
+);
+
+-- Totales acumulados por usuario y por staff, mantenidos igual que los
+-- diarios: el ranking de todo el historial lee las primeras entradas del
+-- índice por número de advertencias
+CREATE TABLE IF NOT EXISTS warning_user_totals (
+    user_id TEXT PRIMARY KEY,
+    user_name TEXT NOT NULL,
+    warnings INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_warning_user_totals_ranking ON warning_user_totals (warnings DESC, user_id);
+
+CREATE TABLE IF NOT EXISTS warning_admin_totals (
+    admin_id TEXT PRIMARY KEY,
+    admin_name TEXT NOT NULL,
+    warnings INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_warning_admin_totals_ranking ON warning_admin_totals (warnings DESC, admin_id);
+
+-- Resúmenes por generar en segundo plano ('daily': diarios, 'totals':
+-- totales): faltan por contar las advertencias con id <= pending_id
+CREATE TABLE IF NOT EXISTS warning_rollup_backfill (
+    rollup TEXT PRIMARY KEY,
+    pending_id INTEGER NOT NULL
+);
+
+-- Sanciones aplicadas por la escalera automática (reverted_* al deshacerlas)
+CREATE TABLE IF NOT EXISTS sanctions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    action TEXT NOT NULL,
+    warnings INTEGER NOT NULL,
+    warning_id INTEGER,
+    duration_seconds INTEGER,
+    applied_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    reverted_by TEXT,
+    reverted_at DATETIME
+);
+
+-- Entregas pendientes (DM y logs) de cada advertencia. Se insertan en la
+-- misma transacción que la advertencia; las entregadas se borran y las que
+-- agotan los reintentos quedan con failed_at y el último error
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    target_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    warning_id INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    failed_at DATETIME
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_pendientes ON outbox (next_attempt_at) WHERE failed_at IS NULL;
+
+CREATE TABLE IF NOT EXISTS ticket_sequences (
+    category TEXT PRIMARY KEY,
+    last_number INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tickets (
+    channel_id TEXT PRIMARY KEY,
+    number INTEGER,
+    category TEXT,
+    opener_id TEXT,
+    claimed_by TEXT,
+    claimed_at DATETIME,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    closed_by TEXT,
+    closed_at DATETIME,
+    close_reason TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_tickets_categoria ON tickets (category, number);
+
+CREATE TABLE IF NOT EXISTS ticket_participants (
+    channel_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    added_by TEXT NOT NULL,
+    added_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (channel_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS ticket_transcripts (
+    channel_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    messages INTEGER NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS bot_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+'''
+
+# Columnas de ``advertencias`` en el orden de exportación e importación
+WARNING_COLUMNS = ('id', 'user_id', 'user_name', 'admin_id', 'admin_name', 'reason', 'proof_url', 'timestamp')
+
+# Ids de advertencias contados por transacción al generar los resúmenes en
+# segundo plano: cada tramo ocupa el hilo de la base de datos ~0,1 s, así que
+# ninguna consulta del bot espera más que eso mientras se generan
+ROLLUP_BACKFILL_CHUNK = 5_000
+
+# Cada cuánto se informa del progreso de la generación (segundos)
+ROLLUP_BACKFILL_REPORT = 10.0
+
+# Sentencias de cada resumen para un tramo de ids ``(id > ?, id <= ?)``. Los
+# tramos van del más reciente al más antiguo y un conflicto solo suma, así
+# que cada fila conserva el último nombre conocido
+_ROLLUP_BACKFILL_SQL = {
+    'daily': ('''
+    INSERT INTO warning_daily_users (day, user_id, user_name, warnings)
+    SELECT day, user_id, user_name, warnings FROM (
+        SELECT date(timestamp) AS day, user_id, user_name, COUNT(*) AS warnings, MAX(id)
+        FROM advertencias WHERE id > ? AND id <= ? GROUP BY day, user_id
+    ) WHERE true
+    ON CONFLICT(day, user_id) DO UPDATE SET warnings = warnings + excluded.warnings
+    ''', '''
+    INSERT INTO warning_daily_admins (day, admin_id, admin_name, warnings)
+    SELECT day, admin_id, admin_name, warnings FROM (
+        SELECT date(timestamp) AS day, admin_id, admin_name, COUNT(*) AS warnings, MAX(id)
+        FROM advertencias WHERE id > ? AND id <= ? GROUP BY day, admin_id
+    ) WHERE true
+    ON CONFLICT(day, admin_id) DO UPDATE SET warnings = warnings + excluded.warnings
+    '''),
+    'totals': ('''
+    INSERT INTO warning_user_totals (user_id, user_name, warnings)
+    SELECT user_id, user_name, warnings FROM (
+        SELECT user_id, user_name, COUNT(*) AS warnings, MAX(id)
+        FROM advertencias WHERE id > ? AND id <= ? GROUP BY user_id
+    ) WHERE true
+    ON CONFLICT(user_id) DO UPDATE SET warnings = warnings + excluded.warnings
+    ''', '''
+    INSERT INTO warning_admin_totals (admin_id, admin_name, warnings)
+    SELECT admin_id, admin_name, warnings FROM (
+        SELECT admin_id, admin_name, COUNT(*) AS warnings, MAX(id)
+        FROM advertencias WHERE id > ? AND id <= ? GROUP BY admin_id
+    ) WHERE true
+    ON CONFLICT(admin_id) DO UPDATE SET warnings = warnings + excluded.warnings
+    '''),
+}
+
+
+class Database:
+    """Conexión SQLite única en modo WAL atendida por un hilo dedicado.
+
+    Todas las consultas se ejecutan en un ``ThreadPoolExecutor`` de un solo
+    hilo, de modo que el event loop nunca se bloquea esperando al disco y la
+    conexión nunca se comparte entre hilos.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._rollup_backfill: asyncio.Task | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    @property
+    def rollups_ready(self) -> bool:
+        """False mientras se generan en segundo plano los resúmenes de advertencias"""
+        return self._rollup_backfill is None or self._rollup_backfill.done()
+
+    async def connect(self):
+        """Abrir la conexión y crear el esquema (idempotente)"""
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="santiagoGuard-db")
+        if await self.run(self._open):
+            self._rollup_backfill = asyncio.create_task(self._backfill_rollups())
+
+    def _open(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.executescript(SCHEMA)
+        conn.commit()
+        self._conn = conn
+        
+        # Bases anteriores a los resúmenes o a los totales: anotar que faltan
+        # por contar todas las advertencias actuales; las nuevas ya se cuentan
+        # al insertarlas. Devuelve el mayor id pendiente (0 si no falta nada)
+        with conn:
+            for rollup, table in (('daily', 'warning_daily_users'), ('totals', 'warning_user_totals')):
+                conn.execute(f'''
+                INSERT OR IGNORE INTO warning_rollup_backfill (rollup, pending_id)
+                SELECT ?, MAX(id) FROM advertencias WHERE NOT EXISTS(SELECT 1 FROM {table})
+                HAVING MAX(id) IS NOT NULL
+                ''', (rollup,))
+        return self._pending_rollup_id()
+
+    async def close(self):
+        """Cerrar la conexión y detener el hilo de la base de datos"""
+        if self._executor is None:
+            return
+        if self._rollup_backfill is not None:
+            # El progreso está en warning_rollup_backfill: se retoma al conectar
+            self._rollup_backfill.cancel()
+            await asyncio.gather(self._rollup_backfill, return_exceptions=True)
+            self._rollup_backfill = None
+        if self._conn is not None:
+            await self.run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    async def run(self, func, *args):
+        """Ejecutar ``func(*args)`` en el hilo de la base de datos"""
+        if self._executor is None:
+            raise RuntimeError("La base de datos no está conectada")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    # -----------------------------------------
+    # Advertencias
+    # -----------------------------------------
+    async def add_warning(self, user_id: int, user_name: str, admin_id: int, admin_name: str,
+                          reason: str, proof_url: str | None = None,
+                          deliveries: list[tuple[str, int, str]] = ()) -> int:
+        """Registrar una advertencia y devolver su id.
+
+        ``deliveries`` son entregas ``(tipo, destino, payload JSON)`` que se
+        encolan en ``outbox`` en la misma transacción.
+        """
+        def _insert():
+            with self._conn:
+                warning_id, day = self._conn.execute('''
+                INSERT INTO advertencias (user_id, user_name, admin_id, admin_name, reason, proof_url)
+                VALUES (?, ?, ?, ?, ?, ?)
+                RETURNING id, date(timestamp)
+                ''', (str(user_id), user_name, str(admin_id), admin_name, reason, proof_url)).fetchone()
+                self._conn.execute('''
+                INSERT INTO warning_daily_users (day, user_id, user_name, warnings) VALUES (?, ?, ?, 1)
+                ON CONFLICT(day, user_id) DO UPDATE SET warnings = warnings + 1, user_name = excluded.user_name
+                ''', (day, str(user_id), user_name))
+                self._conn.execute('''
+                INSERT INTO warning_daily_admins (day, admin_id, admin_name, warnings) VALUES (?, ?, ?, 1)
+                ON CONFLICT(day, admin_id) DO UPDATE SET warnings = warnings + 1, admin_name = excluded.admin_name
+                ''', (day, str(admin_id), admin_name))
+                self._conn.execute('''
+                INSERT INTO warning_user_totals (user_id, user_name, warnings) VALUES (?, ?, 1)
+                ON CONFLICT(user_id) DO UPDATE SET warnings = warnings + 1, user_name = excluded.user_name
+                ''', (str(user_id), user_name))
+                self._conn.execute('''
+                INSERT INTO warning_admin_totals (admin_id, admin_name, warnings) VALUES (?, ?, 1)
+                ON CONFLICT(admin_id) DO UPDATE SET warnings = warnings + 1, admin_name = excluded.admin_name
+                ''', (str(admin_id), admin_name))
+                now = time.time()
+                self._conn.executemany('''
+                INSERT INTO outbox (kind, target_id, payload, warning_id, next_attempt_at) VALUES (?, ?, ?, ?, ?)
+                ''', [(kind, str(target_id), payload, warning_id, now) for kind, target_id, payload in deliveries])
+            return warning_id
+
+        return await self.run(_insert)
+
+    async def count_warnings(self, user_id: int) -> int:
+        """Número de advertencias de un usuario (solo recorre el índice)"""
+        def _count():
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM advertencias WHERE user_id = ?', (str(user_id),)
+            ).fetchone()[0]
+
+        return await self.run(_count)
+
+    async def warnings_page(self, user_id: int, limit: int, *, before: tuple[str, int] | None = None,
+                            after: tuple[str, int] | None = None) -> tuple[list[tuple], bool]:
+        """Una página del historial de un usuario, más recientes primero.
+
+        Devuelve filas ``(id, admin_name, reason, proof_url, timestamp)`` y si
+        quedan más en la dirección pedida. La paginación es por clave
+        ``(timestamp, id)``: ``before`` da las advertencias anteriores a esa
+        clave y ``after`` las posteriores, así que cada página cuesta lo mismo
+        sin importar su profundidad (no hay ``OFFSET``).
+        """
+        def _select():
+            columns = 'SELECT id, admin_name, reason, proof_url, timestamp FROM advertencias WHERE user_id = ?'
+            if after is not None:
+                rows = self._conn.execute(f'''
+                {columns} AND (timestamp, id) > (?, ?)
+                ORDER BY timestamp ASC, id ASC LIMIT ?
+                ''', (str(user_id), *after, limit + 1)).fetchall()
+                return rows[:limit][::-1], len(rows) > limit
+
+            if before is not None:
+                rows = self._conn.execute(f'''
+                {columns} AND (timestamp, id) < (?, ?)
+                ORDER BY timestamp DESC, id DESC LIMIT ?
+                ''', (str(user_id), *before, limit + 1)).fetchall()
+            else:
+                rows = self._conn.execute(f'''
+                {columns}
+                ORDER BY timestamp DESC, id DESC LIMIT ?
+                ''', (str(user_id), limit + 1)).fetchall()
+            return rows[:limit], len(rows) > limit
+
+        return await self.run(_select)
+
+    async def warning_counts(self) -> list[tuple[str, int]]:
+        """Número de advertencias de cada usuario (recorre solo el índice)"""
+        def _select():
+            return self._conn.execute(
+                'SELECT user_id, COUNT(*) FROM advertencias GROUP BY user_id'
+            ).fetchall()
+
+        return await self.run(_select)
+
+    async def top_warned_users(self, days: int | None, limit: int = 10) -> list[tuple[str, str, int]]:
+        """Usuarios con más advertencias en los últimos ``days`` días (hoy incluido).
+
+        Devuelve ``(user_id, user_name, advertencias)``. Con ``days`` suma las
+        filas diarias de ese intervalo (su coste crece con los usuarios
+        advertidos en esos días, no con el historial); con ``None`` lee los
+        totales acumulados por el índice del ranking, en tiempo constante.
+        """
+        if days is None:
+            return await self.run(self._top_from_totals, 'warning_user_totals', 'user_id', 'user_name', limit)
+        return await self.run(self._top_from_rollup, 'warning_daily_users', 'user_id', 'user_name', days, limit)
+
+    async def top_warning_admins(self, days: int | None, limit: int = 10) -> list[tuple[str, str, int]]:
+        """Staff que más advertencias emitió en los últimos ``days`` días (``None``: todo el historial)"""
+        if days is None:
+            return await self.run(self._top_from_totals, 'warning_admin_totals', 'admin_id', 'admin_name', limit)
+        return await self.run(self._top_from_rollup, 'warning_daily_admins', 'admin_id', 'admin_name', days, limit)
+
+    def _top_from_totals(self, table: str, id_column: str, name_column: str, limit: int):
+        return self._conn.execute(f'''
+        SELECT {id_column}, {name_column}, warnings FROM {table}
+        ORDER BY warnings DESC, {id_column} LIMIT ?
+        ''', (limit,)).fetchall()
+
+    def _top_from_rollup(self, table: str, id_column: str, name_column: str, days: int, limit: int):
+        # Con un único MAX() en la consulta, SQLite toma el nombre de la fila
+        # del día más reciente (el último nombre conocido)
+        return [(key, name, total) for key, name, total, _ in self._conn.execute(f'''
+        SELECT {id_column}, {name_column}, SUM(warnings) AS total, MAX(day)
+        FROM {table}
+        WHERE day >= date('now', ?)
+        GROUP BY {id_column}
+        ORDER BY total DESC, {id_column} LIMIT ?
+        ''', (f'-{days - 1} days', limit))]
+
+    async def wait_for_rollups(self):
+        """Esperar a que termine la generación en segundo plano de los resúmenes, si la hay"""
+        if self._rollup_backfill is not None:
+            await asyncio.shield(self._rollup_backfill)
+
+    async def _backfill_rollups(self):
+        """Generar por tramos los resúmenes que faltan sin bloquear el resto de consultas.
+
+        Cada tramo es una transacción corta en el hilo de la base de datos,
+        así que las advertencias y consultas del bot se intercalan entre
+        tramos. Se cuenta del id más reciente al más antiguo; lo insertado
+        mientras tanto ya suma al guardarse.
+        """
+        total = remaining = await self.run(self._pending_rollup_id)
+        start = reported = time.perf_counter()
+        print(f"⏳ Generando los resúmenes de advertencias en segundo plano ({total} ids por contar)")
+        try:
+            while remaining:
+                remaining = await self.run(self._backfill_rollup_chunk)
+                if remaining and time.perf_counter() - reported >= ROLLUP_BACKFILL_REPORT:
+                    reported = time.perf_counter()
+                    print(f"⏳ Resúmenes de advertencias: {100 * (total - remaining) / total:.0f}% "
+                          f"({reported - start:.0f}s)")
+        except Exception as e:
+            print(f"❌ Error al generar los resúmenes de advertencias (se reintentará al arrancar): {e}")
+            return
+        print(f"✅ Resúmenes de advertencias generados en {time.perf_counter() - start:.1f}s")
+
+    def _pending_rollup_id(self) -> int:
+        return self._conn.execute(
+            'SELECT COALESCE(MAX(pending_id), 0) FROM warning_rollup_backfill'
+        ).fetchone()[0]
+
+    def _backfill_rollup_chunk(self) -> int:
+        """Contar un tramo de ids de cada resumen pendiente; devuelve el mayor id que queda"""
+        with self._conn:
+            for rollup, pending_id in self._conn.execute(
+                'SELECT rollup, pending_id FROM warning_rollup_backfill'
+            ).fetchall():
+                low = max(0, pending_id - ROLLUP_BACKFILL_CHUNK)
+                for sql in _ROLLUP_BACKFILL_SQL[rollup]:
+                    self._conn.execute(sql, (low, pending_id))
+                if low:
+                    self._conn.execute(
+                        'UPDATE warning_rollup_backfill SET pending_id = ? WHERE rollup = ?', (low, rollup)
+                    )
+                else:
+                    self._conn.execute('DELETE FROM warning_rollup_backfill WHERE rollup = ?', (rollup,))
+            return self._pending_rollup_id()
+
+    async def rebuild_warning_rollups(self) -> int:
+        """Regenerar los resúmenes diarios y los totales desde ``advertencias``; devuelve las advertencias contadas"""
+        return await self.run(self._rebuild_warning_rollups)
+
+    def _rebuild_warning_rollups(self) -> int:
+        with self._conn:
+            self._conn.execute('DELETE FROM warning_daily_users')
+            self._conn.execute('DELETE FROM warning_daily_admins')
+            self._conn.execute('DELETE FROM warning_user_totals')
+            self._conn.execute('DELETE FROM warning_admin_totals')
+            # La reconstrucción cuenta todo: nada queda pendiente para segundo plano
+            self._conn.execute('DELETE FROM warning_rollup_backfill')
+            # Igual que arriba: MAX(id) hace que el nombre sea el de la última advertencia del día
+            self._conn.execute('''
+            INSERT INTO warning_daily_users (day, user_id, user_name, warnings)
+            SELECT day, user_id, user_name, warnings FROM (
+                SELECT date(timestamp) AS day, user_id, user_name, COUNT(*) AS warnings, MAX(id)
+                FROM advertencias GROUP BY day, user_id
+            )
+            ''')
+            self._conn.execute('''
+            INSERT INTO warning_daily_admins (day, admin_id, admin_name, warnings)
+            SELECT day, admin_id, admin_name, warnings FROM (
+                SELECT date(timestamp) AS day, admin_id, admin_name, COUNT(*) AS warnings, MAX(id)
+                FROM advertencias GROUP BY day, admin_id
+            )
+            ''')
+            # Los totales salen de los diarios, mucho más pequeños que el historial
+            self._conn.execute('''
+            INSERT INTO warning_user_totals (user_id, user_name, warnings)
+            SELECT user_id, user_name, warnings FROM (
+                SELECT user_id, user_name, SUM(warnings) AS warnings, MAX(day)
+                FROM warning_daily_users GROUP BY user_id
+            )
+            ''')
+            self._conn.execute('''
+            INSERT INTO warning_admin_totals (admin_id, admin_name, warnings)
+            SELECT admin_id, admin_name, warnings FROM (
+                SELECT admin_id, admin_name, SUM(warnings) AS warnings, MAX(day)
+                FROM warning_daily_admins GROUP BY admin_id
+            )
+            ''')
+            return self._conn.execute('SELECT COALESCE(SUM(warnings), 0) FROM warning_daily_users').fetchone()[0]
+
+    def iter_warning_batches(self, batch_size: int):
+        """Recorrer ``advertencias`` por id en lotes de ``fetchmany``.
+
+        Generador síncrono pensado para otro hilo: abre su propia conexión de
+        solo lectura, así que en modo WAL lee una instantánea coherente sin
+        ocupar el hilo de la base de datos ni bloquear las escrituras.
+        """
+        conn = sqlite3.connect(Path(self.path).resolve().as_uri() + '?mode=ro', uri=True)
+        try:
+            cursor = conn.execute(f'SELECT {", ".join(WARNING_COLUMNS)} FROM advertencias ORDER BY id')
+            while rows := cursor.fetchmany(batch_size):
+                yield rows
+        finally:
+            conn.close()
+
+    async def import_warnings(self, batches) -> tuple[int, int]:
+        """Importar lotes de filas ``WARNING_COLUMNS`` en una sola transacción.
+
+        Los lotes se cargan con ``executemany`` en una tabla temporal; se
+        descartan los ids que ya existen (y los repetidos en la entrada), se
+        suman a los resúmenes diarios y a los totales y se copian a ``advertencias``. Los lotes
+        se consumen en el hilo de la base de datos, que queda ocupado hasta
+        terminar. Devuelve ``(leídas, insertadas)``.
+        """
+        columns = ', '.join(WARNING_COLUMNS)
+
+        def _import():
+            with self._conn:
+                self._conn.execute('''
+                CREATE TEMP TABLE IF NOT EXISTS warnings_import (
+                    id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, user_name TEXT NOT NULL,
+                    admin_id TEXT NOT NULL, admin_name TEXT NOT NULL, reason TEXT NOT NULL,
+                    proof_url TEXT, timestamp DATETIME NOT NULL
+                )
+                ''')
+                self._conn.execute('DELETE FROM warnings_import')
+                read = 0
+                for batch in batches:
+                    self._conn.executemany(
+                        f'INSERT OR IGNORE INTO warnings_import ({columns}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', batch
+                    )
+                    read += len(batch)
+                self._conn.execute('DELETE FROM warnings_import WHERE id IN (SELECT id FROM advertencias)')
+
+                # "WHERE true" evita que SQLite lea el ON CONFLICT como parte del SELECT. Los ids
+                # que la generación en segundo plano tiene pendientes los contará ella
+                pending = dict(self._conn.execute('SELECT rollup, pending_id FROM warning_rollup_backfill'))
+                self._conn.execute('''
+                INSERT INTO warning_daily_users (day, user_id, user_name, warnings)
+                SELECT day, user_id, user_name, warnings FROM (
+                    SELECT date(timestamp) AS day, user_id, user_name, COUNT(*) AS warnings, MAX(id)
+                    FROM warnings_import WHERE id > ? GROUP BY day, user_id
+                ) WHERE true
+                ON CONFLICT(day, user_id) DO UPDATE SET warnings = warnings + excluded.warnings
+                ''', (pending.get('daily', 0),))
+                self._conn.execute('''
+                INSERT INTO warning_daily_admins (day, admin_id, admin_name, warnings)
+                SELECT day, admin_id, admin_name, warnings FROM (
+                    SELECT date(timestamp) AS day, admin_id, admin_name, COUNT(*) AS warnings, MAX(id)
+                    FROM warnings_import WHERE id > ? GROUP BY day, admin_id
+                ) WHERE true
+                ON CONFLICT(day, admin_id) DO UPDATE SET warnings = warnings + excluded.warnings
+                ''', (pending.get('daily', 0),))
+                self._conn.execute('''
+                INSERT INTO warning_user_totals (user_id, user_name, warnings)
+                SELECT user_id, user_name, warnings FROM (
+                    SELECT user_id, user_name, COUNT(*) AS warnings, MAX(id)
+                    FROM warnings_import WHERE id > ? GROUP BY user_id
+                ) WHERE true
+                ON CONFLICT(user_id) DO UPDATE SET warnings = warnings + excluded.warnings
+                ''', (pending.get('totals', 0),))
+                self._conn.execute('''
+                INSERT INTO warning_admin_totals (admin_id, admin_name, warnings)
+                SELECT admin_id, admin_name, warnings FROM (
+                    SELECT admin_id, admin_name, COUNT(*) AS warnings, MAX(id)
+                    FROM warnings_import WHERE id > ? GROUP BY admin_id
+                ) WHERE true
+                ON CONFLICT(admin_id) DO UPDATE SET warnings = warnings + excluded.warnings
+                ''', (pending.get('totals', 0),))
+                inserted = self._conn.execute(
+                    f'INSERT INTO advertencias ({columns}) SELECT {columns} FROM warnings_import'
+                ).rowcount
+                self._conn.execute('DELETE FROM warnings_import')
+            return read, inserted
+
+        return await self.run(_import)
+
+    # -----------------------------------------
+    # Entregas pendientes (outbox)
+    # -----------------------------------------
+    async def due_deliveries(self, kind: str, now: float, limit: int) -> list[tuple]:
+        """Entregas de un tipo listas para intentarse: ``(id, kind, target_id, payload, warning_id, attempts)``"""
+        def _select():
+            return self._conn.execute('''
+            SELECT id, kind, target_id, payload, warning_id, attempts FROM outbox
+            WHERE failed_at IS NULL AND next_attempt_at <= ? AND kind = ?
+            ORDER BY next_attempt_at, id LIMIT ?
+            ''', (now, kind, limit)).fetchall()
+
+        return await self.run(_select)
+
+    async def next_delivery_at(self, kind: str) -> float | None:
+        """Momento (epoch) de la próxima entrega pendiente de un tipo, o None si no hay"""
+        def _select():
+            return self._conn.execute(
+                'SELECT MIN(next_attempt_at) FROM outbox WHERE failed_at IS NULL AND kind = ?', (kind,)
+            ).fetchone()[0]
+
+        return await self.run(_select)
+
+    async def finish_deliveries(self, delivered: list[int], retries: list[tuple[float, str, int]],
+                                failed: list[tuple[str, int]]):
+        """Guardar el resultado de una ronda de entregas.
+
+        Las entregadas se borran; los reintentos ``(next_at, error, id)`` y
+        las fallidas ``(error, id)`` suman un intento.
+        """
+        def _update():
+            with self._conn:
+                self._conn.executemany('DELETE FROM outbox WHERE id = ?', [(id_,) for id_ in delivered])
+                self._conn.executemany('''
+                UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?
+                ''', retries)
+                self._conn.executemany('''
+                UPDATE outbox SET attempts = attempts + 1, last_error = ?, failed_at = CURRENT_TIMESTAMP WHERE id = ?
+                ''', failed)
+
+        await self.run(_update)
+
+    async def outbox_counts(self) -> tuple[int, int]:
+        """``(pendientes, fallidas)`` del outbox"""
+        def _select():
+            return self._conn.execute(
+                'SELECT COUNT(*) FILTER (WHERE failed_at IS NULL), COUNT(failed_at) FROM outbox'
+            ).fetchone()
+
+        return await self.run(_select)
+
+    # -----------------------------------------
+    # Sanciones automáticas
+    # -----------------------------------------
+    async def add_sanction(self, user_id: int, user_name: str, action: str, warnings: int,
+                           warning_id: int | None, duration_seconds: int | None) -> int:
+        """Registrar una sanción aplicada y devolver su id"""
+        def _insert():
+            with self._conn:
+                cursor = self._conn.execute('''
+                INSERT INTO sanctions (user_id, user_name, action, warnings, warning_id, duration_seconds)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''', (str(user_id), user_name, action, warnings, warning_id, duration_seconds))
+            return cursor.lastrowid
+
+        return await self.run(_insert)
+
+    async def get_sanction(self, sanction_id: int) -> tuple | None:
+        """``(user_id, user_name, action, warnings, reverted_at)`` de una sanción"""
+        def _select():
+            return self._conn.execute(
+                'SELECT user_id, user_name, action, warnings, reverted_at FROM sanctions WHERE id = ?',
+                (sanction_id,)
+            ).fetchone()
+
+        return await self.run(_select)
+
+    async def sanction_thresholds(self) -> list[tuple[str, int, bool]]:
+        """``(user_id, advertencias, revertida)`` de cada sanción automática aplicada"""
+        def _select():
+            return self._conn.execute(
+                'SELECT user_id, warnings, reverted_at IS NOT NULL FROM sanctions'
+            ).fetchall()
+
+        return await self.run(_select)
+
+    async def revert_sanction(self, sanction_id: int, staff_id: int) -> bool:
+        """Marcar una sanción como revertida; False si ya lo estaba"""
+        def _update():
+            with self._conn:
+                cursor = self._conn.execute('''
+                UPDATE sanctions SET reverted_by = ?, reverted_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND reverted_at IS NULL
+                ''', (str(staff_id), sanction_id))
+            return cursor.rowcount == 1
+
+        return await self.run(_update)
+
+    # -----------------------------------------
+    # Tickets
+    # -----------------------------------------
+    async def next_ticket_number(self, category: str, used: int = 0) -> int:
+        """Reservar el siguiente número de ticket de una categoría (una sola sentencia atómica).
+
+        La primera vez que se usa una categoría la secuencia empieza después
+        del mayor número ya ocupado: el de ``tickets`` o ``used`` (el que
+        indiquen los canales existentes), el que sea mayor.
+        """
+        def _next():
+            with self._conn:
+                return self._conn.execute('''
+                INSERT INTO ticket_sequences (category, last_number)
+                SELECT ?, MAX(?, COALESCE(MAX(number), 0)) + 1 FROM tickets WHERE category = ?
+                ON CONFLICT(category) DO UPDATE SET last_number = last_number + 1
+                RETURNING last_number
+                ''', (category, used, category)).fetchone()[0]
+
+        return await self.run(_next)
+
+    async def insert_ticket(self, channel_id: int, number: int | None, category: str | None,
+                            opener_id: int | None) -> str:
+        """Registrar un ticket abierto y devolver su fecha de creación"""
+        def _insert():
+            with self._conn:
+                self._conn.execute('''
+                INSERT OR IGNORE INTO tickets (channel_id, number, category, opener_id)
+                VALUES (?, ?, ?, ?)
+                ''', (str(channel_id), number, category, None if opener_id is None else str(opener_id)))
+            return self._conn.execute(
+                'SELECT created_at FROM tickets WHERE channel_id = ?', (str(channel_id),)
+            ).fetchone()[0]
+
+        return await self.run(_insert)
+
+    async def claim_ticket(self, channel_id: int, staff_id: int) -> bool:
+        """Reclamar un ticket solo si nadie lo ha reclamado (compare-and-set)"""
+        def _claim():
+            with self._conn:
+                cursor = self._conn.execute('''
+                UPDATE tickets SET claimed_by = ?, claimed_at = CURRENT_TIMESTAMP
+                WHERE channel_id = ? AND claimed_by IS NULL
+                ''', (str(staff_id), str(channel_id)))
+            return cursor.rowcount == 1
+
+        return await self.run(_claim)
+
+    async def close_ticket(self, channel_id: int, closed_by: int, reason: str):
+        """Marcar un ticket como cerrado"""
+        def _close():
+            with self._conn:
+                self._conn.execute('''
+                UPDATE tickets SET closed_by = ?, closed_at = CURRENT_TIMESTAMP, close_reason = ?
+                WHERE channel_id = ? AND closed_at IS NULL
+                ''', (str(closed_by), reason, str(channel_id)))
+
+        await self.run(_close)
+
+    async def add_ticket_participant(self, channel_id: int, user_id: int, added_by: int):
+        def _insert():
+            with self._conn:
+                self._conn.execute('''
+                INSERT OR IGNORE INTO ticket_participants (channel_id, user_id, added_by)
+                VALUES (?, ?, ?)
+                ''', (str(channel_id), str(user_id), str(added_by)))
+
+        await self.run(_insert)
+
+    async def record_transcript(self, channel_id: int, path: str, size: int, messages: int):
+        """Guardar la ruta y el tamaño del archivo de un ticket"""
+        def _upsert():
+            with self._conn:
+                self._conn.execute('''
+                INSERT INTO ticket_transcripts (channel_id, path, bytes, messages) VALUES (?, ?, ?, ?)
+                ON CONFLICT(channel_id) DO UPDATE SET
+                    path = excluded.path, bytes = excluded.bytes, messages = excluded.messages,
+                    created_at = CURRENT_TIMESTAMP
+                ''', (str(channel_id), path, size, messages))
+
+        await self.run(_upsert)
+
+    async def has_transcript(self, channel_id: int) -> bool:
+        def _select():
+            return self._conn.execute(
+                'SELECT 1 FROM ticket_transcripts WHERE channel_id = ?', (str(channel_id),)
+            ).fetchone() is not None
+
+        return await self.run(_select)
+
+    async def load_open_tickets(self) -> list[tuple]:
+        """Obtener (channel_id, number, category, opener_id, claimed_by, claimed_at, created_at) de los tickets abiertos"""
+        def _select():
+            return self._conn.execute('''
+            SELECT channel_id, number, category, opener_id, claimed_by, claimed_at, created_at
+            FROM tickets
+            WHERE closed_at IS NULL
+            ''').fetchall()
+
+        return await self.run(_select)
+
+    # -----------------------------------------
+    # Estado del bot
+    # -----------------------------------------
+    async def load_state(self) -> list[tuple[str, str]]:
+        """Obtener todas las claves (key, value JSON) del estado persistido"""
+        def _select():
+            return self._conn.execute('SELECT key, value FROM bot_state').fetchall()
+
+        return await self.run(_select)
+
+    async def save_state(self, key: str, value: str | None):
+        """Guardar (o borrar si ``value`` es None) una clave del estado"""
+        def _upsert():
+            with self._conn:
+                if value is None:
+                    self._conn.execute('DELETE FROM bot_state WHERE key = ?', (key,))
+                else:
+                    self._conn.execute('''
+                    INSERT INTO bot_state (key, value) VALUES (?, ?)
+                    ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = CURRENT_TIMESTAMP
+                    ''', (key, value))
+
+        await self.run(_upsert)
+
+
+db = Database()
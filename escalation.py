@@ -0,0 +1,180 @@
+import os
+from datetime import timedelta
+
+import discord
+
+from database import Database, db
+from member_directory import MemberDirectory
+
+# =============================================
+# ESCALADO AUTOMÁTICO DE SANCIONES
+# =============================================
+# Escalera "advertencias:acción[:duración]" separada por comas. Acciones:
+# "timeout" (requiere duración: 30m, 12h, 7d; máximo 28 días), "kick" y "ban".
+# Cada escalón se aplica al alcanzar exactamente su número de advertencias, y
+# como mucho una vez por usuario. Una cadena vacía desactiva el escalado; una
+# no válida también lo desactiva (con un error en el log al arrancar), para
+# no aplicar sanciones que nadie configuró.
+DEFAULT_ESCALATION_SPEC = '3:timeout:24h,5:kick'
+ESCALATION_SPEC = os.getenv('WARNING_ESCALATION', DEFAULT_ESCALATION_SPEC)
+ACTIONS = ("timeout", "kick", "ban")
+MAX_TIMEOUT = timedelta(days=28)
+_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_duration(text: str) -> timedelta:
+    """``"30m"``, ``"12h"`` o ``"7d"`` a ``timedelta``"""
+    unit = _UNITS.get(text[-1:].lower())
+    if unit is None or not text[:-1].isdigit():
+        raise ValueError(f"Duración no válida: {text!r} (usa 30m, 12h o 7d)")
+    return timedelta(**{unit: int(text[:-1])})
+
+
+class EscalationStep:
+    """Un escalón de la escalera: acción que se aplica al llegar a ``threshold`` advertencias"""
+    __slots__ = ("threshold", "action", "duration")
+
+    def __init__(self, threshold: int, action: str, duration: timedelta | None = None):
+        self.threshold = threshold
+        self.action = action
+        self.duration = duration
+
+    def describe(self) -> str:
+        if self.action == "timeout":
+            return f"aislamiento de {format_duration(self.duration)}"
+        return {"kick": "expulsión", "ban": "baneo"}[self.action]
+
+
+def format_duration(duration: timedelta) -> str:
+    minutes = int(duration.total_seconds()) // 60
+    for size, unit in ((1440, "d"), (60, "h")):
+        if minutes % size == 0:
+            return f"{minutes // size}{unit}"
+    return f"{minutes}m"
+
+
+def parse_ladder(spec: str) -> dict[int, EscalationStep]:
+    """Escalera de ``WARNING_ESCALATION`` indexada por número de advertencias"""
+    ladder = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        threshold, _, rest = entry.partition(":")
+        action, _, duration = rest.partition(":")
+        if not threshold.isdigit() or int(threshold) < 1 or action not in ACTIONS:
+            raise ValueError(f"Escalón no válido: {entry!r} (usa advertencias:{'|'.join(ACTIONS)}[:duración])")
+        step = EscalationStep(int(threshold), action)
+        if action == "timeout":
+            if not duration:
+                raise ValueError(f"El aislamiento necesita duración: {entry!r}")
+            step.duration = parse_duration(duration)
+            if not timedelta(0) < step.duration <= MAX_TIMEOUT:
+                raise ValueError(f"Discord solo permite aislamientos de hasta 28 días: {entry!r}")
+        ladder[step.threshold] = step
+    return ladder
+
+
+class WarningEscalator:
+    """Contadores de advertencias por usuario en memoria y escalera de sanciones.
+
+    Los contadores se cargan una vez al arrancar (una lectura agrupada sobre
+    el índice de ``advertencias``) y se incrementan con cada advertencia
+    registrada, así que decidir si toca sancionar no consulta la base de
+    datos. Cada sanción automática queda en la tabla ``sanctions`` para
+    poder deshacerla con ``/deshacer-sancion``; deshacerla descuenta la
+    advertencia que la provocó, y el escalón ya usado no vuelve a aplicarse.
+    """
+
+    def __init__(self, database: Database = db):
+        self._db = database
+        self.ladder: dict[int, EscalationStep] = {}
+        self._counts: dict[int, int] = {}
+        # Escalones ya aplicados (o revertidos) por usuario: (user_id, advertencias)
+        self._used: set[tuple[int, int]] = set()
+
+    def configure(self, spec: str = ESCALATION_SPEC):
+        """Leer la escalera; si ``spec`` no es válida se avisa y el escalado queda desactivado"""
+        try:
+            self.ladder = parse_ladder(spec)
+        except ValueError as e:
+            print(f"❌ WARNING_ESCALATION no válida: {e}")
+            print("❌ ESCALADO AUTOMÁTICO DESACTIVADO hasta corregir WARNING_ESCALATION y reiniciar")
+            self.ladder = {}
+
+    async def load(self):
+        """Cargar el número de advertencias de cada usuario y los escalones ya usados"""
+        counts = {int(user_id): count for user_id, count in await self._db.warning_counts()}
+        used = set()
+        for user_id, warnings, reverted in await self._db.sanction_thresholds():
+            used.add((int(user_id), warnings))
+            if reverted and counts.get(int(user_id), 0) > 0:
+                counts[int(user_id)] -= 1
+        self._counts, self._used = counts, used
+
+    def count(self, user_id: int) -> int:
+        return self._counts.get(user_id, 0)
+
+    def record(self, user_id: int) -> EscalationStep | None:
+        """Contar una advertencia ya guardada y devolver el escalón alcanzado, si hay"""
+        count = self._counts.get(user_id, 0) + 1
+        self._counts[user_id] = count
+        step = self.ladder.get(count)
+        if step is None or (user_id, count) in self._used:
+            return None
+        return step
+
+    async def apply(self, member: discord.Member, step: EscalationStep, warning_id: int | None) -> int:
+        """Aplicar un escalón en Discord y registrarlo; devuelve el id de la sanción.
+
+        El escalón solo cuenta como usado si se aplicó y quedó en ``sanctions``,
+        igual que lo reconstruye ``load`` al arrancar.
+        """
+        reason = f"Escalado automático: {step.threshold} advertencias"
+        if step.action == "timeout":
+            await member.timeout(step.duration, reason=reason)
+        elif step.action == "kick":
+            await member.kick(reason=reason)
+        else:
+            await member.ban(reason=reason, delete_message_seconds=0)
+        sanction_id = await self._db.add_sanction(
+            member.id, member.name, step.action, step.threshold, warning_id,
+            int(step.duration.total_seconds()) if step.duration else None
+        )
+        self._used.add((member.id, step.threshold))
+        return sanction_id
+
+    async def undo(self, guild: discord.Guild, sanction_id: int, staff_id: int,
+                   directory: MemberDirectory) -> tuple | None:
+        """Deshacer una sanción automática.
+
+        Quita el aislamiento o el baneo en Discord y la marca como revertida.
+        Una expulsión no se puede revertir en Discord: solo se marca (el
+        usuario puede volver a entrar con una invitación). La advertencia que
+        la provocó deja de contar para la escalera (el contador baja en uno;
+        ``load`` hace lo mismo al arrancar) y ese escalón no se vuelve a
+        aplicar. El miembro se resuelve con el directorio de miembros del
+        servidor (caché y caché negativa antes que REST). Devuelve la fila
+        ``(user_id, user_name, action, warnings)`` o ``None`` si no existe o
+        ya estaba revertida.
+        """
+        sanction = await self._db.get_sanction(sanction_id)
+        if sanction is None or sanction[4] is not None:
+            return None
+        user_id, user_name, action, warnings, _ = sanction
+        reason = f"Sanción automática #{sanction_id} revertida por {staff_id}"
+        if action == "timeout":
+            member = await directory.resolve(guild, int(user_id))
+            if member is not None:  # si ya no está en el servidor no hay nada que quitar
+                await member.timeout(None, reason=reason)
+        elif action == "ban":
+            try:
+                await guild.unban(discord.Object(int(user_id)), reason=reason)
+            except discord.NotFound:
+                pass  # ya lo habían desbaneado a mano
+        if not await self._db.revert_sanction(sanction_id, staff_id):
+            return None
+        user = int(user_id)
+        self._counts[user] = max(0, self._counts.get(user, 0) - 1)
+        self._used.add((user, warnings))
+        return user_id, user_name, action, warnings
+
+
+escalator = WarningEscalator()
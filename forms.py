@@ -0,0 +1,130 @@
+import discord
+from discord import ui
+
+from metrics import interaction_metrics
+from rest_accounting import current_feature
+
+# =============================================
+# FORMULARIOS (MODALES) SIN ESTADO
+# =============================================
+# Prefijo del custom_id de los modales enrutados por FormRouter
+FORM_PREFIX = "form:"
+
+
+class FormField:
+    """Campo de texto declarativo de un formulario"""
+    __slots__ = ("key", "label", "placeholder", "style", "required")
+
+    def __init__(self, key: str, label: str, placeholder: str | None = None, long: bool = False,
+                 required: bool = True):
+        self.key = key
+        self.label = label
+        self.placeholder = placeholder
+        self.style = discord.TextStyle.long if long else discord.TextStyle.short
+        self.required = required
+
+    def optional(self, label: str | None = None) -> "FormField":
+        """Copia no obligatoria del campo (con otra etiqueta si se indica)"""
+        return FormField(self.key, label or self.label, self.placeholder,
+                         self.style is discord.TextStyle.long, required=False)
+
+    def text_input(self) -> ui.TextInput:
+        return ui.TextInput(custom_id=self.key, label=self.label, placeholder=self.placeholder,
+                            style=self.style, required=self.required)
+
+
+class Form:
+    """Formulario con nombre; su modal se construye una vez y se reutiliza"""
+
+    def __init__(self, name: str, title: str, fields: list[FormField]):
+        self.name = name
+        self.title = title
+        self.fields = list(fields)
+        self._modal: ui.Modal | None = None
+
+    @property
+    def custom_id(self) -> str:
+        return FORM_PREFIX + self.name
+
+    def modal(self) -> ui.Modal:
+        """Plantilla del modal para ``send_modal``.
+
+        La plantilla se detiene al crearla: discord.py no guarda en su
+        ``ViewStore`` los modales terminados, así que abrir el formulario no
+        deja ningún objeto ni coroutine esperando el envío. La respuesta llega
+        como una interacción nueva con el ``custom_id`` del formulario.
+        """
+        if self._modal is None:
+            modal = ui.Modal(title=self.title, custom_id=self.custom_id, timeout=None)
+            for field in self.fields:
+                modal.add_item(field.text_input())
+            modal.stop()
+            self._modal = modal
+        return self._modal
+
+    def labelled(self, values: dict[str, str]) -> dict[str, str]:
+        """Valores enviados indexados por la etiqueta de cada campo"""
+        return {field.label: values.get(field.key, "") for field in self.fields}
+
+
+def submitted_values(interaction: discord.Interaction) -> dict[str, str]:
+    """Valores de un envío de modal por custom_id del campo"""
+    values = {}
+    for row in interaction.data.get("components", []):
+        for component in row.get("components", []):
+            values[component["custom_id"]] = component.get("value", "")
+    return values
+
+
+class FormRouter:
+    """Enruta los envíos de formularios a su manejador por ``custom_id``.
+
+    Los manejadores reciben ``(interaction, form, values)``; todo el contexto
+    (canal, usuario, mensaje del botón) viene en la propia interacción del
+    envío, de modo que la memoria no depende de cuántos formularios haya
+    abiertos a la vez.
+    """
+
+    def __init__(self):
+        self._routes: dict[str, tuple[Form, object, str]] = {}
+
+    def register(self, form: Form, handler, feature: str = "formularios"):
+        self._routes[form.custom_id] = (form, handler, feature)
+
+    def handler(self, form: Form, feature: str = "formularios"):
+        """Decorador equivalente a ``register``"""
+        def decorator(func):
+            self.register(form, func, feature)
+            return func
+        return decorator
+
+    async def dispatch(self, interaction: discord.Interaction) -> bool:
+        """Atender un envío de formulario; devuelve False si no es de un formulario registrado"""
+        if interaction.type is not discord.InteractionType.modal_submit:
+            return False
+        route = self._routes.get(interaction.data.get("custom_id", ""))
+        if route is None:
+            return False
+
+        form, handler, feature = route
+        current_feature.set(feature)
+        timer = interaction_metrics.begin(interaction, form.custom_id, "modal")
+        try:
+            await handler(interaction, form, submitted_values(interaction))
+        except Exception as e:
+            interaction_metrics.error(timer)
+            print(f"Error en formulario {form.name}: {e}")
+            message = "❌ Ocurrió un error al procesar el formulario."
+            try:
+                if interaction.response.is_done():
+                    await interaction.followup.send(message, ephemeral=True)
+                else:
+                    await interaction.response.send_message(message, ephemeral=True)
+            except discord.HTTPException:
+                pass
+        finally:
+            interaction_metrics.finish(timer)
+        return True
+
+
+form_router = FormRouter()
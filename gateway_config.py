@@ -0,0 +1,57 @@
+import os
+
+import discord
+
+# =============================================
+# CONFIGURACIÓN DEL GATEWAY Y LA CACHÉ
+# =============================================
+# "full": todas las intenciones y caché por defecto (comportamiento original)
+# "lean": solo lo que usan los manejadores, chunking de miembros en segundo plano
+CACHE_MODES = ("full", "lean")
+
+
+def lean_intents() -> discord.Intents:
+    """Intenciones mínimas que necesitan los comandos y eventos del bot"""
+    intents = discord.Intents.none()
+    intents.guilds = True   # canales, categorías y roles en caché
+    intents.members = True  # altas, bajas, actualizaciones y chunking de miembros
+    return intents
+
+
+def gateway_options(mode: str) -> dict:
+    """Opciones de ``commands.Bot`` para el modo de caché indicado"""
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Modo de caché desconocido: {mode!r} (usa {', '.join(CACHE_MODES)})")
+
+    if mode == "full":
+        return {"intents": discord.Intents.all()}
+
+    intents = lean_intents()
+    member_cache_flags = discord.MemberCacheFlags.none()
+    member_cache_flags.joined = True  # solo miembros recibidos por chunking o al unirse
+    return {
+        "intents": intents,
+        "member_cache_flags": member_cache_flags,
+        "max_messages": None,              # no leemos nunca la caché de mensajes
+        "chunk_guilds_at_startup": False,  # on_ready no espera al chunking
+    }
+
+
+def current_rss_mib() -> float:
+    """Memoria residente actual del proceso en MiB"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Sin /proc: máximo histórico (KiB en Linux), no disponible en Windows
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+CACHE_MODE = os.getenv('BOT_CACHE_MODE', 'full').lower()
@@ -0,0 +1,152 @@
+import asyncio
+
+import discord
+
+# =============================================
+# ENVÍO AGRUPADO DE LOGS
+# =============================================
+# Discord admite hasta 10 embeds y 6000 caracteres de embeds por mensaje
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+# Espera máxima de un log antes de enviarse si el lote no se llena
+FLUSH_INTERVAL = 2.0
+
+# Logs pendientes por canal a partir de los cuales quien registra espera
+MAX_PENDING = 200
+
+# Tiempo máximo para vaciar las colas al apagar el bot
+CLOSE_TIMEOUT = 15.0
+
+_STOP = object()
+
+
+def pack_embeds(embeds: list[discord.Embed]) -> list[list[discord.Embed]]:
+    """Repartir embeds en mensajes respetando los límites de Discord"""
+    messages: list[list[discord.Embed]] = []
+    current: list[discord.Embed] = []
+    chars = 0
+    for embed in embeds:
+        size = len(embed)
+        if current and (len(current) >= MAX_EMBEDS or chars + size > MAX_EMBED_CHARS):
+            messages.append(current)
+            current, chars = [], 0
+        current.append(embed)
+        chars += size
+    if current:
+        messages.append(current)
+    return messages
+
+
+class LogSink:
+    """Cola de logs por canal que agrupa hasta 10 embeds en un solo mensaje.
+
+    Un trabajador por canal envía el lote en cuanto se llena o cuando el
+    primer log lleva ``flush_interval`` segundos esperando. Si un canal
+    acumula ``max_pending`` logs, ``log`` espera hasta que haya sitio
+    (contrapresión) en lugar de crecer sin límite. ``close`` envía todo lo
+    pendiente antes de apagar.
+    """
+
+    def __init__(self, get_channel, channel_ids=(), flush_interval: float = FLUSH_INTERVAL,
+                 max_pending: int = MAX_PENDING):
+        self._get_channel = get_channel
+        self.channel_ids = tuple(channel_ids)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queues: dict[int, asyncio.Queue] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self._closing = False
+        self.stats = {"queued": 0, "messages": 0, "embeds": 0, "dropped": 0, "backpressure": 0}
+
+    def start(self):
+        """Lanzar los trabajadores de los canales configurados"""
+        for channel_id in self.channel_ids:
+            self._queue(channel_id)
+
+    def _queue(self, channel_id: int) -> asyncio.Queue:
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = asyncio.Queue(maxsize=self.max_pending)
+        worker = self._workers.get(channel_id)
+        if worker is None or worker.done():
+            self._workers[channel_id] = asyncio.create_task(self._drain(channel_id, queue))
+        return queue
+
+    async def log(self, channel_id: int, embed: discord.Embed):
+        """Encolar un embed para el canal (espera si la cola está llena)"""
+        if self._closing:
+            # Ya no hay trabajadores: enviarlo directamente
+            await self._send(channel_id, [embed])
+            return
+        queue = self._queue(channel_id)
+        if queue.full():
+            self.stats["backpressure"] += 1
+        await queue.put(embed)
+        self.stats["queued"] += 1
+
+    def pending(self) -> int:
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    async def _drain(self, channel_id: int, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        stop = False
+        while not stop:
+            item = await queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            # Llenar el lote hasta 10 embeds o hasta que venza el intervalo
+            while len(batch) < MAX_EMBEDS:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = queue.get_nowait()
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            await self._send(channel_id, batch)
+
+    async def _send(self, channel_id: int, embeds: list[discord.Embed]):
+        channel = self._get_channel(channel_id)
+        if channel is None:
+            self.stats["dropped"] += len(embeds)
+            print(f"Canal de logs {channel_id} no encontrado, {len(embeds)} logs descartados")
+            return
+        for group in pack_embeds(embeds):
+            try:
+                await channel.send(embeds=group)
+            except discord.HTTPException as e:
+                self.stats["dropped"] += len(group)
+                print(f"Error al enviar {len(group)} logs a {channel_id}: {e}")
+                continue
+            self.stats["messages"] += 1
+            self.stats["embeds"] += len(group)
+
+    async def close(self, timeout: float = CLOSE_TIMEOUT):
+        """Enviar los logs pendientes y detener los trabajadores"""
+        self._closing = True
+        for queue in self._queues.values():
+            await queue.put(_STOP)
+        workers = list(self._workers.values())
+        if workers:
+            done, pending = await asyncio.wait(workers, timeout=timeout)
+            for worker in pending:
+                worker.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._workers.clear()
+        lost = 0
+        for queue in self._queues.values():
+            while not queue.empty():
+                lost += queue.get_nowait() is not _STOP
+        if lost:
+            self.stats["dropped"] += lost
+            print(f"⚠️ {lost} logs sin enviar al apagar")
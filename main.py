@@ -6,42 +6,87 @@ import os
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import random
-import sqlite3
-import aiofiles
+import tempfile
+import time
+from typing import Literal
+
+from animation_scheduler import MessageAnimator
+from command_sync import sync_command_tree
+from database import db
+from escalation import EscalationStep, escalator
+from forms import Form, FormField, form_router
+from gateway_config import CACHE_MODE, current_rss_mib, gateway_options
+from log_sink import LogSink
+from member_directory import MemberCounter, MemberDirectory
+from metrics import InstrumentedCommandTree, InstrumentedView, metrics_server, record_handler_error
+from outbox import DeliveryOutbox, embed_payload
+from rename_scheduler import ChannelRenameScheduler
+from rest_accounting import current_feature, rest_accounting, rest_feature
+from state_store import bot_state
+from task_supervisor import TaskSupervisor
+from ticket_registry import ticket_registry
+import transcripts
+import warnings_archive
 
 # Cargar variables de entorno
 load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
-
-# Configuración del bot con intenciones mejoradas
-intents = discord.Intents.all()
-bot = commands.Bot(command_prefix='!', intents=intents, help_command=None)
+STARTED_AT = time.perf_counter()
+
+class SantiagoBot(commands.Bot):
+    """Bot con inicialización y cierre de recursos compartidos"""
+    async def setup_hook(self):
+        # Se ejecuta una sola vez antes de conectar al gateway
+        await setup_database()
+        await bot_state.load()
+        await ticket_registry.load()
+        escalator.configure()
+        await escalator.load()
+        with rest_feature("animaciones"):
+            animator.start()
+        with rest_feature("logs"):
+            log_sink.start()
+        with rest_feature("moderacion"):
+            outbox.start()
+        
+        # Métricas de interacciones en /metrics (puerto $PORT del proceso web)
+        try:
+            await metrics_server.start()
+            print(f"📈 Métricas en http://{metrics_server.host}:{metrics_server.port}/metrics")
+        except OSError as e:
+            print(f"❌ No se pudo iniciar el servidor de métricas: {e}")
+        
+        # Vistas persistentes: los componentes se enrutan por custom_id, así que
+        # los paneles y tickets publicados antes del reinicio siguen funcionando
+        for view in (ControlPanelView(), TicketActionsView(), TicketCreationView()):
+            self.add_view(view)
+
+    async def close(self):
+        # Enviar los logs pendientes mientras la sesión HTTP sigue abierta
+        await outbox.close()
+        await log_sink.close()
+        await super().close()
+        await supervisor.close()
+        await metrics_server.close()
+        await animator.close()
+        await rename_scheduler.close()
+        await db.close()
+
+# Configuración del bot: BOT_CACHE_MODE=full (todas las intenciones) o lean
+# Cada petición REST pasa por rest_accounting (ruta, bucket, 429 y funcionalidad)
+bot = SantiagoBot(command_prefix='!', help_command=None, tree_cls=InstrumentedCommandTree,
+                  http_trace=rest_accounting.trace_config(), **gateway_options(CACHE_MODE))
+metrics_server.collectors.append(rest_accounting.render)
 
 # =============================================
 # CONFIGURACIÓN DE BASE DE DATOS
 # =============================================
 
 async def setup_database():
-    """Configurar la base de datos SQLite"""
-    conn = sqlite3.connect('santiagoGuard.db')
-    cursor = conn.cursor()
-    
-    # Crear tabla de advertencias si no existe
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS advertencias (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id TEXT NOT NULL,
-        user_name TEXT NOT NULL,
-        admin_id TEXT NOT NULL,
-        admin_name TEXT NOT NULL,
-        reason TEXT NOT NULL,
-        proof_url TEXT,
-        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    """Configurar la base de datos SQLite (conexión persistente en modo WAL)"""
+    if db.connected:
+        return
+    await db.connect()
     print("✅ Base de datos configurada correctamente")
 
 # =============================================
@@ -74,125 +119,282 @@ class Roles:
     MODERATOR = 1357151555916271622
     SUPPORT = 1357151555916271618
 
-# Categorías de tickets con emojis únicos
+# Campos reutilizables de los formularios de tickets
+ROBLOX_USERNAME = FormField("roblox_username", "Tu nombre en Roblox", "Ej: SantiagoRP_Player")
+PROOF_LINK = FormField("proof_link", "Link de pruebas", "Ej: https://imgur.com/...")
+OPTIONAL_PROOF_LINK = PROOF_LINK.optional("Link de pruebas (opcional)")
+GENERAL_HELP_FIELDS = [
+    ROBLOX_USERNAME,
+    FormField("issue", "Describe tu problema", "Sé lo más detallado posible...", long=True),
+]
+
+# Categorías de tickets con emojis únicos ("fields": formulario que se muestra al elegirla)
 TICKET_CATEGORIES = {
     "general_help": {
         "id": 1363245252990865468,
         "emoji": "🧩",
         "color": Colors.PRIMARY,
         "title": "Ayuda General",
-        "description": "Para cualquier duda o problema general del servidor"
+        "description": "Para cualquier duda o problema general del servidor",
+        "form_title": "🧩 Solicitud de Ayuda",
+        "fields": GENERAL_HELP_FIELDS
     },
     "municipality": {
         "id": 1363241205269528838,
         "emoji": "🏛️",
         "color": Colors.MUNICIPALITY,
         "title": "Municipalidad",
-        "description": "Trámites municipales, licencias, propiedades"
+        "description": "Trámites municipales, licencias, propiedades",
+        "form_title": "🏛️ Trámite Municipal",
+        "fields": [
+            ROBLOX_USERNAME,
+            FormField("procedure", "¿Qué trámite necesitas?", "Licencia, registro de vehículo, propiedad...", long=True),
+            FormField("details", "Detalles adicionales", long=True, required=False),
+        ]
     },
     "purchases": {
         "id": 1363245072509960464,
         "emoji": "🛍️",
         "color": Colors.SUCCESS,
         "title": "Compras",
-        "description": "Problemas con compras, beneficios o paquetes VIP"
+        "description": "Problemas con compras, beneficios o paquetes VIP",
+        "form_title": "🛍️ Ticket de Compras",
+        "fields": [
+            ROBLOX_USERNAME,
+            FormField("issue", "Razón del ticket", "Describe tu problema con la compra...", long=True),
+            FormField("payment_proof", "Link del comprobante de pago (opcional)", "Ej: https://imgur.com/...",
+                      required=False),
+        ]
     },
     "benefits": {
         "id": 1363245136561045534,
         "emoji": "🎁",
         "color": Colors.INFO,
         "title": "Beneficios",
-        "description": "Reclamos o consultas sobre beneficios especiales"
+        "description": "Reclamos o consultas sobre beneficios especiales",
+        "form_title": "🎁 Reclamo de Beneficios",
+        "fields": [
+            ROBLOX_USERNAME,
+            FormField("benefits", "Beneficios a reclamar", "Detalla qué beneficios quieres reclamar...", long=True),
+            OPTIONAL_PROOF_LINK,
+        ]
     },
     "alliances": {
         "id": 1363245200524312627,
         "emoji": "🤝",
         "color": Colors.PRIMARY,
         "title": "Alianzas",
-        "description": "Solicitudes de alianzas entre facciones/empresas"
+        "description": "Solicitudes de alianzas entre facciones/empresas",
+        "form_title": "🤝 Solicitud de Alianza",
+        "fields": [
+            FormField("server_name", "Nombre del servidor", "Ej: Los Santos RP"),
+            FormField("owner_name", "Nombre de Discord del dueño", "Ej: Username#1234"),
+            FormField("server_link", "Link del servidor", "Ej: https://discord.gg/..."),
+        ]
     },
     "doubts": {
         "id": 1363245252990865468,
         "emoji": "💭",
         "color": Colors.WARNING,
         "title": "Dudas",
-        "description": "Consultas sobre reglas, mecánicas o funcionamiento"
+        "description": "Consultas sobre reglas, mecánicas o funcionamiento",
+        "form_title": "💭 Dudas",
+        "fields": GENERAL_HELP_FIELDS
     },
     "appeals": {
         "id": 1363245304106848557,
         "emoji": "📜",
         "color": Colors.APPEALS,
         "title": "Apelaciones",
-        "description": "Apelar sanciones, baneos o advertencias"
+        "description": "Apelar sanciones, baneos o advertencias",
+        "form_title": "📜 Apelación",
+        "fields": [
+            ROBLOX_USERNAME,
+            FormField("appeal_type", "Tipo de apelación", "Sanción, Baneo o Advertencia"),
+            FormField("appeal_reason", "Razón de la apelación", "Explica por qué deberías ser despenalizado...",
+                      long=True),
+            OPTIONAL_PROOF_LINK,
+        ]
     },
     "reports": {
         "id": 1363245369730797759,
         "emoji": "⚠️",
         "color": Colors.REPORTS,
         "title": "Reportes",
-        "description": "Reportar jugadores, bugs o problemas graves"
+        "description": "Reportar jugadores, bugs o problemas graves",
+        "form_title": "⚠️ Reporte",
+        "fields": [
+            FormField("reported_name", "Nombre de la persona a reportar", "Ej: SantiagoRP_Player"),
+            FormField("report_type", "Tipo de reporte", "Usuario o Staff"),
+            FormField("report_reason", "Razón del reporte", "Describe detalladamente el problema...", long=True),
+            OPTIONAL_PROOF_LINK,
+        ]
     },
     "illegal_faction": {
         "id": 1363245470197088336,
         "emoji": "🕵️",
         "color": Colors.ILLEGAL,
         "title": "Facción Ilegal",
-        "description": "Registro o consultas de facciones ilegales"
+        "description": "Registro o consultas de facciones ilegales",
+        "form_title": "🕵️ Facción Ilegal",
+        "fields": [
+            ROBLOX_USERNAME,
+            FormField("faction_description", "Descripción de la facción",
+                      "Describe el propósito y actividades de la facción...", long=True),
+            FormField("discord_link", "Link de Discord de la facción", "Ej: https://discord.gg/..."),
+        ]
     },
     "robbery_claim": {
         "id": 1363245526396436611,
         "emoji": "🚔",
         "color": Colors.DANGER,
         "title": "Reclamo Robo",
-        "description": "Reportar robos o pérdida de items/vehículos"
+        "description": "Reportar robos o pérdida de items/vehículos",
+        "form_title": "🚔 Reclamo de Robo",
+        "fields": [
+            ROBLOX_USERNAME,
+            FormField("involved_players", "Nombres de personas involucradas",
+                      "Lista los nombres de Roblox de todos los involucrados...", long=True),
+            OPTIONAL_PROOF_LINK,
+        ]
     },
     "business_creation": {
         "id": 1363245614816563351,
         "emoji": "🏢",
         "color": Colors.LEGAL,
         "title": "Creación Empresa",
-        "description": "Solicitud para crear una empresa legal"
+        "description": "Solicitud para crear una empresa legal",
+        "form_title": "🏢 Creación de Empresa",
+        "fields": [
+            FormField("owners", "Nombre(s) de Roblox del/los dueño(s)", "Ej: SantiagoRP_Player, OtroJugador...",
+                      long=True),
+            FormField("business_description", "Descripción de la empresa",
+                      "Describe el propósito y servicios de la empresa...", long=True),
+            FormField("business_type", "Tipo de empresa", "Ej: Restaurante, Taller, Tienda..."),
+            FormField("discord_link", "Link de Discord de la empresa", "Ej: https://discord.gg/..."),
+        ]
     },
     "ck_request": {
         "id": 1363245679983464750,
         "emoji": "💀",
         "color": Colors.DANGER,
         "title": "Solicitud CK",
-        "description": "Solicitar Character Kill (muerte permanente)"
+        "description": "Solicitar Character Kill (muerte permanente)",
+        "form_title": "💀 Solicitud de CK",
+        "fields": [
+            FormField("target_name", "Nombre de la persona para CK", "Ej: SantiagoRP_Player"),
+            FormField("ck_reason", "Razón del CK", "Explica detalladamente por qué solicitas el CK...", long=True),
+            PROOF_LINK,
+        ]
     }
 }
 
-# Estado del servidor
-server_status = "indefinido"  # "abierto", "cerrado", "votacion", "indefinido"
+# Renombrados de canales con presupuesto por canal (2 cada 10 minutos)
+rename_scheduler = ChannelRenameScheduler()
+metrics_server.collectors.append(rename_scheduler.render)
+
+# Única tarea que edita todos los mensajes animados con un presupuesto global
+animator = MessageAnimator()
+
+# Logs agrupados (hasta 10 embeds por mensaje) en los canales de registro
+log_sink = LogSink(bot.get_channel, (Channels.LOGS, Channels.TICKET_LOGS))
+
+async def report_failed_delivery(kind: str, target_id: int, warning_id: int | None, error: str):
+    """Avisar en el canal de logs de un DM o log de advertencia que no se pudo entregar"""
+    target = f"el DM a <@{target_id}>" if kind == "dm" else f"el log a <#{target_id}>"
+    embed = discord.Embed(
+        title="⚠️ Entrega fallida",
+        description=f"No se pudo enviar {target} de la advertencia #{warning_id}: {error[:500]}",
+        color=Colors.WARNING,
+        timestamp=datetime.now()
+    )
+    await log_sink.log(Channels.LOGS, embed)
+
+# DM y logs de las advertencias, guardados con la advertencia y entregados en segundo plano
+outbox = DeliveryOutbox(bot, on_failure=report_failed_delivery)
+
+# Estado del servidor: "abierto", "cerrado", "votacion", "indefinido" (persistido en bot_state)
+def get_server_status() -> str:
+    return bot_state.get("server_status", "indefinido")
+
+async def set_server_status(status: str):
+    """Cambiar el estado del servidor, persistirlo y reflejarlo en el canal de estado"""
+    await bot_state.set("server_status", status)
+    await update_status_channel()
+
+# Directorios de miembros por servidor (guild_id -> directorio)
+member_directories: dict[int, MemberDirectory] = {}
+
+def get_member_directory(guild: discord.Guild) -> MemberDirectory:
+    """Obtener (o construir) el directorio de miembros de un servidor"""
+    directory = member_directories.get(guild.id)
+    if directory is None:
+        directory = member_directories[guild.id] = MemberDirectory()
+        directory.rebuild(guild.members)
+    return directory
+
+def index_guild_members(guild: discord.Guild):
+    """Indexar los miembros en caché de un servidor (directorio y contador)"""
+    member_directories.setdefault(guild.id, MemberDirectory()).rebuild(guild.members)
+    get_member_counter(guild)
+
+# Servidores cuyo chunking en segundo plano está en curso (modo lean)
+chunking_guilds: set[int] = set()
+
+async def chunk_guild_in_background(guild: discord.Guild):
+    """Descargar los miembros de un servidor sin retrasar on_ready"""
+    start = time.perf_counter()
+    try:
+        await guild.chunk(cache=True)
+    except Exception as e:
+        print(f"Error al descargar miembros de {guild.name}: {e}")
+        return
+    finally:
+        chunking_guilds.discard(guild.id)
+    
+    index_guild_members(guild)
+    print(f"👥 {len(guild.members)} miembros en caché en {time.perf_counter() - start:.1f}s "
+          f"(RSS {current_rss_mib():.0f} MiB)")
+    await update_member_count()
+
+# Contadores de miembros humanos por servidor (guild_id -> contador)
+member_counters: dict[int, MemberCounter] = {}
+
+def get_member_counter(guild: discord.Guild) -> MemberCounter:
+    """Obtener el contador de miembros de un servidor (se siembra una sola vez)"""
+    counter = member_counters.get(guild.id)
+    if counter is None:
+        counter = member_counters[guild.id] = MemberCounter()
+        counter.seed(guild.members)
+    return counter
+
+def check_member_count_drift(guild: discord.Guild) -> int:
+    """Comparar el contador con guild.member_count y recontar si se desvió"""
+    counter = get_member_counter(guild)
+    drift = counter.check_drift(guild.member_count)
+    if drift and guild.chunked:
+        print(f"⚠️ Conteo de miembros desajustado en {drift:+d}, recontando {guild.name}")
+        counter.seed(guild.members)
+    return drift
 
 # =============================================
 # COMPONENTES UI PERSONALIZADOS
 # =============================================
-class VoteStartModal(ui.Modal, title="🗳️ Iniciar Votación"):
-    votes_required = ui.TextInput(
-        label="Número de votos requeridos",
-        placeholder="Ej: 6",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    authorized_by = ui.TextInput(
-        label="Autorizado por (nombre sin @)",
-        placeholder="Ej: Nicolas",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    authorized_by_id = ui.TextInput(
-        label="ID de Discord de quien autorizó",
-        placeholder="Ej: 123456789012345678",
-        style=discord.TextStyle.short,
-        required=False
-    )
+# Funcionalidad a la que se atribuyen las llamadas REST de cada botón
+BUTTON_FEATURES = {
+    "ticket_claim": "tickets",
+    "ticket_close": "tickets",
+    "ticket_add_user": "tickets",
+    "start_server": "estado",
+    "start_vote": "estado",
+    "close_server": "estado",
+}
 
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
+# Respuesta visual de los botones:
+# "respuesta" (por defecto): la propia respuesta a la interacción (mensaje, modal o
+#   "pensando...") es el estado de espera; Discord muestra el botón cargando hasta entonces
+# "edicion": edita el mensaje a "⌛ Procesando..." antes del manejador y lo restaura después
+BUTTON_FEEDBACK = os.getenv('BUTTON_FEEDBACK', 'respuesta').lower()
 
 class GradientButton(ui.Button):
     """Botón con efecto de gradiente personalizado"""
@@ -203,14 +405,19 @@ class GradientButton(ui.Button):
         self.original_emoji = self.emoji
         
     async def callback(self, interaction: discord.Interaction):
-        # Efecto visual al hacer clic
-        self.style = discord.ButtonStyle.grey
-        self.label = "⌛ Procesando..."
-        self.emoji = None
-        try:
-            await interaction.message.edit(view=self.view)
-        except:
-            pass
+        # Cada interacción corre en su propia tarea: el valor no afecta a otras
+        current_feature.set(BUTTON_FEATURES.get(self.custom_id, "botones"))
+        
+        # Efecto visual al hacer clic (solo en modo "edicion": dos llamadas extra por clic)
+        edit_feedback = BUTTON_FEEDBACK == "edicion"
+        if edit_feedback:
+            self.style = discord.ButtonStyle.grey
+            self.label = "⌛ Procesando..."
+            self.emoji = None
+            try:
+                await interaction.message.edit(view=self.view)
+            except:
+                pass
         
         try:
             # Manejar diferentes botones según su custom_id
@@ -230,19 +437,24 @@ class GradientButton(ui.Button):
                 await super().callback(interaction)
         except Exception as e:
             print(f"Error en botón {self.custom_id}: {e}")
+            record_handler_error(interaction)
             try:
-                await interaction.followup.send("❌ Ocurrió un error al procesar tu acción.", ephemeral=True)
+                if interaction.response.is_done():
+                    await interaction.followup.send("❌ Ocurrió un error al procesar tu acción.", ephemeral=True)
+                else:
+                    await interaction.response.send_message("❌ Ocurrió un error al procesar tu acción.", ephemeral=True)
             except:
                 pass
         finally:
-            # Restaurar estado original
-            self.style = self.original_style
-            self.label = self.original_label
-            self.emoji = self.original_emoji
-            try:
-                await interaction.message.edit(view=self.view)
-            except:
-                pass
+            # Restaurar estado original (solo si se cambió)
+            if edit_feedback:
+                self.style = self.original_style
+                self.label = self.original_label
+                self.emoji = self.original_emoji
+                try:
+                    await interaction.message.edit(view=self.view)
+                except:
+                    pass
 
 class AnimatedEmbed(discord.Embed):
     """Embed con efectos visuales dinámicos"""
@@ -253,392 +465,63 @@ class AnimatedEmbed(discord.Embed):
         self.color = random.choice(self.COLORS)
         self._current_color = 0
         
-    async def animate(self, channel):
-        """Animar el embed cambiando colores"""
-        message = await channel.send(embed=self)
+    def next_frame(self) -> dict:
+        """Siguiente fotograma de la animación (argumentos para message.edit)"""
+        self.color = self.COLORS[self._current_color % len(self.COLORS)]
+        self._current_color += 1
+        return {"embed": self}
         
-        while True:
-            self.color = self.COLORS[self._current_color % len(self.COLORS)]
-            self._current_color += 1
-            try:
-                await message.edit(embed=self)
-                await asyncio.sleep(10)
-            except:
-                break
-
-# =============================================
-# MODALES INTERACTIVOS
-# =============================================
-class CloseServerModal(ui.Modal, title="🔒 Cierre del Servidor"):
-    reason = ui.TextInput(
-        label="Razón del cierre",
-        placeholder="Ej: Mantenimiento técnico, actualización...",
-        style=discord.TextStyle.long,
-        required=True
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
-
-class GeneralHelpModal(ui.Modal, title="🧩 Solicitud de Ayuda"):
-    roblox_username = ui.TextInput(
-        label="Tu nombre en Roblox",
-        placeholder="Ej: SantiagoRP_Player",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    issue = ui.TextInput(
-        label="Describe tu problema",
-        style=discord.TextStyle.long,
-        placeholder="Sé lo más detallado posible...",
-        required=True
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
-
-class MunicipalityModal(ui.Modal, title="🏛️ Trámite Municipal"):
-    roblox_username = ui.TextInput(
-        label="Tu nombre en Roblox",
-        placeholder="Ej: SantiagoRP_Player",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    procedure = ui.TextInput(
-        label="¿Qué trámite necesitas?",
-        style=discord.TextStyle.long,
-        placeholder="Licencia, registro de vehículo, propiedad...",
-        required=True
-    )
-    
-    details = ui.TextInput(
-        label="Detalles adicionales",
-        style=discord.TextStyle.long,
-        required=False
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
-
-class IllegalFactionModal(ui.Modal, title="🕵️ Creación de Facción Ilegal"):
-    faction_name = ui.TextInput(
-        label="Nombre de la Facción",
-        placeholder="Ej: Cartel del Noroeste",
-        required=True
-    )
-    
-    owners = ui.TextInput(
-        label="Dueño(s) (Roblox)",
-        placeholder="Ej: Player1, Player2, Player3",
-        style=discord.TextStyle.long,
-        required=True
-    )
-    
-    description = ui.TextInput(
-        label="Descripción de la Facción",
-        style=discord.TextStyle.long,
-        placeholder="Describe los objetivos y actividades de tu facción",
-        required=True
-    )
-    
-    discord_link = ui.TextInput(
-        label="Link de Discord de la facción",
-        placeholder="https://discord.gg/...",
-        required=True
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
-
-class CloseTicketModal(ui.Modal, title="🔒 Cerrar Ticket"):
-    reason = ui.TextInput(
-        label="Razón del cierre",
-        placeholder="Problema resuelto, usuario inactivo...",
-        style=discord.TextStyle.long,
-        required=True
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
-
-class PurchasesModal(ui.Modal, title="🛍️ Ticket de Compras"):
-    roblox_username = ui.TextInput(
-        label="Tu nombre en Roblox",
-        placeholder="Ej: SantiagoRP_Player",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    issue = ui.TextInput(
-        label="Razón del ticket",
-        style=discord.TextStyle.long,
-        placeholder="Describe tu problema con la compra...",
-        required=True
-    )
-    
-    payment_proof = ui.TextInput(
-        label="Link del comprobante de pago (opcional)",
-        style=discord.TextStyle.short,
-        placeholder="Ej: https://imgur.com/...",
-        required=False
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
-
-class BenefitsModal(ui.Modal, title="🎁 Reclamo de Beneficios"):
-    roblox_username = ui.TextInput(
-        label="Tu nombre en Roblox",
-        placeholder="Ej: SantiagoRP_Player",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    benefits = ui.TextInput(
-        label="Beneficios a reclamar",
-        style=discord.TextStyle.long,
-        placeholder="Detalla qué beneficios quieres reclamar...",
-        required=True
-    )
-    
-    proof_link = ui.TextInput(
-        label="Link de pruebas (opcional)",
-        style=discord.TextStyle.short,
-        placeholder="Ej: https://imgur.com/...",
-        required=False
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
-
-class AlliancesModal(ui.Modal, title="🤝 Solicitud de Alianza"):
-    server_name = ui.TextInput(
-        label="Nombre del servidor",
-        placeholder="Ej: Los Santos RP",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    owner_name = ui.TextInput(
-        label="Nombre de Discord del dueño",
-        placeholder="Ej: Username#1234",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    server_link = ui.TextInput(
-        label="Link del servidor",
-        placeholder="Ej: https://discord.gg/...",
-        style=discord.TextStyle.short,
-        required=True
-    )
+    def track(self, message, interval: float = 10.0) -> int:
+        """Animar un mensaje ya enviado con este embed (las ediciones las hace el planificador central)"""
+        return animator.register(message, self.next_frame, interval=interval, name=self.title)
 
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
-
-class AppealsModal(ui.Modal, title="📜 Apelación"):
-    roblox_username = ui.TextInput(
-        label="Tu nombre en Roblox",
-        placeholder="Ej: SantiagoRP_Player",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    appeal_type = ui.TextInput(
-        label="Tipo de apelación",
-        placeholder="Sanción, Baneo o Advertencia",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    appeal_reason = ui.TextInput(
-        label="Razón de la apelación",
-        style=discord.TextStyle.long,
-        placeholder="Explica por qué deberías ser despenalizado...",
-        required=True
-    )
-    
-    proof_link = ui.TextInput(
-        label="Link de pruebas (opcional)",
-        style=discord.TextStyle.short,
-        placeholder="Ej: https://imgur.com/...",
-        required=False
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
-
-class ReportsModal(ui.Modal, title="⚠️ Reporte"):
-    reported_name = ui.TextInput(
-        label="Nombre de la persona a reportar",
-        placeholder="Ej: SantiagoRP_Player",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    report_type = ui.TextInput(
-        label="Tipo de reporte",
-        placeholder="Usuario o Staff",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    report_reason = ui.TextInput(
-        label="Razón del reporte",
-        style=discord.TextStyle.long,
-        placeholder="Describe detalladamente el problema...",
-        required=True
-    )
-    
-    proof_link = ui.TextInput(
-        label="Link de pruebas (opcional)",
-        style=discord.TextStyle.short,
-        placeholder="Ej: https://imgur.com/...",
-        required=False
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
-
-class IllegalFactionModal(ui.Modal, title="🕵️ Facción Ilegal"):
-    roblox_username = ui.TextInput(
-        label="Tu nombre en Roblox",
-        placeholder="Ej: SantiagoRP_Player",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    faction_description = ui.TextInput(
-        label="Descripción de la facción",
-        style=discord.TextStyle.long,
-        placeholder="Describe el propósito y actividades de la facción...",
-        required=True
-    )
-    
-    discord_link = ui.TextInput(
-        label="Link de Discord de la facción",
-        placeholder="Ej: https://discord.gg/...",
-        style=discord.TextStyle.short,
-        required=True
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
+    async def animate(self, channel, interval: float = 10.0):
+        """Enviar el embed a ``channel`` y animarlo cambiando colores"""
+        message = await channel.send(embed=self)
+        self.track(message, interval)
+        return message
 
-class RobberyClaimModal(ui.Modal, title="🚔 Reclamo de Robo"):
-    roblox_username = ui.TextInput(
-        label="Tu nombre en Roblox",
-        placeholder="Ej: SantiagoRP_Player",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    involved_players = ui.TextInput(
-        label="Nombres de personas involucradas",
-        style=discord.TextStyle.long,
-        placeholder="Lista los nombres de Roblox de todos los involucrados...",
-        required=True
-    )
-    
-    proof_link = ui.TextInput(
-        label="Link de pruebas (opcional)",
-        style=discord.TextStyle.short,
-        placeholder="Ej: https://imgur.com/...",
-        required=False
-    )
+async def animate_response(interaction: discord.Interaction, embed: AnimatedEmbed):
+    """Animar el panel enviado como respuesta a ``interaction``.
 
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
+    Se edita por el canal (``PartialMessage``) y no por el webhook de la
+    interacción, cuyo token caduca a los 15 minutos.
+    """
+    message = await interaction.original_response()
+    embed.track(interaction.channel.get_partial_message(message.id))
 
-class BusinessCreationModal(ui.Modal, title="🏢 Creación de Empresa"):
-    roblox_username = ui.TextInput(
-        label="Nombre(s) de Roblox del/los dueño(s)",
-        style=discord.TextStyle.long,
-        placeholder="Ej: SantiagoRP_Player, OtroJugador...",
-        required=True
-    )
-    
-    business_description = ui.TextInput(
-        label="Descripción de la empresa",
-        style=discord.TextStyle.long,
-        placeholder="Describe el propósito y servicios de la empresa...",
-        required=True
-    )
-    
-    business_type = ui.TextInput(
-        label="Tipo de empresa",
-        placeholder="Ej: Restaurante, Taller, Tienda...",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    discord_link = ui.TextInput(
-        label="Link de Discord de la empresa",
-        placeholder="Ej: https://discord.gg/...",
-        style=discord.TextStyle.short,
-        required=True
-    )
-
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
+# =============================================
+# FORMULARIOS
+# =============================================
+# Un formulario por categoría de ticket, construido a partir de TICKET_CATEGORIES
+TICKET_FORMS = {
+    category: Form(f"ticket:{category}", data.get("form_title") or f"{data['emoji']} {data['title']}",
+                   data.get("fields", GENERAL_HELP_FIELDS))
+    for category, data in TICKET_CATEGORIES.items()
+}
 
-class CKRequestModal(ui.Modal, title="💀 Solicitud de CK"):
-    target_name = ui.TextInput(
-        label="Nombre de la persona para CK",
-        placeholder="Ej: SantiagoRP_Player",
-        style=discord.TextStyle.short,
-        required=True
-    )
-    
-    ck_reason = ui.TextInput(
-        label="Razón del CK",
-        style=discord.TextStyle.long,
-        placeholder="Explica detalladamente por qué solicitas el CK...",
-        required=True
-    )
-    
-    proof_link = ui.TextInput(
-        label="Link de pruebas",
-        style=discord.TextStyle.short,
-        placeholder="Ej: https://imgur.com/...",
-        required=True
-    )
+CLOSE_TICKET_FORM = Form("ticket_close", "🔒 Cerrar Ticket", [
+    FormField("reason", "Razón del cierre", "Problema resuelto, usuario inactivo...", long=True),
+])
 
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
+ADD_USER_FORM = Form("ticket_add_user", "➕ Agregar Usuario al Ticket", [
+    FormField("username", "Nombre de usuario de Discord", "Ej: Jrsmile22 (sin @)"),
+])
 
-class AddUserModal(ui.Modal, title="➕ Agregar Usuario al Ticket"):
-    username = ui.TextInput(
-        label="Nombre de usuario de Discord",
-        placeholder="Ej: Jrsmile22 (sin @)",
-        style=discord.TextStyle.short,
-        required=True
-    )
+VOTE_START_FORM = Form("vote_start", "🗳️ Iniciar Votación", [
+    FormField("votes_required", "Número de votos requeridos", "Ej: 6"),
+    FormField("authorized_by", "Autorizado por (nombre sin @)", "Ej: Nicolas"),
+    FormField("authorized_by_id", "ID de Discord de quien autorizó", "Ej: 123456789012345678", required=False),
+])
 
-    async def on_submit(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        self.interaction = interaction
+CLOSE_SERVER_FORM = Form("server_close", "🔒 Cierre del Servidor", [
+    FormField("reason", "Razón del cierre", "Ej: Mantenimiento técnico, actualización...", long=True),
+])
 
 # =============================================
 # VISTAS INTERACTIVAS
 # =============================================
-class ControlPanelView(ui.View):
+class ControlPanelView(InstrumentedView):
     """Panel de control con efectos visuales"""
     def __init__(self):
         super().__init__(timeout=None)
@@ -667,7 +550,7 @@ class ControlPanelView(ui.View):
             custom_id="close_server"
         ))
 
-class TicketActionsView(ui.View):
+class TicketActionsView(InstrumentedView):
     """Acciones para tickets con validación de roles"""
     def __init__(self):
         super().__init__(timeout=None)
@@ -706,7 +589,10 @@ class TicketActionsView(ui.View):
             return False
         return True
 
-class TicketCreationView(ui.View):
+# custom_id estable del menú de categorías de los paneles de /tickets
+TICKET_CATEGORY_SELECT = "ticket_category_select"
+
+class TicketCreationView(InstrumentedView):
     """Sistema de tickets interactivo"""
     def __init__(self):
         super().__init__(timeout=None)
@@ -722,6 +608,7 @@ class TicketCreationView(ui.View):
             ))
         
         self.select = ui.Select(
+            custom_id=TICKET_CATEGORY_SELECT,
             placeholder="🎫 Selecciona un tipo de ticket...",
             min_values=1,
             max_values=1,
@@ -732,58 +619,149 @@ class TicketCreationView(ui.View):
     
     async def on_select(self, interaction: discord.Interaction):
             """Manejar selección de categoría"""
-            category = self.select.values[0]
+            current_feature.set("tickets")
+            # La vista es compartida por todos los paneles: leer la selección de esta interacción
+            category = interaction.data["values"][0]
             
-            # Mostrar formulario dinámico según categoría
-            if category == "general_help":
-                modal = GeneralHelpModal()
-            elif category == "municipality":
-                modal = MunicipalityModal()
-            elif category == "illegal_faction":
-                modal = IllegalFactionModal()
-            elif category == "purchases":
-                modal = PurchasesModal()
-            elif category == "benefits":
-                modal = BenefitsModal()
-            elif category == "alliances":
-                modal = AlliancesModal()
-            elif category == "doubts":
-                modal = GeneralHelpModal(title="💭 Dudas")
-            elif category == "appeals":
-                modal = AppealsModal()
-            elif category == "reports":
-                modal = ReportsModal()
-            elif category == "robbery_claim":
-                modal = RobberyClaimModal()
-            elif category == "business_creation":
-                modal = BusinessCreationModal()
-            elif category == "ck_request":
-                modal = CKRequestModal()
-            else:
-                modal = GeneralHelpModal(title=f"{TICKET_CATEGORIES[category]['emoji']} {TICKET_CATEGORIES[category]['title']}")
-            
-            await interaction.response.send_modal(modal)
+            # Mostrar el formulario de la categoría; el envío llega por form_router
+            await interaction.response.send_modal(TICKET_FORMS[category].modal())
+
+async def route_legacy_ticket_panel(interaction: discord.Interaction) -> bool:
+    """Atender el menú de los paneles de /tickets publicados antes de registrar la vista.
+
+    Esos menús tienen el custom_id aleatorio que les dio discord.py, así que
+    la vista persistente no los reconoce. Se identifican por sus valores (las
+    categorías de ticket), se abre el formulario como en ``TicketCreationView``
+    y se cambia la vista del mensaje por la persistente: a partir de ahí el
+    panel se enruta por custom_id y no hace falta volver a publicarlo.
+    """
+    if interaction.type is not discord.InteractionType.component or interaction.message is None:
+        return False
+    data = interaction.data
+    values = data.get("values", [])
+    if (data.get("component_type") != discord.ComponentType.select.value
+            or data.get("custom_id") == TICKET_CATEGORY_SELECT
+            or len(values) != 1 or values[0] not in TICKET_FORMS
+            or interaction.message.author.id != bot.user.id):
+        return False
+    
+    current_feature.set("tickets")
+    await interaction.response.send_modal(TICKET_FORMS[values[0]].modal())
+    try:
+        await interaction.message.edit(view=TicketCreationView())
+    except discord.HTTPException as e:
+        print(f"No se pudo actualizar el panel de tickets {interaction.message.id}: {e}")
+    return True
+
+# Advertencias por página del historial (5 campos de hasta 1024 caracteres caben en un embed)
+WARNINGS_PAGE_SIZE = 5
+
+class WarningHistoryView(InstrumentedView):
+    """Historial de advertencias paginado: cada botón consulta solo la página pedida"""
+    def __init__(self, interaction: discord.Interaction, user: discord.abc.User, total: int,
+                 rows: list[tuple], has_older: bool):
+        super().__init__(timeout=300)
+        self.interaction = interaction
+        self.user = user
+        self.total = total
+        self.rows = rows
+        self.page = 1
+        
+        self.previous_button = ui.Button(
+            style=discord.ButtonStyle.secondary,
+            label="Anterior",
+            emoji="◀️",
+            custom_id="warnings_previous",
+            disabled=True
+        )
+        self.previous_button.callback = self.on_previous
+        self.add_item(self.previous_button)
+        
+        self.next_button = ui.Button(
+            style=discord.ButtonStyle.secondary,
+            label="Siguiente",
+            emoji="▶️",
+            custom_id="warnings_next",
+            disabled=not has_older
+        )
+        self.next_button.callback = self.on_next
+        self.add_item(self.next_button)
+    
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.total // WARNINGS_PAGE_SIZE))
+    
+    def embed(self) -> discord.Embed:
+        return warning_history_embed(self.user, self.rows, self.total, self.page, self.pages)
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Solo el staff puede pasar de página"""
+        if not any(role.id in Roles.STAFF for role in interaction.user.roles):
+            await interaction.response.send_message(
+                "❌ No tienes permisos para ver el historial de advertencias.",
+                ephemeral=True
+            )
+            return False
+        return True
+    
+    async def on_previous(self, interaction: discord.Interaction):
+        """Página con advertencias más recientes"""
+        current_feature.set("moderacion")
+        newest = self.rows[0]
+        rows, has_newer = await db.warnings_page(self.user.id, WARNINGS_PAGE_SIZE, after=(newest[4], newest[0]))
+        if rows:
+            self.rows = rows
+            self.page -= 1
+        self.previous_button.disabled = not has_newer or self.page <= 1
+        self.next_button.disabled = False
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+    
+    async def on_next(self, interaction: discord.Interaction):
+        """Página con advertencias más antiguas"""
+        current_feature.set("moderacion")
+        oldest = self.rows[-1]
+        rows, has_older = await db.warnings_page(self.user.id, WARNINGS_PAGE_SIZE, before=(oldest[4], oldest[0]))
+        if rows:
+            self.rows = rows
+            self.page += 1
+        self.previous_button.disabled = False
+        self.next_button.disabled = not has_older
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+    
+    async def on_timeout(self):
+        # Quitar los botones caducados (el token de la interacción dura 15 minutos)
+        try:
+            await self.interaction.edit_original_response(view=None)
+        except discord.HTTPException:
+            pass
+
+def warning_history_embed(user: discord.abc.User, rows: list[tuple], total: int, page: int, pages: int) -> discord.Embed:
+    """Embed con una página del historial de advertencias"""
+    embed = discord.Embed(
+        title=f"📋 Historial de Advertencias",
+        description=f"Usuario: {user.mention}\nTotal: {total} advertencia(s)",
+        color=Colors.WARNING,
+        timestamp=datetime.now()
+    )
+    
+    for adv_id, admin, razon, prueba, fecha in rows:
+        fecha_formateada = datetime.strptime(fecha, "%Y-%m-%d %H:%M:%S").strftime("%d/%m/%Y %H:%M")
+        
+        if len(razon) > 700:
+            razon = razon[:699] + "…"
+        value = f"**Razón:** {razon}\n**Admin:** {admin}\n**Fecha:** {fecha_formateada}"
+        if prueba:
+            value += f"\n**Prueba:** [Ver imagen]({prueba})"
             
-            try:
-                # Fix: Use timeout in wait_for instead of as a parameter to wait()
-                timed_out = await modal.wait()
-                if timed_out:
-                    return await interaction.followup.send("⌛ Tiempo agotado. Por favor intenta nuevamente.", ephemeral=True)
-                
-                # Procesar datos del formulario
-                data = {}
-                for child in modal.children:
-                    if isinstance(child, ui.TextInput):
-                        data[child.label] = child.value
-                
-                await create_ticket_channel(
-                    interaction=modal.interaction,
-                    category=category,
-                    data=data
-                )
-            except Exception as e:
-                print(f"Error al procesar ticket: {e}")
-                await interaction.followup.send("❌ Ocurrió un error al crear tu ticket.", ephemeral=True)
+        embed.add_field(
+            name=f"⚠️ Advertencia #{adv_id}",
+            value=value[:1024],
+            inline=False
+        )
+    
+    embed.set_thumbnail(url=user.display_avatar.url)
+    embed.set_footer(text=f"Santiago RP - Sistema de Advertencias • Página {page}/{pages} • ID: {user.id}")
+    return embed
 
 # =============================================
 # FUNCIONES PRINCIPALES
@@ -801,41 +779,59 @@ async def update_status_channel():
         "indefinido": "⚪│estado-indefinido"
     }
     
-    new_name = status_map.get(server_status, "⚪│estado-indefinido")
+    new_name = status_map.get(get_server_status(), "⚪│estado-indefinido")
     
-    if channel.name != new_name:
-        try:
-            await channel.edit(name=new_name)
-            print(f"✅ Canal de estado actualizado a: {new_name}")
-        except discord.HTTPException as e:
-            if e.status == 429:  # Rate limit error code
-                retry_after = e.retry_after or 60
-                print(f"⚠️ Rate limit alcanzado al actualizar canal de estado. Esperando {retry_after:.2f} segundos.")
-                # No intentar nuevamente para evitar más rate limits
-            else:
-                print(f"Error al actualizar canal de estado: {e}")
+    # El planificador conserva solo el último nombre y lo aplica cuando haya presupuesto
+    with rest_feature("estado"):
+        rename_scheduler.request(channel, new_name)
 
 async def update_member_count():
     """Actualizar el canal de conteo de miembros"""
     channel = bot.get_channel(Channels.MEMBER_COUNT)
-    if not channel:
+    if not channel or not channel.guild.chunked:
+        # Sin la caché completa se actualizará al terminar el chunking
         return
     
-    real_members = sum(1 for member in channel.guild.members if not member.bot)
+    real_members = get_member_counter(channel.guild).humans
     emojis = ["🌎", "👥", "🚀", "💫", "🌟"]
     emoji = emojis[real_members % len(emojis)]
     new_name = f"{emoji}│miembros-{real_members}"
     
-    if channel.name != new_name:
-        try:
-            await channel.edit(name=new_name)
-            print(f"✅ Canal de miembros actualizado a: {new_name}")
-        except discord.HTTPException as e:
-            if e.status == 429:
-                print(f"⚠️ Rate limit alcanzado al actualizar canal de miembros. Esperando {e.retry_after:.2f} segundos.")
-                # No intentar nuevamente para evitar más rate limits
-            else:
-                print(f"Error al actualizar conteo de miembros: {e}")
+    # Durante oleadas de altas/bajas solo se aplica el conteo final
+    with rest_feature("estado"):
+        rename_scheduler.request(channel, new_name)
+
+async def submit_ticket_form(interaction: discord.Interaction, form: Form, values: dict):
+    """Crear el ticket con los datos del formulario de su categoría"""
+    await interaction.response.defer(ephemeral=True)
+    category = form.name.removeprefix("ticket:")
+    await create_ticket_channel(interaction=interaction, category=category, data=form.labelled(values))
+
+for ticket_form in TICKET_FORMS.values():
+    form_router.register(ticket_form, submit_ticket_form, feature="tickets")
+
+# Tipos de ticket cuya secuencia ya se comprobó en este proceso
+seeded_ticket_sequences: set[str] = set()
+
+def used_ticket_number(guild: discord.Guild, category: str, category_info: dict) -> int:
+    """Mayor número en los canales "<tipo>-<número>-<usuario>" que ya existen en la categoría"""
+    parent = guild.get_channel(category_info.get("id"))
+    prefix = f"{category}-"
+    numbers = [
+        int(number)
+        for channel in getattr(parent, "channels", ())
+        if channel.name.startswith(prefix)
+        and (number := channel.name[len(prefix):].partition("-")[0]).isdigit()
+    ]
+    return max(numbers, default=0)
+
+async def reserve_ticket_number(guild: discord.Guild, category: str, category_info: dict) -> int:
+    """Siguiente número de ticket; la primera vez se siembra con los canales ya abiertos"""
+    if category in seeded_ticket_sequences:
+        return await db.next_ticket_number(category)
+    number = await db.next_ticket_number(category, used_ticket_number(guild, category, category_info))
+    seeded_ticket_sequences.add(category)
+    return number
 
 async def create_ticket_channel(interaction: discord.Interaction, category: str, data: dict):
     """Crear un canal de ticket profesional"""
@@ -858,9 +854,8 @@ async def create_ticket_channel(interaction: discord.Interaction, category: str,
                     manage_messages=True
                 )
         
-        # Crear el canal
-        ticket_num = len([c for c in interaction.guild.get_channel(category_info["id"]).channels 
-                         if c.name.startswith(f"{category}-")]) + 1
+        # Crear el canal (número reservado en la base de datos, por tipo de ticket)
+        ticket_num = await reserve_ticket_number(interaction.guild, category, category_info)
         channel_name = f"{category}-{ticket_num}-{interaction.user.name}"[:100]
         
         ticket_channel = await interaction.guild.create_text_channel(
@@ -868,6 +863,7 @@ async def create_ticket_channel(interaction: discord.Interaction, category: str,
             category=discord.Object(id=category_info["id"]),
             overwrites=overwrites
         )
+        await ticket_registry.open(ticket_channel.id, ticket_num, category, interaction.user.id)
         
         # Crear embed del ticket
         embed = AnimatedEmbed(
@@ -902,17 +898,15 @@ async def create_ticket_channel(interaction: discord.Interaction, category: str,
         await interaction.followup.send(embed=confirm_embed, ephemeral=True)
         
         # Enviar a logs
-        log_channel = bot.get_channel(Channels.TICKET_LOGS)
-        if log_channel:
-            log_embed = discord.Embed(
-                title=f"{category_info['emoji']} Nuevo Ticket Creado",
-                description=f"**Tipo:** {category_info['title']}\n"
-                          f"**Usuario:** {interaction.user.mention}\n"
-                          f"**Canal:** {ticket_channel.mention}",
-                color=category_info["color"],
-                timestamp=datetime.now()
-            )
-            await log_channel.send(embed=log_embed)
+        log_embed = discord.Embed(
+            title=f"{category_info['emoji']} Nuevo Ticket Creado",
+            description=f"**Tipo:** {category_info['title']}\n"
+                      f"**Usuario:** {interaction.user.mention}\n"
+                      f"**Canal:** {ticket_channel.mention}",
+            color=category_info["color"],
+            timestamp=datetime.now()
+        )
+        await log_sink.log(Channels.TICKET_LOGS, log_embed)
         
     except Exception as e:
         print(f"Error al crear ticket: {e}")
@@ -937,8 +931,7 @@ async def send_announcement(interaction: discord.Interaction, embed: discord.Emb
             color=embed.color
         )
         
-        log_channel = bot.get_channel(Channels.LOGS)
-        await log_channel.send(embed=log_embed)
+        await log_sink.log(Channels.LOGS, log_embed)
         
         return message
     except Exception as e:
@@ -960,18 +953,17 @@ async def handle_ticket_claim(interaction: discord.Interaction):
             ephemeral=True
         )
     
+    # Reclamar de forma atómica en el registro de tickets (el embed es solo visual)
+    if not await ticket_registry.claim(interaction.channel.id, interaction.user.id):
+        ticket = ticket_registry.get(interaction.channel.id)
+        claimed_by = f" por <@{ticket.claimed_by}>" if ticket and ticket.claimed else ""
+        return await interaction.response.send_message(
+            f"❌ Este ticket ya ha sido reclamado{claimed_by}.",
+            ephemeral=True
+        )
+    
     # Obtener el embed original y añadir campo de atención
     embed = interaction.message.embeds[0]
-    
-    # Verificar si ya está reclamado
-    for field in embed.fields:
-        if field.name == "🛎️ Atendido por":
-            return await interaction.response.send_message(
-                "❌ Este ticket ya ha sido reclamado.",
-                ephemeral=True
-            )
-    
-    # Añadir campo de atención
     embed.add_field(
         name="🛎️ Atendido por",
         value=interaction.user.mention,
@@ -1012,68 +1004,155 @@ async def handle_ticket_claim(interaction: discord.Interaction):
 async def handle_ticket_close(interaction: discord.Interaction):
     """Manejar cierre de ticket con confirmación"""
     # Mostrar modal para razón de cierre
-    modal = CloseTicketModal()
-    await interaction.response.send_modal(modal)
-    
-    # Esperar a que se complete el modal
-    timed_out = await modal.wait()
-    if timed_out:
-        return
+    await interaction.response.send_modal(CLOSE_TICKET_FORM.modal())
+
+@form_router.handler(CLOSE_TICKET_FORM, feature="tickets")
+async def submit_ticket_close(interaction: discord.Interaction, form: Form, values: dict):
+    """Cerrar el ticket con la razón indicada"""
+    # El envío no depende del clic en el botón: volver a comprobar el rol
+    if not any(role.id in Roles.STAFF for role in interaction.user.roles):
+        return await interaction.response.send_message(
+            "❌ No tienes permisos para cerrar este ticket.",
+            ephemeral=True
+        )
+    await interaction.response.defer(ephemeral=True)
+    reason = values["reason"]
     
     # Enviar mensaje de cierre inminente
     closing_embed = discord.Embed(
         title="🔒 Cerrando Ticket...",
-        description=f"Este ticket se cerrará en 5 segundos.\n**Razón:** {modal.reason.value}",
+        description=f"Este ticket se cerrará en 5 segundos.\n**Razón:** {reason}",
         color=Colors.DANGER
     )
-    await modal.interaction.followup.send(embed=closing_embed)
+    await interaction.followup.send(embed=closing_embed)
     
     # Enviar a logs
-    log_channel = bot.get_channel(Channels.TICKET_LOGS)
-    if log_channel:
-        log_embed = discord.Embed(
-            title="📌 Ticket Cerrado",
-            description=f"**Canal:** {interaction.channel.name}\n"
-                      f"**Cerrado por:** {interaction.user.mention}\n"
-                      f"**Razón:** {modal.reason.value}",
-            color=Colors.DANGER,
-            timestamp=datetime.now()
-        )
-        await log_channel.send(embed=log_embed)
+    log_embed = discord.Embed(
+        title="📌 Ticket Cerrado",
+        description=f"**Canal:** {interaction.channel.name}\n"
+                  f"**Cerrado por:** {interaction.user.mention}\n"
+                  f"**Razón:** {reason}",
+        color=Colors.DANGER,
+        timestamp=datetime.now()
+    )
+    await log_sink.log(Channels.TICKET_LOGS, log_embed)
+    
+    await ticket_registry.close(interaction.channel.id, interaction.user.id, reason)
+    
+    # Registrar el cierre pendiente: si el bot se reinicia se completa al arrancar
+    delete_reason = f"Cerrado por {interaction.user}. Razón: {reason}"
+    await remember_pending_close(interaction.channel.id, delete_reason, delay=5)
+    
+    # Archivar la conversación durante la cuenta atrás; el canal no se borra hasta terminar
+    archive = bot.loop.create_task(archive_ticket(interaction.channel))
     
     # Esperar 5 segundos y cerrar
     await asyncio.sleep(5)
-    try:
-        await interaction.channel.delete(
-            reason=f"Cerrado por {interaction.user}. Razón: {modal.reason.value}"
+    if not await archive:
+        # Sin transcripción el canal es la única copia: no se borra y el cierre queda pendiente
+        await report_unarchived_ticket(interaction.channel)
+        return await interaction.followup.send(
+            "⚠️ No se pudo archivar el ticket, así que el canal no se ha borrado. "
+            "El cierre se reintentará al reiniciar el bot; también puedes volver a cerrarlo.",
+            ephemeral=True
         )
+    try:
+        await interaction.channel.delete(reason=delete_reason)
     except Exception as e:
         print(f"Error al eliminar canal: {e}")
-        await modal.interaction.followup.send(
+        await interaction.followup.send(
             "❌ No se pudo eliminar el canal. Por favor, ciérralo manualmente.",
             ephemeral=True
         )
+    finally:
+        await forget_pending_close(interaction.channel.id)
+
+# Cierres de tickets pendientes (persistidos en bot_state["pending_closes"])
+closing_channels: set[int] = set()
+
+async def remember_pending_close(channel_id: int, reason: str, delay: float):
+    """Persistir un cierre de ticket antes de esperar para borrar el canal"""
+    closing_channels.add(channel_id)
+    pending = dict(bot_state.get("pending_closes", {}))
+    pending[str(channel_id)] = {"reason": reason, "delete_at": time.time() + delay}
+    await bot_state.set("pending_closes", pending)
+
+async def forget_pending_close(channel_id: int):
+    closing_channels.discard(channel_id)
+    pending = dict(bot_state.get("pending_closes", {}))
+    if pending.pop(str(channel_id), None) is not None:
+        await bot_state.set("pending_closes", pending)
+
+async def archive_ticket(channel: discord.TextChannel) -> bool:
+    """Archivar el historial del ticket y registrar el archivo antes de borrar el canal"""
+    try:
+        path, size, count = await transcripts.archive_channel(channel)
+        await db.record_transcript(channel.id, path, size, count)
+    except Exception as e:
+        print(f"Error al archivar el ticket {channel.name}: {e}")
+        return False
+    print(f"🗄️ Ticket {channel.name} archivado: {count} mensajes, {size / 1024:.1f} KiB en {path}")
+    return True
+
+async def report_unarchived_ticket(channel: discord.TextChannel):
+    """Avisar al staff de un ticket que no se borra porque no se pudo archivar"""
+    # Sigue en bot_state["pending_closes"]: se reintenta al arrancar (o al volver a cerrarlo)
+    closing_channels.discard(channel.id)
+    embed = discord.Embed(
+        title="⚠️ Ticket sin archivar",
+        description=f"**Canal:** {channel.mention}\n"
+                  f"No se pudo guardar la transcripción, así que el canal **no** se ha borrado. "
+                  f"El cierre se reintentará al reiniciar el bot.",
+        color=Colors.WARNING,
+        timestamp=datetime.now()
+    )
+    await log_sink.log(Channels.TICKET_LOGS, embed)
+
+async def complete_pending_close(channel_id: int, reason: str, delay: float):
+    """Terminar un cierre que quedó pendiente antes de un reinicio"""
+    await asyncio.sleep(delay)
+    channel = bot.get_channel(channel_id)
+    if channel and not await db.has_transcript(channel_id) and not await archive_ticket(channel):
+        return await report_unarchived_ticket(channel)
+    try:
+        if channel:
+            await channel.delete(reason=reason)
+    except discord.HTTPException as e:
+        print(f"Error al eliminar canal pendiente {channel_id}: {e}")
+    finally:
+        await forget_pending_close(channel_id)
+
+def resume_pending_closes():
+    """Reanudar los cierres de tickets persistidos"""
+    for channel_id, entry in bot_state.get("pending_closes", {}).items():
+        channel_id = int(channel_id)
+        if channel_id in closing_channels:
+            continue
+        closing_channels.add(channel_id)
+        delay = max(0.0, entry["delete_at"] - time.time())
+        with rest_feature("tickets"):
+            bot.loop.create_task(complete_pending_close(channel_id, entry["reason"], delay))
 
 async def handle_ticket_add_user(interaction: discord.Interaction):
     """Manejar agregar usuario a ticket"""
     # Mostrar modal para ingresar nombre de usuario
-    modal = AddUserModal()
-    await interaction.response.send_modal(modal)
-    
-    # Esperar a que se complete el modal
-    timed_out = await modal.wait()
-    if timed_out:
-        return
+    await interaction.response.send_modal(ADD_USER_FORM.modal())
+
+@form_router.handler(ADD_USER_FORM, feature="tickets")
+async def submit_ticket_add_user(interaction: discord.Interaction, form: Form, values: dict):
+    """Dar acceso al ticket al usuario indicado"""
+    if not any(role.id in Roles.STAFF for role in interaction.user.roles):
+        return await interaction.response.send_message(
+            "❌ No tienes permisos para agregar usuarios a este ticket.",
+            ephemeral=True
+        )
+    await interaction.response.defer(ephemeral=True)
     
     # Buscar al usuario mencionado
-    username = modal.username.value
-    member = None
+    username = values["username"]
     
     # Buscar por nombre de usuario sin discriminator
-    for guild_member in interaction.guild.members:
-        if guild_member.name.lower() == username.lower():
-            member = guild_member
-            break
+    member = await get_member_directory(interaction.guild).resolve_name(interaction.guild, username)
     
     if not member:
         error_embed = discord.Embed(
@@ -1081,7 +1160,7 @@ async def handle_ticket_add_user(interaction: discord.Interaction):
             description=f"No se encontró al usuario '{username}' en el servidor.",
             color=Colors.DANGER
         )
-        return await modal.interaction.followup.send(embed=error_embed, ephemeral=True)
+        return await interaction.followup.send(embed=error_embed, ephemeral=True)
     
     # Agregar permisos al usuario
     await interaction.channel.set_permissions(
@@ -1090,6 +1169,7 @@ async def handle_ticket_add_user(interaction: discord.Interaction):
         send_messages=True,
         view_channel=True
     )
+    await ticket_registry.add_participant(interaction.channel.id, member.id, interaction.user.id)
     
     # Confirmar la acción
     confirm_embed = discord.Embed(
@@ -1097,7 +1177,7 @@ async def handle_ticket_add_user(interaction: discord.Interaction):
         description=f"Se ha agregado a {member.mention} al ticket.",
         color=Colors.SUCCESS
     )
-    await modal.interaction.followup.send(embed=confirm_embed, ephemeral=True)
+    await interaction.followup.send(embed=confirm_embed, ephemeral=True)
     
     # Notificar en el canal del ticket
     ticket_embed = discord.Embed(
@@ -1112,8 +1192,6 @@ async def handle_ticket_add_user(interaction: discord.Interaction):
 # =============================================
 async def handle_server_start(interaction: discord.Interaction):
     """Manejar inicio del servidor"""
-    global server_status
-    
     # Verificar si el usuario tiene permisos
     if not any(role.id in Roles.STAFF for role in interaction.user.roles):
         return await interaction.response.send_message(
@@ -1121,8 +1199,11 @@ async def handle_server_start(interaction: discord.Interaction):
             ephemeral=True
         )
     
+    # Responder ya con "pensando...": el anuncio puede tardar más de 3 segundos
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    
     # Cambiar estado del servidor
-    server_status = "abierto"
+    await set_server_status("abierto")
     
     # Crear anuncio mejorado
     embed = discord.Embed(
@@ -1167,15 +1248,13 @@ async def handle_server_start(interaction: discord.Interaction):
     await send_announcement(interaction, embed, "Servidor Abierto")
     
     # Confirmar al usuario
-    await interaction.response.send_message(
+    await interaction.followup.send(
         "✅ Has abierto el servidor correctamente!",
         ephemeral=True
     )
 
 async def handle_vote_start(interaction: discord.Interaction):
     """Manejar inicio de votación para abrir el servidor"""
-    global server_status
-    
     # Verificar si el usuario tiene permisos
     if not any(role.id in Roles.STAFF for role in interaction.user.roles):
         return await interaction.response.send_message(
@@ -1184,37 +1263,39 @@ async def handle_vote_start(interaction: discord.Interaction):
         )
     
     # Mostrar modal para obtener información adicional
-    modal = VoteStartModal()
-    await interaction.response.send_modal(modal)
-    
-    # Esperar a que se complete el modal
-    timed_out = await modal.wait()
-    if timed_out:
-        return
+    await interaction.response.send_modal(VOTE_START_FORM.modal())
+
+@form_router.handler(VOTE_START_FORM, feature="estado")
+async def submit_vote_start(interaction: discord.Interaction, form: Form, values: dict):
+    """Publicar la votación con los datos del formulario"""
+    if not any(role.id in Roles.STAFF for role in interaction.user.roles):
+        return await interaction.response.send_message(
+            "❌ No tienes permisos para iniciar una votación.",
+            ephemeral=True
+        )
+    await interaction.response.defer(ephemeral=True)
     
     # Cambiar estado del servidor
-    server_status = "votacion"
+    await set_server_status("votacion")
     
     # Buscar al usuario que autorizó por nombre
+    directory = get_member_directory(interaction.guild)
     authorized_user = None
-    authorized_mention = f"@{modal.authorized_by.value}"
+    authorized_mention = f"@{values['authorized_by']}"
     
     # Si se proporcionó un ID, intentar encontrar al usuario por ID
-    if modal.authorized_by_id.value:
+    if values.get("authorized_by_id"):
         try:
-            authorized_user = await interaction.guild.fetch_member(int(modal.authorized_by_id.value))
-            if authorized_user:
-                authorized_mention = authorized_user.mention
-        except:
+            authorized_user = await directory.resolve(interaction.guild, int(values["authorized_by_id"]))
+        except (ValueError, discord.HTTPException):
             pass
     
     # Si no se encontró por ID, buscar por nombre
     if not authorized_user:
-        for member in interaction.guild.members:
-            if member.name.lower() == modal.authorized_by.value.lower():
-                authorized_user = member
-                authorized_mention = member.mention
-                break
+        authorized_user = await directory.resolve_name(interaction.guild, values["authorized_by"])
+    
+    if authorized_user:
+        authorized_mention = authorized_user.mention
     
     # Crear anuncio mejorado
     embed = discord.Embed(
@@ -1228,7 +1309,7 @@ async def handle_vote_start(interaction: discord.Interaction):
                   "• Evite forzar el rol de otros.\n\n"
                   "El incumplimiento del rol establecido será sancionado.\n\n"
                   f"**Equipo de moderación:** Activo y disponible para asistir en cualquier incidencia.\n\n"
-                  f"**Se requiere un mínimo de {modal.votes_required.value} votos para proceder con la apertura.**\n\n"
+                  f"**Se requiere un mínimo de {values['votes_required']} votos para proceder con la apertura.**\n\n"
                   f"**Reacciona con 👍 para votar a favor o 👎 para votar en contra.**",
         color=Colors.WARNING,
         timestamp=datetime.now()
@@ -1269,15 +1350,13 @@ async def handle_vote_start(interaction: discord.Interaction):
         await message.add_reaction("👎")  # Voto en contra
     
     # Confirmar al usuario
-    await modal.interaction.followup.send(
+    await interaction.followup.send(
         "✅ Has iniciado una votación correctamente!",
         ephemeral=True
     )
 
 async def handle_server_close(interaction: discord.Interaction):
     """Manejar cierre del servidor"""
-    global server_status
-    
     # Verificar si el usuario tiene permisos
     if not any(role.id in Roles.STAFF for role in interaction.user.roles):
         return await interaction.response.send_message(
@@ -1286,23 +1365,26 @@ async def handle_server_close(interaction: discord.Interaction):
         )
     
     # Mostrar modal para razón de cierre
-    modal = CloseServerModal()
-    await interaction.response.send_modal(modal)
-    
-    # Esperar a que se complete el modal
-    timed_out = await modal.wait()
-    if timed_out:
-        return
+    await interaction.response.send_modal(CLOSE_SERVER_FORM.modal())
+
+@form_router.handler(CLOSE_SERVER_FORM, feature="estado")
+async def submit_server_close(interaction: discord.Interaction, form: Form, values: dict):
+    """Cerrar el servidor con la razón indicada"""
+    if not any(role.id in Roles.STAFF for role in interaction.user.roles):
+        return await interaction.response.send_message(
+            "❌ No tienes permisos para cerrar el servidor.",
+            ephemeral=True
+        )
+    await interaction.response.defer(ephemeral=True)
     
     # Cambiar estado del servidor
-    server_status = "cerrado"
-    await update_status_channel()
+    await set_server_status("cerrado")
     
     # Crear anuncio
     embed = discord.Embed(
         title="🔒 SERVIDOR CERRADO",
         description=f"### El servidor de Santiago RP está temporalmente cerrado\n\n"
-                  f"**Razón:** {modal.reason.value}",
+                  f"**Razón:** {values['reason']}",
         color=Colors.DANGER,
         timestamp=datetime.now()
     )
@@ -1325,7 +1407,7 @@ async def handle_server_close(interaction: discord.Interaction):
     await send_announcement(interaction, embed, "Servidor Cerrado")
     
     # Confirmar al usuario
-    await modal.interaction.followup.send(
+    await interaction.followup.send(
         "✅ Has cerrado el servidor correctamente!",
         ephemeral=True
     )
@@ -1336,72 +1418,86 @@ async def handle_server_close(interaction: discord.Interaction):
 # In the on_ready event, let's modify how we handle initial updates
 @bot.event
 async def on_ready():
-    print(f'✨ {bot.user.name} está listo!')
-    
-    # Iniciar la rotación de actividades
-    bot.loop.create_task(rotate_activities())
-    
+    print(f'✨ {bot.user.name} está listo! (modo {CACHE_MODE}, '
+          f'{time.perf_counter() - STARTED_AT:.1f}s desde el arranque, RSS {current_rss_mib():.0f} MiB)')
+    current_feature.set("arranque")
+    
+    # Reconstruir los directorios de miembros con la caché recién sincronizada,
+    # o descargarlos en segundo plano si el modo lean no esperó al chunking
+    for guild in bot.guilds:
+        if guild.chunked:
+            index_guild_members(guild)
+        elif guild.id not in chunking_guilds:
+            chunking_guilds.add(guild.id)
+            bot.loop.create_task(chunk_guild_in_background(guild))
+    
+    # Sincronizar comandos solo si el árbol cambió desde la última vez
     try:
-        await bot.tree.sync()
-        print("🔁 Comandos sincronizados")
+        synced, elapsed = await sync_command_tree(bot.tree, bot.application_id)
+        if synced:
+            print(f"🔁 Comandos sincronizados en {elapsed:.2f}s")
+        else:
+            print(f"⏭️ Sincronización de comandos omitida, sin cambios ({elapsed * 1000:.0f} ms)")
     except Exception as e:
         print(f"❌ Error al sincronizar comandos: {e}")
     
-    # Actualizar canales de estado con retraso para evitar rate limits
-    bot.loop.create_task(delayed_initial_update())
+    # Completar cierres de tickets interrumpidos por un reinicio
+    resume_pending_closes()
+    
+    # Tareas periódicas: una sola instancia aunque on_ready se repita al reconectar
+    supervisor.start()
+
+# Actividades que rota el bot (cada 60 segundos)
+ACTIVITY_INTERVAL = 60
+activity_index = 0
+
+def build_activities() -> list[discord.Activity]:
+    """Actividades del bot con el total de miembros reales (no bots)"""
+    guild = bot.guilds[0]  # Obtener el primer servidor
+    if guild.chunked:
+        check_member_count_drift(guild)
+        real_members = get_member_counter(guild).humans
+    else:
+        real_members = guild.member_count  # Estimación mientras se descargan los miembros
+    
+    return [
+        discord.Activity(
+            type=discord.ActivityType.watching,
+            name=f"Santiago RP | {real_members} miembros"
+        ),
+        discord.Activity(
+            type=discord.ActivityType.playing,
+            name="Creado por Smile"
+        ),
+        discord.Activity(
+            type=discord.ActivityType.listening,
+            name="SantiagoRP | El mejor RP"
+        )
+    ]
 
 async def rotate_activities():
-    """Rotar entre diferentes actividades del bot"""
-    while True:
-        # Obtener el total de miembros reales (no bots)
-        guild = bot.get_guild(next(iter(bot.guilds)).id)  # Obtener el primer servidor
-        real_members = sum(1 for member in guild.members if not member.bot)
-        
-        activities = [
-            discord.Activity(
-                type=discord.ActivityType.watching,
-                name=f"Santiago RP | {real_members} miembros"
-            ),
-            discord.Activity(
-                type=discord.ActivityType.playing,
-                name="Creado por Smile"
-            ),
-            discord.Activity(
-                type=discord.ActivityType.listening,
-                name="SantiagoRP | El mejor RP"
-            )
-        ]
-        
-        for activity in activities:
-            await bot.change_presence(activity=activity)
-            await asyncio.sleep(60)  # Cambiar cada 60 segundos
-    
-async def delayed_initial_update():
-    """Realizar actualizaciones iniciales con retrasos para evitar rate limits"""
-    # Primero actualizar el conteo de miembros
+    """Mostrar la siguiente actividad de la rotación"""
+    global activity_index
+    activities = build_activities()
+    await bot.change_presence(activity=activities[activity_index % len(activities)])
+    activity_index += 1
+
+async def refresh_status_channels():
+    """Actualizar los canales de estado (el planificador de renombrados respeta los rate limits)"""
+    # El estado persistido se aplica de inmediato, sin redescubrirlo por REST
     await update_member_count()
-    
-    # Esperar 60 segundos antes de actualizar el canal de estado
-    await asyncio.sleep(60)
     await update_status_channel()
-    
-    # Iniciar la tarea periódica después
-    bot.loop.create_task(periodic_status_update())
 
-async def periodic_status_update():
-    """Actualizar el estado del canal periódicamente para evitar rate limits"""
-    while True:
-        try:
-            await update_status_channel()
-        except Exception as e:
-            print(f"Error en actualización periódica: {e}")
-        # Esperar 15 minutos entre actualizaciones
-        await asyncio.sleep(900)  # Aumentado a 15 minutos
+# Supervisor de tareas periódicas (se lanzan en on_ready)
+supervisor = TaskSupervisor()
+supervisor.register("actividades", rotate_activities, interval=ACTIVITY_INTERVAL)
+supervisor.register("canales-estado", refresh_status_channels, interval=900)  # cada 15 minutos
 
 @bot.tree.command(name="panel", description="Despliega el panel de control administrativo")
 @app_commands.checks.has_any_role(*Roles.STAFF)  
 async def control_panel(interaction: discord.Interaction):
     """Comando para mostrar el panel de control"""
+    current_feature.set("paneles")
     embed = AnimatedEmbed(
         title="⚙️ PANEL DE CONTROL SANTIAGO RP",
         description="Gestiona el servidor con los controles a continuación:"
@@ -1431,11 +1527,13 @@ async def control_panel(interaction: discord.Interaction):
         embed=embed,
         view=ControlPanelView()
     )
+    await animate_response(interaction, embed)
 
 @bot.tree.command(name="tickets", description="Configura el sistema de tickets")
 @app_commands.checks.has_any_role(*Roles.STAFF)
 async def setup_tickets(interaction: discord.Interaction):
     """Comando para configurar el sistema de tickets"""
+    current_feature.set("paneles")
     embed = AnimatedEmbed(
         title="🎫 SISTEMA DE TICKETS",
         description="Selecciona el tipo de ticket que necesitas:"
@@ -1478,45 +1576,133 @@ async def setup_tickets(interaction: discord.Interaction):
         embed=embed,
         view=TicketCreationView()
     )
+    await animate_response(interaction, embed)
+
+@bot.tree.command(name="animaciones", description="Lista los mensajes animados activos")
+@app_commands.checks.has_any_role(*Roles.STAFF)
+async def listar_animaciones(interaction: discord.Interaction):
+    """Comando para ver las animaciones del planificador central"""
+    animations = animator.active()
+    if not animations:
+        return await interaction.response.send_message(
+            "✅ No hay animaciones activas.",
+            ephemeral=True
+        )
+    
+    lines = [
+        f"**#{a.id}** {a.name} — cada {a.interval:.0f}s · {a.edits} ediciones, "
+        f"{a.skipped} sin cambios · [Ver mensaje]({a.jump_url})"
+        for a in animations[:25]
+    ]
+    if len(animations) > 25:
+        lines.append(f"... y {len(animations) - 25} más")
+    
+    embed = discord.Embed(
+        title="🎞️ Animaciones Activas",
+        description="\n".join(lines),
+        color=Colors.PRIMARY
+    )
+    embed.set_footer(text="Usa /detener-animacion para cancelar una animación")
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="detener-animacion", description="Detiene un mensaje animado")
+@app_commands.describe(animacion="ID de la animación (ver /animaciones)")
+@app_commands.checks.has_any_role(*Roles.STAFF)
+async def detener_animacion(interaction: discord.Interaction, animacion: int):
+    """Comando para cancelar una animación activa"""
+    if not animator.cancel(animacion):
+        return await interaction.response.send_message(
+            f"❌ No existe la animación #{animacion}.",
+            ephemeral=True
+        )
+    await interaction.response.send_message(
+        f"✅ Animación #{animacion} detenida.",
+        ephemeral=True
+    )
+
+@bot.tree.command(name="tareas", description="Muestra el estado de las tareas en segundo plano")
+@app_commands.checks.has_any_role(*Roles.STAFF)
+async def estado_tareas(interaction: discord.Interaction):
+    """Comando para ver la salud de las tareas supervisadas"""
+    embed = discord.Embed(title="⚙️ Tareas en Segundo Plano", color=Colors.PRIMARY)
+    for job in supervisor.jobs():
+        status = "🟢 Activa" if job.running else "🔴 Detenida"
+        if job.consecutive_failures:
+            status = f"🟠 Reintentando ({job.consecutive_failures} fallos seguidos)"
+        last_run = f"<t:{int(job.last_run.timestamp())}:R>" if job.last_run else "Nunca"
+        duration = f"{job.last_duration * 1000:.0f} ms" if job.last_duration is not None else "-"
+        value = (f"{status}\nÚltima ejecución: {last_run} ({duration})\n"
+                 f"Ejecuciones: {job.runs} · Fallos: {job.failures} · Reinicios: {job.restarts}")
+        if job.last_error:
+            value += f"\nÚltimo error: `{job.last_error[:200]}`"
+        embed.add_field(name=job.name, value=value, inline=False)
+    
+    pending, failed = await db.outbox_counts()
+    embed.add_field(
+        name="Entregas de advertencias (DM y logs)",
+        value=(f"{'🟢 Activa' if outbox.running else '🔴 Detenida'} · Pendientes: {pending} · Fallidas: {failed}\n"
+               f"Entregadas: {outbox.stats['delivered']} · Reintentos: {outbox.stats['retried']}"),
+        inline=False
+    )
+    renames = rename_scheduler.stats
+    embed.add_field(
+        name="Renombrado de canales",
+        value=(f"Pendientes: {len(rename_scheduler.pending())} · Aplicados: {renames['applied']} · "
+               f"Coalescidos: {renames['coalesced']} · Diferidos: {renames['deferred']} · Fallidos: {renames['failed']}"),
+        inline=False
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="llamadas-api", description="Muestra el uso de la API de Discord por funcionalidad")
+@app_commands.checks.has_any_role(*Roles.STAFF)
+async def llamadas_api(interaction: discord.Interaction):
+    """Comando para ver qué funcionalidades consumen los rate limits"""
+    window_min = rest_accounting.window / 60
+    embed = discord.Embed(title="📡 Uso de la API de Discord", color=Colors.PRIMARY)
+    
+    usage = rest_accounting.feature_usage()
+    embed.add_field(
+        name=f"Por funcionalidad (últimos {window_min:.0f} min · total · 429)",
+        value="\n".join(f"**{feature}**: {recent} · {total} · {limited}"
+                        for feature, recent, total, limited in usage) or "Sin llamadas",
+        inline=False
+    )
+    embed.add_field(
+        name="Rutas más usadas",
+        value="\n".join(f"`{route}`: {count}" for route, count in rest_accounting.top_routes(10)) or "Sin llamadas",
+        inline=False
+    )
+    
+    # Buckets casi agotados según la última respuesta de cada ruta
+    low = sorted(
+        ((route, remaining, limit) for route, (_, remaining, limit, _) in rest_accounting.buckets.items()
+         if limit and remaining <= limit // 4),
+        key=lambda item: item[1]
+    )
+    if low:
+        embed.add_field(
+            name="Buckets casi agotados",
+            value="\n".join(f"`{route}`: {remaining}/{limit}" for route, remaining, limit in low[:10]),
+            inline=False
+        )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
 
 # Función de autocompletado para usuarios
 async def usuario_autocompletar(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
     """Autocompletar usuarios del servidor basado en lo que el usuario está escribiendo"""
-    members = interaction.guild.members
     choices = []
     
-    # Si no hay texto de búsqueda, mostrar algunos miembros recientes o destacados
-    if not current:
-        # Obtener algunos miembros para mostrar por defecto (limitado a 25)
-        for member in list(members)[:25]:
-            if not member.bot:  # Excluir bots
-                display_text = f"{member.display_name}"
-                if member.name != member.display_name:
-                    display_text = f"{member.display_name} (@{member.name})"
-                
-                choices.append(app_commands.Choice(
-                    name=display_text,
-                    value=str(member.id)
-                ))
-        return choices
-    
-    # Filtrar miembros que coincidan con lo que el usuario está escribiendo
-    current = current.lower()
-    for member in members:
-        if not member.bot and (current in member.name.lower() or current in member.display_name.lower()):
-            # Crear un nombre de visualización más descriptivo
-            display_text = f"{member.display_name}"
-            if member.name != member.display_name:
-                display_text = f"{member.display_name} (@{member.name})"
-            
-            # Añadir al usuario a las opciones
-            choices.append(app_commands.Choice(
-                name=display_text,
-                value=str(member.id)
-            ))
-            # Limitar a 25 opciones (límite de Discord)
-            if len(choices) >= 25:
-                break
+    # Búsqueda indexada: exacto > prefijo > subcadena (máximo 25, límite de Discord)
+    for entry in get_member_directory(interaction.guild).search.search(current, limit=25):
+        # Crear un nombre de visualización más descriptivo
+        display_text = f"{entry.display_name}"
+        if entry.name != entry.display_name:
+            display_text = f"{entry.display_name} (@{entry.name})"
+        
+        choices.append(app_commands.Choice(
+            name=display_text,
+            value=str(entry.id)
+        ))
     
     return choices
 
@@ -1530,6 +1716,7 @@ async def usuario_autocompletar(interaction: discord.Interaction, current: str)
 @app_commands.checks.has_any_role(*Roles.STAFF)
 async def advertencia(interaction: discord.Interaction, usuario: str, razon: str, prueba: str = None):
     """Comando para emitir advertencias oficiales"""
+    current_feature.set("moderacion")
     
     # Verificar si el usuario tiene permisos
     if not any(role.id in Roles.STAFF for role in interaction.user.roles):
@@ -1538,10 +1725,12 @@ async def advertencia(interaction: discord.Interaction, usuario: str, razon: str
             ephemeral=True
         )
     
-    # Obtener el miembro a partir del ID
+    # Obtener el miembro a partir del ID (caché primero, REST solo si falta)
     try:
-        usuario_obj = await interaction.guild.fetch_member(int(usuario))
-    except (discord.NotFound, ValueError):
+        usuario_obj = await get_member_directory(interaction.guild).resolve(interaction.guild, int(usuario))
+    except ValueError:
+        usuario_obj = None
+    if usuario_obj is None:
         return await interaction.response.send_message(
             "❌ No se pudo encontrar al usuario especificado.",
             ephemeral=True
@@ -1582,99 +1771,153 @@ async def advertencia(interaction: discord.Interaction, usuario: str, razon: str
         )
         embed.set_image(url=prueba)
     
-    embed.set_thumbnail(url=usuario.display_avatar.url)
-    embed.set_footer(text=f"Santiago RP - Sistema de Advertencias • ID: {usuario.id}")
+    embed.set_thumbnail(url=usuario_obj.display_avatar.url)
+    embed.set_footer(text=f"Santiago RP - Sistema de Advertencias • ID: {usuario_obj.id}")
     
-    # Responder al comando
-    await interaction.response.send_message(
-        f"✅ Advertencia emitida a {usuario.mention} correctamente.",
-        embed=embed
+    # Mensaje directo al usuario
+    dm_embed = discord.Embed(
+        title="⚠️ HAS RECIBIDO UNA ADVERTENCIA",
+        description=f"Has recibido una advertencia oficial en **{interaction.guild.name}**",
+        color=Colors.DANGER,
+        timestamp=datetime.now()
     )
     
-    # Enviar mensaje directo al usuario
-    try:
-        dm_embed = discord.Embed(
-            title="⚠️ HAS RECIBIDO UNA ADVERTENCIA",
-            description=f"Has recibido una advertencia oficial en **{interaction.guild.name}**",
-            color=Colors.DANGER,
-            timestamp=datetime.now()
-        )
-        
+    dm_embed.add_field(
+        name="📝 Razón",
+        value=razon,
+        inline=False
+    )
+    
+    dm_embed.add_field(
+        name="👮‍♂️ Administrador",
+        value=f"{interaction.user.name}",
+        inline=True
+    )
+    
+    dm_embed.add_field(
+        name="📅 Fecha",
+        value=datetime.now().strftime("%d/%m/%Y %H:%M"),
+        inline=True
+    )
+    
+    dm_embed.add_field(
+        name="⚠️ Importante",
+        value="Si crees que esta advertencia es injusta, puedes apelar abriendo un ticket en el servidor.",
+        inline=False
+    )
+    
+    if prueba:
         dm_embed.add_field(
-            name="📝 Razón",
-            value=razon,
+            name="🔍 Prueba",
+            value=f"[Ver imagen]({prueba})",
             inline=False
         )
-        
-        dm_embed.add_field(
-            name="👮‍♂️ Administrador",
-            value=f"{interaction.user.name}",
-            inline=True
-        )
-        
-        dm_embed.add_field(
-            name="📅 Fecha",
-            value=datetime.now().strftime("%d/%m/%Y %H:%M"),
-            inline=True
-        )
-        
-        dm_embed.add_field(
-            name="⚠️ Importante",
-            value="Si crees que esta advertencia es injusta, puedes apelar abriendo un ticket en el servidor.",
-            inline=False
+        dm_embed.set_image(url=prueba)
+    
+    if interaction.guild.icon:
+        dm_embed.set_thumbnail(url=interaction.guild.icon.url)
+    dm_embed.set_footer(text=f"Santiago RP - Sistema de Advertencias • ID: {usuario_obj.id}")
+    
+    # Guardar primero: la advertencia, el DM y el log se confirman en una sola
+    # transacción y el trabajador del outbox los entrega (con reintentos)
+    try:
+        warning_id = await db.add_warning(
+            user_id=usuario_obj.id,
+            user_name=usuario_obj.name,
+            admin_id=interaction.user.id,
+            admin_name=interaction.user.name,
+            reason=razon,
+            proof_url=prueba,
+            deliveries=[
+                ("dm", usuario_obj.id, embed_payload(dm_embed)),
+                ("log", Channels.LOGS, embed_payload(embed)),
+            ]
         )
         
-        if prueba:
-            dm_embed.add_field(
-                name="🔍 Prueba",
-                value=f"[Ver imagen]({prueba})",
-                inline=False
-            )
-            dm_embed.set_image(url=prueba)
-        
-        dm_embed.set_thumbnail(url=interaction.guild.icon.url if interaction.guild.icon else "")
-        dm_embed.set_footer(text=f"Santiago RP - Sistema de Advertencias • ID: {usuario.id}")
-        
-        await usuario.send(embed=dm_embed)
-        
     except Exception as e:
-        print(f"Error al enviar DM: {e}")
-        await interaction.followup.send(
-            f"⚠️ No se pudo enviar un mensaje directo a {usuario.mention}. La advertencia ha sido registrada de todos modos.",
+        print(f"Error al guardar en la base de datos: {e}")
+        return await interaction.response.send_message(
+            "❌ Ocurrió un error al guardar la advertencia en la base de datos. No se ha emitido.",
             ephemeral=True
         )
+    outbox.notify()
     
-    # Enviar a canal de logs
-    log_channel = bot.get_channel(Channels.LOGS)
-    if log_channel:
-        await log_channel.send(embed=embed)
+    # Responder al comando
+    await interaction.response.send_message(
+        f"✅ Advertencia emitida a {usuario_obj.mention} correctamente.",
+        embed=embed
+    )
     
-    # Guardar en la base de datos
+    # Escalado automático: el contador en memoria decide sin otra consulta
+    step = escalator.record(usuario_obj.id)
+    if step is not None:
+        await apply_escalation(interaction, usuario_obj, step, warning_id)
+
+async def apply_escalation(interaction: discord.Interaction, member: discord.Member, step: EscalationStep,
+                           warning_id: int):
+    """Aplicar un escalón de sanción automática y dejar constancia en el canal de logs"""
     try:
-        conn = sqlite3.connect('santiagoGuard.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT INTO advertencias (user_id, user_name, admin_id, admin_name, reason, proof_url)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            str(usuario.id),
-            usuario.name,
-            str(interaction.user.id),
-            interaction.user.name,
-            razon,
-            prueba
-        ))
-        
-        conn.commit()
-        conn.close()
-        
+        sanction_id = await escalator.apply(member, step, warning_id)
     except Exception as e:
-        print(f"Error al guardar en la base de datos: {e}")
-        await interaction.followup.send(
-            "⚠️ Ocurrió un error al guardar la advertencia en la base de datos.",
+        print(f"Error al aplicar la sanción automática: {e}")
+        return await interaction.followup.send(
+            f"⚠️ {member.mention} alcanzó {step.threshold} advertencias, pero no se pudo aplicar "
+            f"el {step.describe()}: {e}",
+            ephemeral=True
+        )
+    
+    embed = discord.Embed(
+        title="🤖 SANCIÓN AUTOMÁTICA",
+        description=f"{member.mention} alcanzó **{step.threshold}** advertencias: {step.describe()}.",
+        color=Colors.DANGER,
+        timestamp=datetime.now()
+    )
+    embed.add_field(name="🆔 Sanción", value=f"#{sanction_id}", inline=True)
+    embed.add_field(name="👮‍♂️ Última advertencia", value=interaction.user.mention, inline=True)
+    embed.add_field(name="↩️ Deshacer", value=f"`/deshacer-sancion sancion:{sanction_id}`", inline=False)
+    embed.set_footer(text=f"Santiago RP - Sistema de Advertencias • ID: {member.id}")
+    
+    await log_sink.log(Channels.LOGS, embed)
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="deshacer-sancion", description="Revierte una sanción aplicada por el escalado automático")
+@app_commands.describe(sancion="Número de la sanción (aparece en el canal de logs)")
+@app_commands.checks.has_any_role(*Roles.STAFF)
+async def deshacer_sancion(interaction: discord.Interaction, sancion: int):
+    """Comando para revertir un aislamiento, baneo o expulsión automáticos"""
+    current_feature.set("moderacion")
+    try:
+        undone = await escalator.undo(
+            interaction.guild, sancion, interaction.user.id, get_member_directory(interaction.guild)
+        )
+    except discord.HTTPException as e:
+        return await interaction.response.send_message(
+            f"❌ No se pudo revertir la sanción en Discord: {e}",
+            ephemeral=True
+        )
+    if undone is None:
+        return await interaction.response.send_message(
+            f"❌ La sanción #{sancion} no existe o ya fue revertida.",
             ephemeral=True
         )
+    
+    user_id, user_name, action, warnings = undone
+    note = {
+        "timeout": "Se ha quitado el aislamiento.",
+        "ban": "Se ha retirado el baneo.",
+        "kick": "Las expulsiones no se pueden revertir en Discord: el usuario puede volver con una invitación.",
+    }[action]
+    embed = discord.Embed(
+        title="↩️ SANCIÓN AUTOMÁTICA REVERTIDA",
+        description=f"Sanción #{sancion} a <@{user_id}> ({user_name}, {warnings} advertencias). {note}",
+        color=Colors.SUCCESS,
+        timestamp=datetime.now()
+    )
+    embed.add_field(name="👮‍♂️ Revertida por", value=interaction.user.mention, inline=True)
+    embed.set_footer(text=f"Santiago RP - Sistema de Advertencias • ID: {user_id}")
+    
+    await log_sink.log(Channels.LOGS, embed)
+    await interaction.response.send_message(embed=embed, ephemeral=True)
 
 @bot.tree.command(name="historial-advertencias", description="Muestra el historial de advertencias de un usuario")
 @app_commands.describe(
@@ -1684,6 +1927,7 @@ async def advertencia(interaction: discord.Interaction, usuario: str, razon: str
 @app_commands.checks.has_any_role(*Roles.STAFF)
 async def historial_advertencias(interaction: discord.Interaction, usuario: str):
     """Comando para ver el historial de advertencias de un usuario"""
+    current_feature.set("moderacion")
     
     # Verificar si el usuario tiene permisos
     if not any(role.id in Roles.STAFF for role in interaction.user.roles):
@@ -1692,59 +1936,34 @@ async def historial_advertencias(interaction: discord.Interaction, usuario: str)
             ephemeral=True
         )
     
-    # Obtener el miembro a partir del ID
+    # Obtener el miembro a partir del ID (caché primero, REST solo si falta)
     try:
-        usuario_obj = await interaction.guild.fetch_member(int(usuario))
-    except (discord.NotFound, ValueError):
+        usuario_obj = await get_member_directory(interaction.guild).resolve(interaction.guild, int(usuario))
+    except ValueError:
+        usuario_obj = None
+    if usuario_obj is None:
         return await interaction.response.send_message(
             "❌ No se pudo encontrar al usuario especificado.",
             ephemeral=True
         )
     
     try:
-        conn = sqlite3.connect('santiagoGuard.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT id, admin_name, reason, proof_url, timestamp
-        FROM advertencias
-        WHERE user_id = ?
-        ORDER BY timestamp DESC
-        ''', (str(usuario.id),))
+        total = await db.count_warnings(usuario_obj.id)
         
-        advertencias = cursor.fetchall()
-        conn.close()
-        
-        if not advertencias:
+        if not total:
             return await interaction.response.send_message(
-                f"✅ {usuario.mention} no tiene advertencias registradas.",
+                f"✅ {usuario_obj.mention} no tiene advertencias registradas.",
                 ephemeral=True
             )
         
-        embed = discord.Embed(
-            title=f"📋 Historial de Advertencias",
-            description=f"Usuario: {usuario.mention}\nTotal: {len(advertencias)} advertencia(s)",
-            color=Colors.WARNING,
-            timestamp=datetime.now()
-        )
-        
-        for i, (adv_id, admin, razon, prueba, fecha) in enumerate(advertencias, 1):
-            fecha_formateada = datetime.strptime(fecha, "%Y-%m-%d %H:%M:%S").strftime("%d/%m/%Y %H:%M")
-            
-            value = f"**Razón:** {razon}\n**Admin:** {admin}\n**Fecha:** {fecha_formateada}"
-            if prueba:
-                value += f"\n**Prueba:** [Ver imagen]({prueba})"
-                
-            embed.add_field(
-                name=f"⚠️ Advertencia #{adv_id}",
-                value=value,
-                inline=False
-            )
-        
-        embed.set_thumbnail(url=usuario.display_avatar.url)
-        embed.set_footer(text=f"Santiago RP - Sistema de Advertencias • ID: {usuario.id}")
+        # Solo se lee la primera página; el resto se consulta al pulsar los botones
+        rows, has_older = await db.warnings_page(usuario_obj.id, WARNINGS_PAGE_SIZE)
+        if not has_older:
+            embed = warning_history_embed(usuario_obj, rows, total, page=1, pages=1)
+            return await interaction.response.send_message(embed=embed)
         
-        await interaction.response.send_message(embed=embed)
+        view = WarningHistoryView(interaction, usuario_obj, total, rows, has_older)
+        await interaction.response.send_message(embed=view.embed(), view=view)
         
     except Exception as e:
         print(f"Error al obtener historial: {e}")
@@ -1753,19 +1972,159 @@ async def historial_advertencias(interaction: discord.Interaction, usuario: str)
             ephemeral=True
         )
 
+def warning_ranking_embed(title: str, rows: list[tuple[str, str, int]], days: int | None) -> discord.Embed:
+    """Embed con un ranking ``(id, nombre, advertencias)`` leído de los resúmenes"""
+    embed = discord.Embed(title=title, color=Colors.WARNING, timestamp=datetime.now())
+    medals = ["🥇", "🥈", "🥉"]
+    embed.description = "\n".join(
+        f"{medals[i] if i < len(medals) else f'`{i + 1}.`'} <@{key}> ({name}): **{total}**"
+        for i, (key, name, total) in enumerate(rows)
+    ) or "Sin advertencias en este periodo."
+    footer = "Todo el historial" if days is None else f"Últimos {days} días"
+    if not db.rollups_ready:
+        footer += " · resúmenes generándose, el ranking aún está incompleto"
+    embed.set_footer(text=footer)
+    return embed
+
+@bot.tree.command(name="top-infractores", description="Usuarios con más advertencias en los últimos días")
+@app_commands.describe(dias="Días a considerar, hoy incluido (0: todo el historial; por defecto 7)")
+@app_commands.checks.has_any_role(*Roles.STAFF)
+async def top_infractores(interaction: discord.Interaction, dias: app_commands.Range[int, 0, 365] = 7):
+    """Comando para ver el ranking de usuarios más advertidos"""
+    current_feature.set("moderacion")
+    days = dias or None  # 0: todo el historial (totales acumulados)
+    rows = await db.top_warned_users(days)
+    await interaction.response.send_message(
+        embed=warning_ranking_embed("🚨 Top Infractores", rows, days), ephemeral=True
+    )
+
+@bot.tree.command(name="advertencias-staff", description="Advertencias emitidas por cada miembro del staff")
+@app_commands.describe(dias="Días a considerar, hoy incluido (0: todo el historial; por defecto 7)")
+@app_commands.checks.has_any_role(*Roles.STAFF)
+async def advertencias_staff(interaction: discord.Interaction, dias: app_commands.Range[int, 0, 365] = 7):
+    """Comando para ver cuántas advertencias emitió cada miembro del staff"""
+    current_feature.set("moderacion")
+    days = dias or None  # 0: todo el historial (totales acumulados)
+    rows = await db.top_warning_admins(days, limit=25)
+    await interaction.response.send_message(
+        embed=warning_ranking_embed("👮 Advertencias por Staff", rows, days), ephemeral=True
+    )
+
+@bot.tree.command(name="recalcular-resumenes", description="Regenera los resúmenes de advertencias desde el historial")
+@app_commands.checks.has_role(Roles.ADMIN)
+async def recalcular_resumenes(interaction: discord.Interaction):
+    """Comando para reconstruir los resúmenes diarios (p. ej. tras editar la base a mano)"""
+    current_feature.set("moderacion")
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    start = time.perf_counter()
+    counted = await db.rebuild_warning_rollups()
+    await interaction.followup.send(
+        f"✅ Resúmenes regenerados: {counted} advertencias en {time.perf_counter() - start:.1f}s.",
+        ephemeral=True
+    )
+
+@bot.tree.command(name="exportar-advertencias", description="Descarga todas las advertencias en un archivo comprimido")
+@app_commands.describe(formato="Formato del archivo (por defecto JSONL)")
+@app_commands.checks.has_role(Roles.ADMIN)
+async def exportar_advertencias(interaction: discord.Interaction, formato: Literal["jsonl", "csv"] = "jsonl"):
+    """Comando para exportar ``advertencias`` en streaming (no bloquea la base de datos)"""
+    current_feature.set("moderacion")
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    
+    name = f"advertencias-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{formato}.gz"
+    path = os.path.join(tempfile.gettempdir(), name)
+    try:
+        path, size, count = await asyncio.to_thread(warnings_archive.export_warnings, db, path)
+    except Exception as e:
+        print(f"Error al exportar advertencias: {e}")
+        return await interaction.followup.send("❌ Ocurrió un error al exportar las advertencias.", ephemeral=True)
+    
+    summary = f"✅ {count} advertencias exportadas ({size / 1024 / 1024:.1f} MiB)."
+    if size > interaction.guild.filesize_limit:
+        return await interaction.followup.send(
+            f"{summary} El archivo supera el límite de Discord; está en el servidor en `{path}` "
+            f"(o usa `python warnings_archive.py exportar`).",
+            ephemeral=True
+        )
+    try:
+        await interaction.followup.send(summary, file=discord.File(path, filename=name), ephemeral=True)
+    finally:
+        os.remove(path)
+
+@bot.tree.command(name="importar-advertencias", description="Importa advertencias desde un archivo exportado")
+@app_commands.describe(archivo="Archivo .jsonl.gz o .csv.gz generado por /exportar-advertencias")
+@app_commands.checks.has_role(Roles.ADMIN)
+async def importar_advertencias(interaction: discord.Interaction, archivo: discord.Attachment):
+    """Comando para importar advertencias en bloque (omite los ids que ya existen)"""
+    current_feature.set("moderacion")
+    try:
+        warnings_archive.archive_format(archivo.filename)
+    except ValueError as e:
+        return await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    
+    fd, path = tempfile.mkstemp(suffix="-" + os.path.basename(archivo.filename))
+    os.close(fd)
+    try:
+        await archivo.save(path)
+        read, inserted = await warnings_archive.import_warnings(db, path)
+    except Exception as e:
+        print(f"Error al importar advertencias: {e}")
+        return await interaction.followup.send(
+            f"❌ No se importó nada (la transacción se deshizo): {e}",
+            ephemeral=True
+        )
+    finally:
+        os.remove(path)
+    
+    # Los contadores del escalado se recalculan con las advertencias nuevas
+    await escalator.load()
+    await interaction.followup.send(
+        f"✅ {inserted} advertencias importadas de {read} leídas ({read - inserted} ya existían).",
+        ephemeral=True
+    )
+
 # =============================================
 # EVENTOS ADICIONALES
 # =============================================
+@bot.event
+async def on_interaction(interaction: discord.Interaction):
+    """Enrutar los envíos de formularios por custom_id (sin modales en espera)"""
+    if not await form_router.dispatch(interaction):
+        await route_legacy_ticket_panel(interaction)
+
 @bot.event
 async def on_member_join(member: discord.Member):
     """Actualizar conteo de miembros cuando alguien se une"""
+    get_member_directory(member.guild).add(member)
+    if member.guild.id in member_counters:
+        member_counters[member.guild.id].joined(member)
     await update_member_count()
 
 @bot.event
 async def on_member_remove(member: discord.Member):
     """Actualizar conteo de miembros cuando alguien se va"""
+    get_member_directory(member.guild).remove(member.id)
+    if member.guild.id in member_counters:
+        member_counters[member.guild.id].left(member)
     await update_member_count()
 
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    """Mantener el directorio de miembros al cambiar el apodo o el avatar"""
+    if before.display_name != after.display_name or before.display_avatar != after.display_avatar:
+        get_member_directory(after.guild).update(after)
+
+@bot.event
+async def on_user_update(before: discord.User, after: discord.User):
+    """Mantener el directorio de miembros al cambiar el nombre de usuario"""
+    if before.name == after.name and before.display_name == after.display_name and before.display_avatar == after.display_avatar:
+        return
+    for guild in bot.guilds:
+        member = guild.get_member(after.id)
+        if member:
+            get_member_directory(guild).update(member)
+
 @bot.event
 async def on_application_command_error(interaction: discord.Interaction, error):
     """Manejar errores de comandos de aplicación"""
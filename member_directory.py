@@ -0,0 +1,183 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+import discord
+
+from member_search import MemberSearchIndex
+
+# =============================================
+# DIRECTORIO DE MIEMBROS
+# =============================================
+
+
+class MemberDirectory:
+    """Resolución de miembros por id o nombre en O(1).
+
+    Mantiene un índice ``nombre en minúsculas -> id`` (y su inverso, para
+    poder retirar nombres antiguos) alimentado por los eventos del gateway,
+    junto con el índice de búsqueda del autocompletado. Los miembros en sí
+    salen de la caché de discord.py. La API REST (o la consulta de
+    miembros del gateway, para nombres) solo se usa ante un fallo de caché, y
+    los resultados negativos se recuerdan durante ``negative_ttl`` segundos.
+    """
+
+    def __init__(self, negative_ttl: float = 300.0, fetched_size: int = 512):
+        self.negative_ttl = negative_ttl
+        self.fetched_size = fetched_size
+        self.search = MemberSearchIndex()
+
+        self._by_name: dict[str, int] = {}
+        self._names: dict[int, str] = {}
+        # Miembros obtenidos por REST que no están en la caché del servidor
+        self._fetched: OrderedDict[int, discord.Member] = OrderedDict()
+        # Resultados negativos: id o nombre -> instante de expiración
+        self._missing_ids: dict[int, float] = {}
+        self._missing_names: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    # -----------------------------------------
+    # Mantenimiento (eventos del gateway)
+    # -----------------------------------------
+    def rebuild(self, members):
+        """Reconstruir el directorio completo a partir de ``guild.members``"""
+        members = list(members)
+        self._names = {member.id: member.name.lower() for member in members}
+        self._by_name = {name: member_id for member_id, name in self._names.items()}
+        self._fetched.clear()
+        self._missing_ids.clear()
+        self._missing_names.clear()
+        self.search.rebuild(members)
+
+    def add(self, member):
+        """Añadir o actualizar un miembro"""
+        name = member.name.lower()
+        previous = self._names.get(member.id)
+        if previous is not None and previous != name and self._by_name.get(previous) == member.id:
+            del self._by_name[previous]
+        self._names[member.id] = name
+        self._by_name[name] = member.id
+        self._missing_ids.pop(member.id, None)
+        self._missing_names.pop(name, None)
+        if member.id in self._fetched:
+            self._fetched[member.id] = member
+        self.search.add(member)
+
+    update = add
+
+    def remove(self, member_id: int):
+        """Quitar un miembro que salió del servidor"""
+        name = self._names.pop(member_id, None)
+        if name is not None and self._by_name.get(name) == member_id:
+            del self._by_name[name]
+        self._fetched.pop(member_id, None)
+        self.search.remove(member_id)
+
+    # -----------------------------------------
+    # Consultas
+    # -----------------------------------------
+    def id_for_name(self, name: str) -> int | None:
+        """Id de un miembro por nombre de usuario, sin distinguir mayúsculas"""
+        return self._by_name.get(name.strip().lstrip("@").lower())
+
+    def _is_missing(self, cache: dict, key) -> bool:
+        expires = cache.get(key)
+        if expires is None:
+            return False
+        if expires > time.monotonic():
+            return True
+        del cache[key]
+        return False
+
+    def _remember(self, member: discord.Member) -> discord.Member:
+        self._fetched[member.id] = member
+        self._fetched.move_to_end(member.id)
+        while len(self._fetched) > self.fetched_size:
+            self._fetched.popitem(last=False)
+        if member.id not in self._names:
+            self.add(member)
+        return member
+
+    async def resolve(self, guild: discord.Guild, member_id: int) -> discord.Member | None:
+        """Obtener un miembro por id: caché del servidor, luego REST (con caché negativa)"""
+        member = guild.get_member(member_id) or self._fetched.get(member_id)
+        if member is not None:
+            return member
+        if self._is_missing(self._missing_ids, member_id):
+            return None
+        try:
+            member = await guild.fetch_member(member_id)
+        except discord.NotFound:
+            self._missing_ids[member_id] = time.monotonic() + self.negative_ttl
+            return None
+        return self._remember(member)
+
+    async def resolve_name(self, guild: discord.Guild, name: str) -> discord.Member | None:
+        """Obtener un miembro por nombre de usuario exacto (sin distinguir mayúsculas)"""
+        key = name.strip().lstrip("@").lower()
+        if not key:
+            return None
+        member_id = self._by_name.get(key)
+        if member_id is not None:
+            return await self.resolve(guild, member_id)
+        if self._is_missing(self._missing_names, key):
+            return None
+        # Fallo de caché: preguntar al gateway (no consume el presupuesto REST)
+        try:
+            candidates = await guild.query_members(query=key, limit=5)
+        except (discord.ClientException, asyncio.TimeoutError):
+            candidates = []
+        for member in candidates:
+            if member.name.lower() == key:
+                return self._remember(member)
+        self._missing_names[key] = time.monotonic() + self.negative_ttl
+        return None
+
+
+class MemberCounter:
+    """Conteo incremental de miembros humanos y bots de un servidor.
+
+    Se siembra una vez recorriendo ``guild.members`` y luego se actualiza con
+    deltas O(1) en las altas y bajas. ``check_drift`` lo compara con
+    ``guild.member_count`` (que envía Discord) para detectar desajustes.
+    """
+
+    def __init__(self):
+        self.humans = 0
+        self.bots = 0
+        self.seeded = False
+
+    @property
+    def total(self) -> int:
+        return self.humans + self.bots
+
+    def seed(self, members):
+        """Contar desde cero (recorre todos los miembros)"""
+        self.humans = 0
+        self.bots = 0
+        for member in members:
+            if member.bot:
+                self.bots += 1
+            else:
+                self.humans += 1
+        self.seeded = True
+
+    def joined(self, member):
+        if member.bot:
+            self.bots += 1
+        else:
+            self.humans += 1
+
+    def left(self, member):
+        if member.bot:
+            self.bots = max(0, self.bots - 1)
+        else:
+            self.humans = max(0, self.humans - 1)
+
+    def check_drift(self, member_count: int | None) -> int:
+        """Diferencia entre el total de Discord y el contado (0 si coinciden)"""
+        if member_count is None:
+            return 0
+        return member_count - self.total
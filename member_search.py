@@ -0,0 +1,203 @@
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+
+# =============================================
+# ÍNDICE DE BÚSQUEDA DE MIEMBROS
+# =============================================
+# Separador de registros en el blob de subcadenas: nunca aparece en una consulta
+_SEPARATOR = "\n"
+
+
+class MemberEntry:
+    """Datos mínimos de un miembro para el autocompletado"""
+    __slots__ = ("id", "name", "display_name", "keys")
+
+    def __init__(self, member_id: int, name: str, display_name: str):
+        self.id = member_id
+        self.name = name
+        self.display_name = display_name
+        # Claves en minúsculas calculadas una sola vez (sin duplicados)
+        self.keys = tuple(dict.fromkeys((name.lower(), display_name.lower())))
+
+    @classmethod
+    def from_member(cls, member) -> "MemberEntry":
+        return cls(member.id, member.name, member.display_name)
+
+
+class MemberSearchIndex:
+    """Índice en memoria sobre ``name`` y ``display_name`` de los miembros humanos.
+
+    - Coincidencias exactas y por prefijo: lista ordenada de ``(clave, id)``
+      consultada con ``bisect`` (O(log n + k)).
+    - Coincidencias por subcadena: todas las claves concatenadas en un único
+      ``str`` recorrido con ``str.find`` (en C, sin ``lower()`` por miembro).
+      Los cambios posteriores se acumulan en ``_pending``/``_stale`` y el blob
+      se reconstruye cuando superan ``rebuild_threshold``.
+    - Resultados ordenados: exacto > prefijo > subcadena, cacheados por
+      consulta durante ``cache_ttl`` segundos; cualquier alta, baja o cambio
+      de nombre vacía la caché.
+    """
+
+    def __init__(self, limit: int = 25, cache_ttl: float = 10.0, cache_size: int = 256,
+                 rebuild_threshold: int = 1024):
+        self.limit = limit
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.rebuild_threshold = rebuild_threshold
+
+        self._entries: dict[int, MemberEntry] = {}
+        self._sorted: list[tuple[str, int]] = []
+        self._cache: OrderedDict[str, tuple[float, list[MemberEntry]]] = OrderedDict()
+
+        # Blob de subcadenas (instantánea) y cambios desde la última reconstrucción
+        self._blob = ""
+        self._offsets: list[int] = []
+        self._owners: list[int] = []
+        self._pending: dict[int, MemberEntry] = {}
+        self._stale: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self._entries
+
+    # -----------------------------------------
+    # Mantenimiento
+    # -----------------------------------------
+    def rebuild(self, members):
+        """Reconstruir el índice completo a partir de ``guild.members``"""
+        self._entries = {
+            member.id: MemberEntry.from_member(member)
+            for member in members if not member.bot
+        }
+        self._sorted = sorted(
+            (key, entry.id) for entry in self._entries.values() for key in entry.keys
+        )
+        self._cache.clear()
+        self._rebuild_blob()
+
+    def add(self, member):
+        """Añadir o actualizar un miembro"""
+        if member.bot:
+            return
+        entry = MemberEntry.from_member(member)
+        previous = self._entries.get(member.id)
+        if previous is not None:
+            if previous.name == entry.name and previous.display_name == entry.display_name:
+                return
+            self._unlink(previous)
+        self._entries[entry.id] = entry
+        for key in entry.keys:
+            insort(self._sorted, (key, entry.id))
+        self._pending[entry.id] = entry
+        self._cache.clear()
+        self._maybe_rebuild_blob()
+
+    update = add
+
+    def remove(self, member_id: int):
+        """Quitar un miembro del índice"""
+        entry = self._entries.pop(member_id, None)
+        if entry is None:
+            return
+        self._unlink(entry)
+        self._cache.clear()
+        self._maybe_rebuild_blob()
+
+    def _unlink(self, entry: MemberEntry):
+        for key in entry.keys:
+            pos = bisect_left(self._sorted, (key, entry.id))
+            if pos < len(self._sorted) and self._sorted[pos] == (key, entry.id):
+                del self._sorted[pos]
+        self._pending.pop(entry.id, None)
+        self._stale.add(entry.id)
+
+    def _maybe_rebuild_blob(self):
+        if len(self._pending) + len(self._stale) > self.rebuild_threshold:
+            self._rebuild_blob()
+
+    def _rebuild_blob(self):
+        parts = []
+        offsets = []
+        owners = []
+        position = 0
+        for entry in self._entries.values():
+            for key in entry.keys:
+                offsets.append(position)
+                owners.append(entry.id)
+                parts.append(key)
+                position += len(key) + 1
+        self._blob = _SEPARATOR.join(parts)
+        self._offsets = offsets
+        self._owners = owners
+        self._pending.clear()
+        self._stale.clear()
+
+    # -----------------------------------------
+    # Búsqueda
+    # -----------------------------------------
+    def search(self, query: str, limit: int | None = None) -> list[MemberEntry]:
+        """Buscar miembros por nombre; exacto > prefijo > subcadena"""
+        limit = limit or self.limit
+        query = query.lower().replace(_SEPARATOR, " ")
+        if not query:
+            return [entry for _, entry in zip(range(limit), self._entries.values())]
+
+        now = time.monotonic()
+        cached = self._cache.get(query)
+        if cached is not None and cached[0] > now:
+            self._cache.move_to_end(query)
+            return cached[1][:limit]
+
+        results = self._search(query, self.limit if limit < self.limit else limit)
+        self._cache[query] = (now + self.cache_ttl, results)
+        self._cache.move_to_end(query)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return results[:limit]
+
+    def _search(self, query: str, limit: int) -> list[MemberEntry]:
+        exact: list[MemberEntry] = []
+        prefix: list[MemberEntry] = []
+        seen: set[int] = set()
+
+        # Exactos y prefijos: rango contiguo en la lista ordenada
+        start = bisect_left(self._sorted, (query,))
+        for key, member_id in self._sorted[start:start + limit * 4]:
+            if not key.startswith(query) or len(exact) + len(prefix) >= limit:
+                break
+            if member_id in seen:
+                continue
+            seen.add(member_id)
+            (exact if key == query else prefix).append(self._entries[member_id])
+        results = exact + prefix
+        if len(results) >= limit:
+            return results[:limit]
+
+        # Subcadenas: primero los cambios recientes, luego la instantánea
+        for entry in self._pending.values():
+            if entry.id not in seen and any(query in key for key in entry.keys):
+                seen.add(entry.id)
+                results.append(entry)
+                if len(results) >= limit:
+                    return results
+
+        blob = self._blob
+        offsets = self._offsets
+        owners = self._owners
+        position = blob.find(query)
+        while position != -1:
+            record = bisect_right(offsets, position) - 1
+            member_id = owners[record]
+            if member_id not in seen and member_id not in self._stale:
+                seen.add(member_id)
+                results.append(self._entries[member_id])
+                if len(results) >= limit:
+                    break
+            # Continuar desde el siguiente registro
+            if record + 1 >= len(offsets):
+                break
+            position = blob.find(query, offsets[record + 1])
+        return results
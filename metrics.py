@@ -0,0 +1,281 @@
+import os
+import time
+from bisect import bisect_left
+
+import discord
+from aiohttp import web
+from discord import app_commands, ui
+
+# =============================================
+# MÉTRICAS DE INTERACCIONES Y SERVIDOR /metrics
+# =============================================
+# Discord invalida las interacciones sin respuesta en 3 segundos
+ACK_DEADLINE = 3.0
+
+# Límites de los buckets de los histogramas (segundos)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+METRICS_HOST = os.getenv('METRICS_HOST', '0.0.0.0')
+METRICS_PORT = int(os.getenv('PORT', '8080'))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+class Histogram:
+    """Histograma acumulativo al estilo Prometheus, con una serie por etiquetas"""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # etiquetas -> [conteos por bucket (+Inf al final), suma]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(sorted(labels.items())))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self._series.items()):
+            labels = dict(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{format_labels({**labels, 'le': le})} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Contador al estilo Prometheus, con una serie por etiquetas"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._series.get(tuple(sorted(labels.items())), 0)
+
+    def items(self) -> list[tuple[dict, float]]:
+        """Pares ``(etiquetas, valor)`` de todas las series"""
+        return [(dict(key), value) for key, value in self._series.items()]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{format_labels(dict(key))} {value:g}")
+        return lines
+
+
+# -----------------------------------------
+# Latencia de interacciones
+# -----------------------------------------
+class InteractionTimer:
+    """Tiempos de una interacción desde que se recibe"""
+    __slots__ = ("handler", "kind", "started", "acked_at")
+
+    def __init__(self, handler: str, kind: str):
+        self.handler = handler
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.acked_at: float | None = None
+
+
+class TimedResponse(discord.InteractionResponse):
+    """``InteractionResponse`` que anota cuándo se respondió por primera vez.
+
+    Todas las formas de responder (mensaje, defer, edición, modal,
+    autocompletado) terminan asignando ``_response_type``, así que basta con
+    vigilar esa asignación.
+    """
+    __slots__ = ("_timer",)
+
+    def __init__(self, parent: discord.Interaction, timer: InteractionTimer):
+        self._timer = timer
+        super().__init__(parent)
+
+    @property
+    def _response_type(self):
+        return discord.InteractionResponse._response_type.__get__(self)
+
+    @_response_type.setter
+    def _response_type(self, value):
+        discord.InteractionResponse._response_type.__set__(self, value)
+        if value is not None and self._timer.acked_at is None:
+            self._timer.acked_at = time.perf_counter()
+
+
+class InteractionMetrics:
+    """Histogramas de latencia por manejador (custom_id o comando).
+
+    ``interaction_ack_seconds`` mide desde la recepción hasta la primera
+    respuesta y ``interaction_duration_seconds`` hasta que termina el
+    manejador. Se cuentan los errores y las interacciones que no se
+    respondieron dentro del plazo de Discord.
+    """
+
+    def __init__(self, deadline: float = ACK_DEADLINE):
+        self.deadline = deadline
+        self.ack = Histogram("santiago_interaction_ack_seconds",
+                             "Tiempo desde la recepción hasta la primera respuesta")
+        self.duration = Histogram("santiago_interaction_duration_seconds",
+                                  "Tiempo desde la recepción hasta el fin del manejador")
+        self.errors = Counter("santiago_interaction_errors_total", "Excepciones en manejadores de interacciones")
+        self.timeouts = Counter("santiago_interaction_timeouts_total",
+                                "Interacciones respondidas fuera de plazo o sin respuesta")
+
+    def begin(self, interaction: discord.Interaction, handler: str, kind: str) -> InteractionTimer:
+        """Empezar a medir una interacción (antes de que nadie responda)"""
+        timer = InteractionTimer(handler, kind)
+        if not interaction.response.is_done():
+            interaction._cs_response = TimedResponse(interaction, timer)
+        return timer
+
+    def error(self, timer: InteractionTimer):
+        self.errors.inc(handler=timer.handler, kind=timer.kind)
+
+    def finish(self, timer: InteractionTimer):
+        finished = time.perf_counter()
+        labels = {"handler": timer.handler, "kind": timer.kind}
+        self.duration.observe(finished - timer.started, **labels)
+        if timer.acked_at is None:
+            self.timeouts.inc(reason="sin_respuesta", **labels)
+            return
+        ack = timer.acked_at - timer.started
+        self.ack.observe(ack, **labels)
+        if ack > self.deadline:
+            self.timeouts.inc(reason="fuera_de_plazo", **labels)
+
+    def render(self) -> list[str]:
+        return self.ack.render() + self.duration.render() + self.errors.render() + self.timeouts.render()
+
+
+interaction_metrics = InteractionMetrics()
+
+
+def _item_handler(view: ui.View, item: ui.Item) -> str:
+    custom_id = getattr(item, "custom_id", None)
+    if custom_id and item._provided_custom_id:
+        return custom_id
+    return f"{type(view).__name__}.{type(item).__name__}"
+
+
+class InstrumentedView(ui.View):
+    """``ui.View`` que mide cada interacción de sus componentes"""
+
+    async def _scheduled_task(self, item: ui.Item, interaction: discord.Interaction):
+        timer = interaction_metrics.begin(interaction, _item_handler(self, item), "component")
+        interaction.extras["metrics_timer"] = timer
+        try:
+            await super()._scheduled_task(item, interaction)
+        finally:
+            interaction_metrics.finish(timer)
+
+    async def on_error(self, interaction: discord.Interaction, error: Exception, item: ui.Item):
+        timer = interaction.extras.get("metrics_timer")
+        if timer is not None:
+            interaction_metrics.error(timer)
+        await super().on_error(interaction, error, item)
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """Árbol de comandos que mide comandos de barra y autocompletados"""
+
+    async def _call(self, interaction: discord.Interaction):
+        kind = "autocomplete" if interaction.type is discord.InteractionType.autocomplete else "command"
+        timer = interaction_metrics.begin(interaction, interaction.data.get("name", "?"), kind)
+        interaction.extras["metrics_timer"] = timer
+        try:
+            await super()._call(interaction)
+        except Exception:
+            interaction_metrics.error(timer)
+            raise
+        finally:
+            interaction_metrics.finish(timer)
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        # CommandTree._call captura los errores de los comandos y los pasa aquí,
+        # así que no llegan al except de _call. Un check fallido (sin el rol
+        # necesario) no es un error del manejador
+        timer = interaction.extras.get("metrics_timer")
+        if timer is not None and not isinstance(error, app_commands.CheckFailure):
+            interaction_metrics.error(timer)
+        await super().on_error(interaction, error)
+
+
+def record_handler_error(interaction: discord.Interaction):
+    """Contar un error que el propio manejador capturó"""
+    timer = interaction.extras.get("metrics_timer")
+    if timer is not None:
+        interaction_metrics.error(timer)
+
+
+# -----------------------------------------
+# Servidor HTTP
+# -----------------------------------------
+class MetricsServer:
+    """Servidor aiohttp mínimo que expone ``/metrics`` en formato de texto Prometheus.
+
+    Cada colector es una función sin argumentos que devuelve líneas de texto.
+    """
+
+    def __init__(self, host: str = METRICS_HOST, port: int = METRICS_PORT):
+        self.host = host
+        self.port = port
+        self.collectors = [interaction_metrics.render]
+        self._runner: web.AppRunner | None = None
+
+    def render(self) -> str:
+        lines = []
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    async def _handle_root(self, request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    async def start(self):
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        app.router.add_get("/", self._handle_root)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+metrics_server = MetricsServer()
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import time
+
+import discord
+
+from database import Database, db
+from log_sink import pack_embeds
+
+# =============================================
+# ENTREGAS DURADERAS (OUTBOX)
+# =============================================
+# Tipos de entrega; cada uno tiene su propio bucle para que un canal de logs
+# con el rate limit agotado no retrase los DM
+KINDS = ("dm", "log")
+
+# Entregas en vuelo a la vez (DM y mensajes de log)
+CONCURRENCY = 8
+
+# Entregas de un tipo leídas por ronda
+BATCH_SIZE = 50
+
+# Intentos antes de darla por fallida; espera BACKOFF_BASE * 2^(intentos - 1), hasta BACKOFF_MAX
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 5.0
+BACKOFF_MAX = 900.0
+
+# Tiempo máximo de un envío (discord.py ya reintenta los 429 y 5xx dentro)
+SEND_TIMEOUT = 30.0
+
+# Revisión periódica por si se pierde un aviso; los reintentos despiertan al trabajador a su hora
+POLL_INTERVAL = 60.0
+
+# Tiempo máximo para terminar la ronda en curso al apagar
+CLOSE_TIMEOUT = 15.0
+
+
+def embed_payload(*embeds: discord.Embed) -> str:
+    """Payload JSON de una entrega"""
+    return json.dumps({"embeds": [embed.to_dict() for embed in embeds]}, ensure_ascii=False)
+
+
+def backoff(attempts: int) -> float:
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(0, attempts - 1))
+
+
+class DeliveryOutbox:
+    """Trabajador que entrega los DM y logs encolados en la tabla ``outbox``.
+
+    Las entregas se guardan en la misma transacción que la advertencia, así
+    que sobreviven a un reinicio; ``notify`` despierta a los trabajadores
+    (uno por tipo) tras el commit. Cada ronda lee las entregas vencidas de su
+    tipo, agrupa los logs de un mismo
+    canal en mensajes de hasta 10 embeds (como ``LogSink``) y envía con
+    ``concurrency`` peticiones a la vez como máximo. Un error temporal se
+    reintenta con espera exponencial; los definitivos (DM cerrados, usuario
+    o canal inexistente) o agotar ``MAX_ATTEMPTS`` la marcan como fallida y
+    se avisa con ``on_failure(kind, target_id, warning_id, error)``.
+    """
+
+    def __init__(self, client: discord.Client, database: Database = db, concurrency: int = CONCURRENCY,
+                 on_failure=None):
+        self._client = client
+        self._db = database
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wake = {kind: asyncio.Event() for kind in KINDS}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._closing = False
+        self.on_failure = on_failure
+        self.stats = {"delivered": 0, "retried": 0, "failed": 0, "messages": 0}
+
+    def start(self):
+        """Lanzar los trabajadores (idempotente); entregan también lo pendiente de antes del reinicio"""
+        self._closing = False
+        for kind in KINDS:
+            task = self._tasks.get(kind)
+            if task is None or task.done():
+                self._tasks[kind] = asyncio.create_task(self._run(kind))
+
+    @property
+    def running(self) -> bool:
+        return len(self._tasks) == len(KINDS) and not any(task.done() for task in self._tasks.values())
+
+    def notify(self):
+        """Avisar de que hay entregas nuevas"""
+        for event in self._wake.values():
+            event.set()
+
+    async def _run(self, kind: str):
+        wake = self._wake[kind]
+        while not self._closing:
+            wake.clear()
+            try:
+                rows = await self._db.due_deliveries(kind, time.time(), BATCH_SIZE)
+                if rows:
+                    await self._deliver(rows)
+                    continue
+                next_at = await self._db.next_delivery_at(kind)
+            except Exception as e:
+                print(f"Error en el trabajador de entregas ({kind}): {e}")
+                next_at = None
+            timeout = POLL_INTERVAL if next_at is None else min(POLL_INTERVAL, max(0.0, next_at - time.time()))
+            try:
+                await asyncio.wait_for(wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, rows: list[tuple]):
+        """Intentar una ronda de entregas y guardar el resultado en una transacción"""
+        sends = []
+        logs: dict[str, list[tuple]] = {}
+        for row in rows:
+            if row[1] == "log":
+                logs.setdefault(row[2], []).append(row)
+            else:
+                sends.append(([row], row[1], row[2], self._embeds(row)))
+        for channel_id, channel_rows in logs.items():
+            owners, embeds = [], []
+            for row in channel_rows:
+                for embed in self._embeds(row):
+                    owners.append(row)
+                    embeds.append(embed)
+            # Cada mensaje lleva las filas de sus embeds
+            start = 0
+            for group in pack_embeds(embeds):
+                sends.append((list(dict.fromkeys(owners[start:start + len(group)])), "log", channel_id, group))
+                start += len(group)
+
+        results = await asyncio.gather(*(self._attempt(kind, target, embeds)
+                                         for _, kind, target, embeds in sends))
+
+        # Una fila se da por entregada solo si lo fueron todos sus mensajes
+        outcome: dict[tuple, tuple[str, bool] | None] = {}
+        for (group_rows, _, _, _), error in zip(sends, results):
+            for row in group_rows:
+                if error is not None and (outcome.get(row) is None or error[1]):
+                    outcome[row] = error
+                else:
+                    outcome.setdefault(row, None)
+
+        delivered, retries, failed = [], [], []
+        now = time.time()
+        for (row_id, kind, target, _, warning_id, attempts), error in outcome.items():
+            if error is None:
+                delivered.append(row_id)
+            elif error[1] or attempts + 1 >= MAX_ATTEMPTS:
+                failed.append((error[0], row_id))
+                await self._report_failure(kind, target, warning_id, error[0])
+            else:
+                retries.append((now + backoff(attempts + 1), error[0], row_id))
+        self.stats["delivered"] += len(delivered)
+        self.stats["retried"] += len(retries)
+        self.stats["failed"] += len(failed)
+        await self._db.finish_deliveries(delivered, retries, failed)
+
+    @staticmethod
+    def _embeds(row: tuple) -> list[discord.Embed]:
+        return [discord.Embed.from_dict(data) for data in json.loads(row[3])["embeds"]]
+
+    async def _attempt(self, kind: str, target_id: str, embeds: list[discord.Embed]) -> tuple[str, bool] | None:
+        """Enviar una entrega; devuelve None o ``(error, definitivo)``"""
+        async with self._semaphore:
+            try:
+                await asyncio.wait_for(self._send(kind, int(target_id), embeds), SEND_TIMEOUT)
+            except (discord.Forbidden, discord.NotFound) as e:
+                return str(e), True
+            except (discord.HTTPException, OSError, asyncio.TimeoutError) as e:
+                return str(e) or type(e).__name__, False
+        self.stats["messages"] += 1
+        return None
+
+    async def _send(self, kind: str, target_id: int, embeds: list[discord.Embed]):
+        if kind == "dm":
+            user = self._client.get_user(target_id) or await self._client.fetch_user(target_id)
+            await user.send(embeds=embeds)
+        else:
+            # Mensaje parcial: no depende de que el canal esté ya en caché
+            await self._client.get_partial_messageable(target_id).send(embeds=embeds)
+
+    async def _report_failure(self, kind: str, target_id: str, warning_id: int | None, error: str):
+        print(f"Entrega {kind} a {target_id} (advertencia {warning_id}) fallida: {error}")
+        if self.on_failure is not None:
+            try:
+                await self.on_failure(kind, int(target_id), warning_id, error)
+            except Exception as e:
+                print(f"Error al avisar de una entrega fallida: {e}")
+
+    async def close(self, timeout: float = CLOSE_TIMEOUT):
+        """Terminar las rondas en curso y detener los trabajadores (lo pendiente queda en la base de datos)"""
+        self._closing = True
+        self.notify()
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        if not tasks:
+            return
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            print("⚠️ Entregas en curso interrumpidas al apagar; se reintentarán al arrancar")
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from collections import deque
+
+import discord
+
+from metrics import format_labels
+
+# =============================================
+# PLANIFICADOR DE RENOMBRADO DE CANALES
+# =============================================
+# Discord permite ~2 renombrados por canal cada 10 minutos
+RENAME_RATE = 2
+RENAME_PER = 600.0
+
+
+class ChannelRenameScheduler:
+    """Renombra canales respetando el límite de Discord por canal.
+
+    Solo se guarda el último nombre deseado de cada canal: las peticiones que
+    llegan mientras otra espera presupuesto la reemplazan (se "coalescen"). Un
+    trabajador por canal aplica el valor final en cuanto la ventana de
+    ``rate`` renombrados cada ``per`` segundos lo permite, de modo que no se
+    pierde ningún cambio ni se gasta ninguna llamada condenada a un 429.
+
+    Ese presupuesto local es el único freno: si aun así llega un 429 (p. ej.
+    renombrados hechos justo antes de reiniciar), el cliente HTTP de
+    discord.py espera y reintenta dentro de ``channel.edit`` y
+    ``rest_accounting`` lo cuenta por ruta. ``stats`` se publica en
+    ``/metrics`` (``render``) y en ``/tareas``.
+    """
+
+    def __init__(self, rate: int = RENAME_RATE, per: float = RENAME_PER):
+        self.rate = rate
+        self.per = per
+        self._desired: dict[int, tuple[discord.abc.GuildChannel, str]] = {}
+        self._history: dict[int, deque[float]] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self.stats = {"requested": 0, "coalesced": 0, "deferred": 0, "applied": 0,
+                      "skipped": 0, "failed": 0}
+
+    def request(self, channel: discord.abc.GuildChannel, name: str):
+        """Pedir que ``channel`` pase a llamarse ``name`` (no bloquea)"""
+        self.stats["requested"] += 1
+        pending = self._desired.get(channel.id)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            if name == channel.name:
+                # El cambio pendiente ya no hace falta
+                del self._desired[channel.id]
+                return
+        elif name == channel.name:
+            self.stats["skipped"] += 1
+            return
+
+        self._desired[channel.id] = (channel, name)
+        worker = self._workers.get(channel.id)
+        if worker is None or worker.done():
+            self._workers[channel.id] = asyncio.create_task(self._drain(channel.id))
+
+    def pending(self) -> dict[int, str]:
+        """Nombres pendientes por id de canal"""
+        return {channel_id: name for channel_id, (_, name) in self._desired.items()}
+
+    def delay_for(self, channel_id: int) -> float:
+        """Segundos hasta que el canal tenga presupuesto para otro renombrado"""
+        history = self._history.get(channel_id)
+        if not history or len(history) < self.rate:
+            return 0.0
+        return max(0.0, history[0] + self.per - time.monotonic())
+
+    def _spend(self, channel_id: int, at: float):
+        history = self._history.setdefault(channel_id, deque(maxlen=self.rate))
+        history.append(at)
+
+    async def _drain(self, channel_id: int):
+        deferred = False
+        while channel_id in self._desired:
+            delay = self.delay_for(channel_id)
+            if delay > 0:
+                if not deferred:
+                    self.stats["deferred"] += 1
+                    deferred = True
+                await asyncio.sleep(delay)
+                continue
+
+            channel, name = self._desired.pop(channel_id)
+            if channel.name == name:
+                self.stats["skipped"] += 1
+                continue
+            try:
+                await channel.edit(name=name)
+            except discord.HTTPException as e:
+                self.stats["failed"] += 1
+                print(f"Error al renombrar canal {channel_id}: {e}")
+                continue
+            self._spend(channel_id, time.monotonic())
+            self.stats["applied"] += 1
+            deferred = False
+            print(f"✅ Canal renombrado a: {name} ({self.summary()})")
+        self._workers.pop(channel_id, None)
+
+    def summary(self) -> str:
+        return (f"aplicados {self.stats['applied']}, coalescidos {self.stats['coalesced']}, "
+                f"diferidos {self.stats['deferred']}")
+
+    def render(self) -> list[str]:
+        """Líneas de ``/metrics`` con los contadores del planificador"""
+        lines = ["# HELP santiago_channel_renames_total Peticiones de renombrado de canales por resultado",
+                 "# TYPE santiago_channel_renames_total counter"]
+        for result, value in self.stats.items():
+            lines.append(f"santiago_channel_renames_total{format_labels({'result': result})} {value}")
+        lines.append("# HELP santiago_channel_renames_pending Canales con un renombrado a la espera de presupuesto")
+        lines.append("# TYPE santiago_channel_renames_pending gauge")
+        lines.append(f"santiago_channel_renames_pending {len(self._desired)}")
+        return lines
+
+    async def close(self):
+        """Cancelar los trabajadores pendientes"""
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
@@ -0,0 +1,175 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import aiohttp
+
+from metrics import Counter, Histogram, format_labels
+
+# =============================================
+# CONTABILIDAD DE LLAMADAS REST A DISCORD
+# =============================================
+# Ventana de los presupuestos por funcionalidad (segundos)
+FEATURE_WINDOW = 600.0
+
+# Funcionalidad a la que se atribuyen las llamadas REST de la tarea actual.
+# Las tareas creadas con asyncio heredan el valor vigente al crearlas.
+current_feature: ContextVar[str] = ContextVar("rest_feature", default="sin_clasificar")
+
+
+@contextmanager
+def rest_feature(name: str):
+    """Atribuir a ``name`` las llamadas REST hechas dentro del bloque"""
+    token = current_feature.set(name)
+    try:
+        yield
+    finally:
+        current_feature.reset(token)
+
+
+def route_template(path: str) -> str:
+    """Ruta de la API sin ids ni tokens: ``/channels/123/messages`` -> ``/channels/{id}/messages``"""
+    segments = path.split("/api/", 1)[-1].split("/")
+    if segments and segments[0].startswith("v") and segments[0][1:].isdigit():
+        segments = segments[1:]
+    template = []
+    for index, segment in enumerate(segments):
+        if segment.isdigit():
+            template.append("{id}")
+        elif index and segments[index - 1] == "reactions":
+            template.append("{emoji}")
+        elif len(segment) >= 32:
+            template.append("{token}")
+        else:
+            template.append(segment)
+    return "/" + "/".join(template)
+
+
+class RestAccounting:
+    """Registro de cada petición HTTP del cliente de discord.py.
+
+    Se engancha a la sesión de aiohttp de discord.py mediante ``http_trace``
+    (ver ``trace_config``), así que cubre todas las llamadas (ediciones de
+    canal, mensajes, respuestas a interacciones, DMs...) sin tocar cada
+    sitio. Por ruta registra el número de llamadas, la latencia, el bucket
+    y el presupuesto restante que informa Discord, los 429 y las esperas;
+    por funcionalidad (``rest_feature``) cuenta las llamadas de los últimos
+    ``window`` segundos.
+    """
+
+    def __init__(self, window: float = FEATURE_WINDOW):
+        self.window = window
+        self.requests = Counter("santiago_rest_requests_total", "Peticiones REST por ruta, estado y funcionalidad")
+        self.latency = Histogram("santiago_rest_request_seconds", "Latencia de las peticiones REST por ruta")
+        self.rate_limited = Counter("santiago_rest_429_total", "Respuestas 429 por ruta, alcance y funcionalidad")
+        self.retry_after = Counter("santiago_rest_retry_after_seconds_total",
+                                   "Segundos de espera indicados por los 429")
+        self.exhausted = Counter("santiago_rest_bucket_exhausted_total",
+                                 "Respuestas que agotaron el bucket (discord.py espera antes de la siguiente)")
+        self.errors = Counter("santiago_rest_errors_total", "Peticiones REST fallidas sin respuesta")
+        # ruta -> (bucket, restantes, límite, segundos hasta el reinicio)
+        self.buckets: dict[str, tuple[str, int, int, float]] = {}
+        # funcionalidad -> instantes de las llamadas recientes
+        self._recent: dict[str, deque[float]] = {}
+        self._totals: dict[str, int] = {}
+        self._rate_limited_by_feature: dict[str, int] = {}
+
+    # -----------------------------------------
+    # Enganche con aiohttp
+    # -----------------------------------------
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """``TraceConfig`` para pasar como ``http_trace`` al bot"""
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(self._on_request_start)
+        config.on_request_end.append(self._on_request_end)
+        config.on_request_exception.append(self._on_request_exception)
+        return config
+
+    async def _on_request_start(self, session, context, params: aiohttp.TraceRequestStartParams):
+        context.started = time.perf_counter()
+        context.feature = current_feature.get()
+
+    async def _on_request_end(self, session, context, params: aiohttp.TraceRequestEndParams):
+        if "/api/" not in params.url.path:
+            return  # gateway y CDN
+        headers = params.response.headers
+        self.record(
+            params.method, route_template(params.url.path), params.response.status,
+            time.perf_counter() - context.started, context.feature,
+            bucket=headers.get("X-RateLimit-Bucket"),
+            remaining=headers.get("X-RateLimit-Remaining"),
+            limit=headers.get("X-RateLimit-Limit"),
+            reset_after=headers.get("X-RateLimit-Reset-After"),
+            retry_after=headers.get("Retry-After"),
+            scope=headers.get("X-RateLimit-Scope"),
+        )
+
+    async def _on_request_exception(self, session, context, params: aiohttp.TraceRequestExceptionParams):
+        if "/api/" not in params.url.path:
+            return
+        route = f"{params.method} {route_template(params.url.path)}"
+        self.errors.inc(route=route, feature=context.feature, error=type(params.exception).__name__)
+
+    # -----------------------------------------
+    # Registro
+    # -----------------------------------------
+    def record(self, method: str, path: str, status: int, elapsed: float, feature: str, *,
+               bucket: str | None = None, remaining: str | None = None, limit: str | None = None,
+               reset_after: str | None = None, retry_after: str | None = None, scope: str | None = None):
+        route = f"{method} {path}"
+        self.requests.inc(route=route, status=status, feature=feature)
+        self.latency.observe(elapsed, route=route)
+
+        now = time.monotonic()
+        recent = self._recent.setdefault(feature, deque())
+        recent.append(now)
+        while recent[0] < now - self.window:
+            recent.popleft()
+        self._totals[feature] = self._totals.get(feature, 0) + 1
+
+        if bucket is not None and remaining is not None:
+            self.buckets[route] = (bucket, int(remaining), int(limit or 0), float(reset_after or 0))
+            if int(remaining) == 0:
+                self.exhausted.inc(route=route)
+        if status == 429:
+            self.rate_limited.inc(route=route, scope=scope or "bucket", feature=feature)
+            self._rate_limited_by_feature[feature] = self._rate_limited_by_feature.get(feature, 0) + 1
+            if retry_after is not None:
+                self.retry_after.inc(float(retry_after), route=route)
+
+    def feature_usage(self) -> list[tuple[str, int, int, int]]:
+        """``(funcionalidad, llamadas en la ventana, total, 429)`` ordenado por uso reciente"""
+        cutoff = time.monotonic() - self.window
+        usage = []
+        for feature, recent in self._recent.items():
+            while recent and recent[0] < cutoff:
+                recent.popleft()
+            usage.append((feature, len(recent), self._totals[feature], self._rate_limited_by_feature.get(feature, 0)))
+        return sorted(usage, key=lambda row: (-row[1], -row[2]))
+
+    def top_routes(self, limit: int = 10) -> list[tuple[str, int]]:
+        """Rutas con más llamadas desde el arranque"""
+        totals: dict[str, int] = {}
+        for labels, value in self.requests.items():
+            route = labels["route"]
+            totals[route] = totals.get(route, 0) + int(value)
+        return sorted(totals.items(), key=lambda item: -item[1])[:limit]
+
+    def render(self) -> list[str]:
+        lines = []
+        for metric in (self.requests, self.latency, self.rate_limited, self.retry_after, self.exhausted, self.errors):
+            lines.extend(metric.render())
+        lines.append("# HELP santiago_rest_bucket_remaining Peticiones restantes en el bucket de cada ruta")
+        lines.append("# TYPE santiago_rest_bucket_remaining gauge")
+        for route, (bucket, remaining, limit, reset_after) in sorted(self.buckets.items()):
+            labels = format_labels({"route": route, "bucket": bucket, "limit": limit})
+            lines.append(f"santiago_rest_bucket_remaining{labels} {remaining}")
+        lines.append(f"# HELP santiago_rest_feature_calls_window Llamadas REST por funcionalidad en los últimos {self.window:.0f}s")
+        lines.append("# TYPE santiago_rest_feature_calls_window gauge")
+        for feature, recent, total, limited in self.feature_usage():
+            lines.append(f"santiago_rest_feature_calls_window{format_labels({'feature': feature})} {recent}")
+        return lines
+
+
+rest_accounting = RestAccounting()
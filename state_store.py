@@ -0,0 +1,44 @@
+import json
+
+from database import Database, db
+
+# =============================================
+# ESTADO PERSISTENTE DEL BOT
+# =============================================
+
+
+class BotState:
+    """Estado del bot en memoria, respaldado en la tabla ``bot_state``.
+
+    Se carga una vez al arrancar y cada cambio se escribe en SQLite en el
+    momento, de modo que tras un reinicio el bot recupera el estado del
+    servidor, los cierres de tickets pendientes, etc. sin consultar la API.
+    Los valores deben ser serializables a JSON (las claves de los dict se
+    guardan como texto).
+    """
+
+    def __init__(self, database: Database = db):
+        self._db = database
+        self._values: dict = {}
+        self.loaded = False
+
+    async def load(self):
+        """Cargar el estado persistido en memoria"""
+        rows = await self._db.load_state()
+        self._values = {key: json.loads(value) for key, value in rows}
+        self.loaded = True
+
+    def get(self, key: str, default=None):
+        return self._values.get(key, default)
+
+    async def set(self, key: str, value):
+        """Actualizar una clave en memoria y en la base de datos"""
+        self._values[key] = value
+        await self._db.save_state(key, json.dumps(value))
+
+    async def delete(self, key: str):
+        self._values.pop(key, None)
+        await self._db.save_state(key, None)
+
+
+bot_state = BotState()
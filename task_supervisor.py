@@ -0,0 +1,132 @@
+import asyncio
+import time
+from datetime import datetime
+
+# =============================================
+# SUPERVISOR DE TAREAS EN SEGUNDO PLANO
+# =============================================
+# Espera tras un fallo: BACKOFF_BASE * 2^(fallos seguidos - 1), hasta BACKOFF_MAX
+BACKOFF_BASE = 5.0
+BACKOFF_MAX = 600.0
+
+
+class Job:
+    """Tarea periódica con nombre: ``func()`` se ejecuta cada ``interval`` segundos"""
+    __slots__ = ("name", "func", "interval", "initial_delay", "task", "runs", "failures",
+                 "consecutive_failures", "last_run", "last_duration", "last_error", "restarts")
+
+    def __init__(self, name: str, func, interval: float, initial_delay: float = 0.0):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self.task: asyncio.Task | None = None
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_run: datetime | None = None
+        self.last_duration: float | None = None
+        self.last_error: str | None = None
+        self.restarts = 0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def backoff(self) -> float:
+        return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(0, self.consecutive_failures - 1))
+
+
+class TaskSupervisor:
+    """Garantiza una sola instancia de cada tarea periódica del bot.
+
+    Las tareas se registran por nombre y ``start`` es idempotente, así que se
+    puede llamar en cada ``on_ready`` (también tras reconexiones) sin crear
+    copias. Si una ejecución lanza una excepción se registra el fallo y se
+    reintenta con espera exponencial; si el bucle muere por otro motivo, se
+    vuelve a lanzar.
+    """
+
+    def __init__(self):
+        self._jobs: dict[str, Job] = {}
+        self._closing = False
+
+    def register(self, name: str, func, interval: float, initial_delay: float = 0.0) -> Job:
+        """Registrar una tarea (si ya existe, se devuelve la registrada)"""
+        job = self._jobs.get(name)
+        if job is None:
+            job = self._jobs[name] = Job(name, func, interval, initial_delay)
+        return job
+
+    def start(self, name: str | None = None):
+        """Lanzar una tarea, o todas, si no están ya en marcha"""
+        jobs = [self._jobs[name]] if name is not None else self._jobs.values()
+        for job in jobs:
+            if not job.running:
+                job.task = asyncio.create_task(self._run(job), name=f"job:{job.name}")
+                job.task.add_done_callback(lambda task, job=job: self._on_exit(job, task))
+
+    def jobs(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    def health(self) -> list[dict]:
+        """Estado de cada tarea: última ejecución, duración y fallos"""
+        return [{
+            "name": job.name,
+            "running": job.running,
+            "interval": job.interval,
+            "runs": job.runs,
+            "failures": job.failures,
+            "consecutive_failures": job.consecutive_failures,
+            "restarts": job.restarts,
+            "last_run": job.last_run.isoformat() if job.last_run else None,
+            "last_duration": job.last_duration,
+            "last_error": job.last_error,
+        } for job in self._jobs.values()]
+
+    async def close(self):
+        """Cancelar todas las tareas"""
+        self._closing = True
+        tasks = [job.task for job in self._jobs.values() if job.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self._jobs.values():
+            job.task = None
+
+    # -----------------------------------------
+    # Bucle de cada tarea
+    # -----------------------------------------
+    async def _run(self, job: Job):
+        if job.initial_delay:
+            await asyncio.sleep(job.initial_delay)
+        while True:
+            job.last_run = datetime.now()
+            start = time.perf_counter()
+            try:
+                await job.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.last_duration = time.perf_counter() - start
+                job.failures += 1
+                job.consecutive_failures += 1
+                job.last_error = f"{type(e).__name__}: {e}"
+                delay = job.backoff()
+                print(f"⚠️ Tarea {job.name} falló ({job.last_error}), reintento en {delay:.0f}s")
+                await asyncio.sleep(delay)
+                continue
+            job.last_duration = time.perf_counter() - start
+            job.runs += 1
+            job.consecutive_failures = 0
+            await asyncio.sleep(job.interval)
+
+    def _on_exit(self, job: Job, task: asyncio.Task):
+        if self._closing or task.cancelled() or job.task is not task:
+            return
+        # El bucle no debería terminar nunca: relanzarlo
+        job.restarts += 1
+        job.last_error = repr(task.exception()) if task.exception() else "terminó sin error"
+        print(f"⚠️ Tarea {job.name} terminó inesperadamente ({job.last_error}), relanzando")
+        job.task = None
+        self.start(job.name)
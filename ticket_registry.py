@@ -0,0 +1,102 @@
+from database import Database, db
+
+# =============================================
+# REGISTRO DE TICKETS
+# =============================================
+
+
+def _int_or_none(value) -> int | None:
+    return None if value is None else int(value)
+
+
+class Ticket:
+    """Estado de un ticket abierto"""
+    __slots__ = ("channel_id", "number", "category", "opener_id", "claimed_by", "claimed_at", "created_at")
+
+    def __init__(self, channel_id: int, number: int | None, category: str | None, opener_id: int | None,
+                 claimed_by: int | None = None, claimed_at: str | None = None, created_at: str | None = None):
+        self.channel_id = channel_id
+        self.number = number
+        self.category = category
+        self.opener_id = opener_id
+        self.claimed_by = claimed_by
+        self.claimed_at = claimed_at
+        self.created_at = created_at
+
+    @property
+    def claimed(self) -> bool:
+        return self.claimed_by is not None
+
+
+class TicketRegistry:
+    """Tickets abiertos en memoria, respaldados en la tabla ``tickets``.
+
+    Es la única fuente de verdad sobre quién abrió un ticket y quién lo
+    atiende: ya no se deduce de los campos del embed. ``claim`` es un
+    compare-and-set: se comprueba y se marca en memoria sin ceder el event
+    loop, y la base de datos repite la condición (``claimed_by IS NULL``).
+    """
+
+    def __init__(self, database: Database = db):
+        self._db = database
+        self._tickets: dict[int, Ticket] = {}
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._tickets
+
+    async def load(self):
+        """Cargar los tickets abiertos desde la base de datos"""
+        rows = await self._db.load_open_tickets()
+        self._tickets = {
+            int(channel_id): Ticket(int(channel_id), number, category, _int_or_none(opener_id),
+                                    _int_or_none(claimed_by), claimed_at, created_at)
+            for channel_id, number, category, opener_id, claimed_by, claimed_at, created_at in rows
+        }
+
+    def get(self, channel_id: int) -> Ticket | None:
+        return self._tickets.get(channel_id)
+
+    def open_tickets(self) -> list[Ticket]:
+        return list(self._tickets.values())
+
+    async def open(self, channel_id: int, number: int | None, category: str | None,
+                   opener_id: int | None) -> Ticket:
+        """Registrar un ticket recién creado"""
+        ticket = Ticket(channel_id, number, category, opener_id)
+        self._tickets[channel_id] = ticket
+        ticket.created_at = await self._db.insert_ticket(channel_id, number, category, opener_id)
+        return ticket
+
+    async def ensure(self, channel_id: int) -> Ticket:
+        """Obtener un ticket, registrando los creados antes de existir el registro"""
+        ticket = self._tickets.get(channel_id)
+        if ticket is None:
+            ticket = await self.open(channel_id, None, None, None)
+        return ticket
+
+    async def claim(self, channel_id: int, staff_id: int) -> bool:
+        """Reclamar un ticket; devuelve False si ya lo había reclamado alguien"""
+        ticket = await self.ensure(channel_id)
+        if ticket.claimed:
+            return False
+        ticket.claimed_by = staff_id
+        if not await self._db.claim_ticket(channel_id, staff_id):
+            # La base de datos ya tenía un reclamo (p. ej. de otra instancia)
+            await self.load()
+            return False
+        return True
+
+    async def add_participant(self, channel_id: int, user_id: int, added_by: int):
+        await self.ensure(channel_id)
+        await self._db.add_ticket_participant(channel_id, user_id, added_by)
+
+    async def close(self, channel_id: int, closed_by: int, reason: str):
+        """Cerrar un ticket y quitarlo del registro en memoria"""
+        self._tickets.pop(channel_id, None)
+        await self._db.close_ticket(channel_id, closed_by, reason)
+
+
+ticket_registry = TicketRegistry()
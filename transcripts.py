@@ -0,0 +1,71 @@
+import json
+import os
+import zlib
+
+import aiofiles
+
+# =============================================
+# TRANSCRIPCIONES DE TICKETS
+# =============================================
+TRANSCRIPTS_DIR = os.getenv('TRANSCRIPTS_DIR', 'transcripts')
+
+# Mensajes serializados que se comprimen y escriben de una vez
+BATCH_SIZE = 200
+
+
+def message_record(message) -> dict:
+    """Representación JSON de un mensaje para el archivo"""
+    return {
+        "id": message.id,
+        "author_id": message.author.id,
+        "author": str(message.author),
+        "created_at": message.created_at.isoformat(),
+        "content": message.content,
+        "attachments": [attachment.url for attachment in message.attachments],
+        "embeds": [embed.to_dict() for embed in message.embeds],
+    }
+
+
+def transcript_path(channel) -> str:
+    return os.path.join(TRANSCRIPTS_DIR, f"{channel.name}-{channel.id}.jsonl.gz")
+
+
+async def archive_channel(channel, path: str | None = None) -> tuple[str, int, int]:
+    """Volcar el historial completo de un canal a un JSONL comprimido con gzip.
+
+    Las páginas de ``channel.history`` se recorren en orden cronológico y se
+    escriben por lotes de ``BATCH_SIZE`` mensajes a través de un compresor
+    incremental, así que la memoria usada no depende de la longitud del
+    ticket. El archivo se escribe con un nombre temporal y se renombra al
+    terminar. Devuelve ``(ruta, bytes, mensajes)``.
+    """
+    path = path or transcript_path(channel)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = path + ".part"
+
+    # wbits=31: formato gzip, legible con zcat/gzip.open
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    count = 0
+    size = 0
+    batch: list[str] = []
+
+    async with aiofiles.open(partial, "wb") as file:
+        async for message in channel.history(limit=None, oldest_first=True):
+            batch.append(json.dumps(message_record(message), ensure_ascii=False))
+            count += 1
+            if len(batch) >= BATCH_SIZE:
+                data = compressor.compress(("\n".join(batch) + "\n").encode("utf-8"))
+                batch.clear()
+                if data:
+                    await file.write(data)
+                    size += len(data)
+        if batch:
+            data = compressor.compress(("\n".join(batch) + "\n").encode("utf-8"))
+            await file.write(data)
+            size += len(data)
+        data = compressor.flush()
+        await file.write(data)
+        size += len(data)
+
+    os.replace(partial, path)
+    return path, size, count
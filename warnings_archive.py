@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import os
+from operator import itemgetter
+
+from database import DB_PATH, WARNING_COLUMNS, Database
+
+# =============================================
+# EXPORTACIÓN E IMPORTACIÓN DE ADVERTENCIAS
+# =============================================
+FORMATS = ("jsonl", "csv")
+
+# Filas por fetchmany/executemany: la memoria usada no depende del tamaño de la tabla
+BATCH_SIZE = 5000
+
+
+def archive_format(path: str) -> str:
+    """Formato de un archivo por su extensión (``.jsonl``/``.csv``, con o sin ``.gz``)"""
+    name = path[:-3] if path.endswith(".gz") else path
+    fmt = os.path.splitext(name)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Extensión no reconocida: {path!r} (usa .jsonl.gz o .csv.gz)")
+    return fmt
+
+
+def _open_text(path: str, mode: str, compressed: bool):
+    if compressed:
+        # compresslevel 6: casi el mismo tamaño que 9 en mucho menos tiempo
+        return gzip.open(path, mode + "t", compresslevel=6, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def export_warnings(database: Database, path: str) -> tuple[str, int, int]:
+    """Volcar ``advertencias`` a ``path`` (JSONL o CSV, comprimido si acaba en ``.gz``).
+
+    Es síncrona y se ejecuta en un hilo aparte (``asyncio.to_thread``): lee
+    por lotes con su propia conexión de solo lectura y escribe a través del
+    compresor, con un nombre temporal que se renombra al terminar. Devuelve
+    ``(ruta, bytes, filas)``.
+    """
+    fmt = archive_format(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = path + ".part"
+    count = 0
+
+    with _open_text(partial, "w", path.endswith(".gz")) as out:
+        writer = csv.writer(out) if fmt == "csv" else None
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        if writer:
+            writer.writerow(WARNING_COLUMNS)
+        for rows in database.iter_warning_batches(BATCH_SIZE):
+            if writer:
+                writer.writerows(rows)
+            else:
+                out.write("".join(encode(dict(zip(WARNING_COLUMNS, row))) + "\n" for row in rows))
+            count += len(rows)
+
+    os.replace(partial, path)
+    return path, os.path.getsize(path), count
+
+
+def read_warning_batches(path: str, batch_size: int = BATCH_SIZE):
+    """Lotes de filas ``WARNING_COLUMNS`` leídos en streaming de un archivo exportado"""
+    fmt = archive_format(path)
+    with _open_text(path, "r", path.endswith(".gz")) as source:
+        if fmt == "csv":
+            reader = csv.reader(source)
+            header = tuple(next(reader, ()))
+            if header != WARNING_COLUMNS:
+                raise ValueError(f"Cabecera CSV inesperada: {header} (se esperaba {WARNING_COLUMNS})")
+            # CSV no distingue vacío de NULL: la prueba vacía vuelve como NULL
+            records = ((int(row[0]), *row[1:6], row[6] or None, row[7]) for row in reader)
+        else:
+            records = map(itemgetter(*WARNING_COLUMNS), map(json.loads, filter(str.strip, source)))
+
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+async def import_warnings(database: Database, path: str) -> tuple[int, int]:
+    """Importar un archivo exportado en una transacción; devuelve ``(leídas, insertadas)``"""
+    archive_format(path)  # validar antes de ocupar la base de datos
+    return await database.import_warnings(read_warning_batches(path))
+
+
+# =============================================
+# LÍNEA DE COMANDOS
+# =============================================
+async def _import_cli(db_path: str, path: str) -> tuple[int, int]:
+    database = Database(db_path)
+    await database.connect()
+    try:
+        return await import_warnings(database, path)
+    finally:
+        await database.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportar o importar la tabla de advertencias")
+    parser.add_argument("accion", choices=("exportar", "importar"))
+    parser.add_argument("archivo", help="ruta .jsonl.gz o .csv.gz (también sin comprimir)")
+    parser.add_argument("--db", default=DB_PATH, help=f"base de datos SQLite (por defecto {DB_PATH})")
+    args = parser.parse_args()
+
+    if args.accion == "exportar":
+        path, size, count = export_warnings(Database(args.db), args.archivo)
+        print(f"✅ {count} advertencias exportadas a {path} ({size / 1024 / 1024:.1f} MiB)")
+    else:
+        read, inserted = asyncio.run(_import_cli(args.db, args.archivo))
+        print(f"✅ {inserted} advertencias importadas de {read} leídas ({read - inserted} ya existían)")
+
+
+if __name__ == "__main__":
+    main()